@@ -0,0 +1,107 @@
+import threading
+import pandas as pd
+from utils import converter_datas
+
+class TotaisPorPeriodo:
+    """Somas de entradas e saídas por dia, mês e ano, atualizadas a cada lançamento.
+
+    Os resumos saem destas tabelas (uma linha por período) em vez de
+    reagrupar o livro inteiro; o saldo acumulado é a soma corrida dos totais
+    em ordem cronológica. Datas inválidas entram só na tabela diária.
+    """
+
+    def __init__(self, df=None):
+        self._lock = threading.Lock()
+        self.dias = {}   # "dd/mm/aaaa" -> {"entrada": ..., "saida": ...}
+        self.meses = {}  # (ano, mes) -> idem
+        self.anos = {}   # ano -> idem
+        self._datas = {}  # "dd/mm/aaaa" -> Timestamp (NaT se inválida)
+        self._saldo_total = 0.0  # soma dos dias com data válida
+        self._ultima_data = None
+        self._tabela_dias = None  # cache da tabela diária com saldo acumulado
+        if df is not None and not df.empty:
+            for (data, tipo), valor in df.groupby(["data", "tipo"], sort=False)["valor"].sum().items():
+                self.somar(data, tipo, valor)
+
+    def somar(self, data, tipo, valor):
+        """Soma um lançamento (ou o total de vários do mesmo dia e tipo)"""
+        valor = float(valor)
+        with self._lock:
+            dia = self._datas.get(data)
+            if dia is None:
+                dia = converter_datas(pd.Series([data])).iloc[0]
+                self._datas[data] = dia
+            chaves = [(self.dias, data)]
+            if not pd.isna(dia):
+                chaves += [(self.meses, (dia.year, dia.month)), (self.anos, dia.year)]
+                if self._ultima_data is None or dia > self._ultima_data:
+                    self._ultima_data = dia
+                self._saldo_total += valor
+            for tabela, chave in chaves:
+                totais = tabela.setdefault(chave, {"entrada": 0.0, "saida": 0.0})
+                totais[tipo] = totais.get(tipo, 0.0) + valor
+            self._tabela_dias = None
+
+    def __contains__(self, data):
+        return data in self.dias
+
+    def dia(self, data):
+        """Entradas, saídas, total e saldo acumulado de um dia"""
+        totais = self.dias.get(data, {})
+        resumo = {
+            "data": data,
+            "entrada": totais.get("entrada", 0.0),
+            "saida": abs(totais.get("saida", 0.0)),
+            "total": sum(totais.values())
+        }
+        if self._datas.get(data) is not None and self._datas[data] == self._ultima_data:
+            # Último dia do livro: o saldo acumulado é o saldo total
+            resumo["saldo_acumulado"] = self._saldo_total
+        else:
+            tabela = self.tabela_dias()
+            linha = tabela[tabela["data"] == data]
+            resumo["saldo_acumulado"] = float(linha["saldo_acumulado"].iloc[0]) if not linha.empty else 0.0
+        return resumo
+
+    def tabela_dias(self):
+        """Totais por dia com saldo acumulado, dos mais recentes para os mais antigos"""
+        with self._lock:
+            if self._tabela_dias is None:
+                tabela = _tabela(self.dias, "data")
+                tabela["data_dt"] = tabela["data"].map(self._datas)
+                self._tabela_dias = _ordenar_com_saldo(tabela, "data_dt")
+            return self._tabela_dias
+
+    def tabela_meses(self):
+        """Totais por mês (mm/aaaa) com saldo acumulado, dos mais recentes para os mais antigos"""
+        with self._lock:
+            tabela = _tabela(self.meses, "chave")
+        tabela = _ordenar_com_saldo(tabela, "chave")
+        tabela.insert(0, "mes_ano", [f"{mes:02d}/{ano}" for ano, mes in tabela["chave"]])
+        return tabela
+
+    def tabela_anos(self):
+        """Totais por ano com saldo acumulado, dos mais recentes para os mais antigos"""
+        with self._lock:
+            tabela = _tabela(self.anos, "chave")
+        tabela = _ordenar_com_saldo(tabela, "chave")
+        tabela.insert(0, "ano", tabela["chave"].astype(str))
+        return tabela
+
+def _tabela(totais, coluna):
+    chaves = list(totais)
+    return pd.DataFrame({
+        coluna: pd.Series(chaves, dtype=object),
+        "entrada": [totais[c].get("entrada", 0.0) for c in chaves],
+        "saida": [abs(totais[c].get("saida", 0.0)) for c in chaves],
+        "total": [sum(totais[c].values()) for c in chaves],
+    })
+
+def _ordenar_com_saldo(tabela, coluna):
+    """Soma corrida em ordem cronológica; devolve do mais recente para o mais antigo"""
+    tabela = tabela.sort_values(coluna, kind="stable", na_position="last").reset_index(drop=True)
+    tabela["saldo_acumulado"] = tabela["total"].cumsum()
+    invertida = tabela.iloc[::-1]
+    # Datas inválidas continuam no fim
+    validas = invertida[coluna].notna()
+    return pd.concat([invertida[validas], invertida[~validas]]).reset_index(drop=True)
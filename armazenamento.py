@@ -0,0 +1,38 @@
+import os
+import importlib
+
+# Backends disponíveis: módulos com carregar_dados() / salvar_dados(df_produtos, df_vendas, df_financeiro)
+BACKENDS = {
+    "excel": "excel_io",
+    "sqlite": "sqlite_io",
+}
+
+def nome_backend():
+    """Nome do backend escolhido pela variável de ambiente ESTOQUE_BACKEND (padrão: excel)"""
+    nome = os.environ.get("ESTOQUE_BACKEND", "excel").strip().lower()
+    if nome not in BACKENDS:
+        raise Exception(f"Backend de armazenamento desconhecido: {nome}")
+    return nome
+
+def obter_backend():
+    """Retorna o módulo do backend de armazenamento configurado"""
+    return importlib.import_module(BACKENDS[nome_backend()])
+
+def carregar_dados():
+    """Carrega produtos, vendas e financeiro pelo backend configurado"""
+    return obter_backend().carregar_dados()
+
+def salvar_dados(df_produtos, df_vendas, df_financeiro):
+    """Salva produtos, vendas e financeiro pelo backend configurado"""
+    obter_backend().salvar_dados(df_produtos, df_vendas, df_financeiro)
+
+def acompanhar(inventario, financeiro):
+    """Liga a gravação incremental, se o backend tiver uma.
+
+    Retorna o objeto de persistência (com `fechar()`) quando cada mudança já é
+    gravada ao acontecer, ou None quando é preciso salvar tudo ao fechar.
+    """
+    backend = obter_backend()
+    if not hasattr(backend, "acompanhar"):
+        return None
+    return backend.acompanhar(inventario, financeiro)
@@ -0,0 +1,5 @@
+"""Benchmarks de Inventario, Financeiro e excel_io com lojas sintéticas.
+
+    python -m benchmarks --produtos 500 --vendas 50000 --anos 3 --saida base.json
+    python -m benchmarks --produtos 500 --vendas 50000 --anos 3 --comparar base.json
+"""
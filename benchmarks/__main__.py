@@ -0,0 +1,117 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+import pandas as pd
+from benchmarks.gerador import gerar_loja
+from benchmarks.casos import CASOS, silencioso
+
+def resumir(tempos):
+    """Estatísticas (em ms) das durações de um caso"""
+    return {
+        "repeticoes": len(tempos),
+        "mediana_ms": statistics.median(tempos) * 1000,
+        "min_ms": min(tempos) * 1000,
+        "max_ms": max(tempos) * 1000,
+        "media_ms": statistics.fmean(tempos) * 1000,
+    }
+
+def versao_git():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def comparar(atual, base, limiar):
+    """Imprime a variação das medianas contra `base`; devolve os casos que pioraram além de `limiar` %"""
+    if base["parametros"] != atual["parametros"]:
+        print("Aviso: a referência foi medida com outros parâmetros de loja")
+    print(f"\n{'caso':<36}{'referência':>12}{'atual':>12}{'variação':>10}")
+    piores = []
+    for nome, resultado in atual["resultados"].items():
+        referencia = base["resultados"].get(nome)
+        if referencia is None:
+            print(f"{nome:<36}{'-':>12}{resultado['mediana_ms']:>10.2f}ms{'novo':>10}")
+            continue
+        variacao = (resultado["mediana_ms"] / referencia["mediana_ms"] - 1) * 100
+        marca = ""
+        if variacao > limiar:
+            marca = "  mais lento"
+            piores.append(nome)
+        elif variacao < -limiar:
+            marca = "  mais rápido"
+        print(f"{nome:<36}{referencia['mediana_ms']:>10.2f}ms{resultado['mediana_ms']:>10.2f}ms{variacao:>+9.1f}%{marca}")
+    return piores
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks", description="Mede os caminhos críticos com uma loja sintética.")
+    parser.add_argument("--produtos", type=int, default=500)
+    parser.add_argument("--vendas", type=int, default=50000)
+    parser.add_argument("--anos", type=float, default=3)
+    parser.add_argument("--media-itens", type=float, default=2.0, help="média de itens por venda (1 + Poisson)")
+    parser.add_argument("--despesas-por-dia", type=int, default=2)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--repeticoes", type=int, default=5, help="chamadas por caso de consulta/E/S")
+    parser.add_argument("--operacoes", type=int, default=200, help="vendas por caso de registro")
+    parser.add_argument("--casos", nargs="+", choices=list(CASOS), help="casos a rodar (padrão: todos)")
+    parser.add_argument("--rapido", action="store_true", help="pula os casos que escrevem o xlsx")
+    parser.add_argument("--saida", help="grava os resultados neste JSON")
+    parser.add_argument("--comparar", help="JSON de referência (ex.: gerado antes da mudança)")
+    parser.add_argument("--limiar", type=float, default=10.0, help="piora (%%) da mediana considerada regressão")
+    config = parser.parse_args(argv)
+
+    parametros = {
+        "produtos": config.produtos,
+        "vendas": config.vendas,
+        "anos": config.anos,
+        "media_itens": config.media_itens,
+        "despesas_por_dia": config.despesas_por_dia,
+        "semente": config.semente,
+    }
+    inicio = time.perf_counter()
+    loja = gerar_loja(**parametros)
+    print(
+        f"Loja gerada em {time.perf_counter() - inicio:.2f}s: {len(loja[0])} produtos, "
+        f"{len(loja[1])} linhas de venda, {len(loja[2])} lançamentos"
+    )
+
+    resultados = {}
+    for nome, (caso, lento) in CASOS.items():
+        if (config.casos and nome not in config.casos) or (config.rapido and lento and not config.casos):
+            continue
+        with silencioso():
+            tempos = caso(loja, config)
+        resultados[nome] = resumir(tempos)
+        print(f"{nome:<36}{resultados[nome]['mediana_ms']:>10.2f} ms (mediana de {len(tempos)})")
+
+    atual = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": versao_git(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "parametros": parametros,
+        "linhas": {"produtos": len(loja[0]), "vendas": len(loja[1]), "financeiro": len(loja[2])},
+        "resultados": resultados,
+    }
+    if config.saida:
+        with open(config.saida, "w", encoding="utf-8") as f:
+            json.dump(atual, f, indent=2, ensure_ascii=False)
+        print(f"Resultados gravados em {config.saida}")
+
+    if config.comparar:
+        with open(config.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        piores = comparar(atual, base, config.limiar)
+        if piores:
+            print(f"\n{len(piores)} caso(s) mais lentos que a referência além de {config.limiar:.0f}%")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
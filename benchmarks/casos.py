@@ -0,0 +1,137 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import excel_io
+import snapshot
+from inventario import Inventario
+from financeiro import Financeiro
+
+def montar(loja):
+    """Inventário e financeiro carregados com os DataFrames da loja (índices incluídos)"""
+    df_produtos, df_vendas, df_financeiro = loja
+    inventario = Inventario()
+    financeiro = Financeiro()
+    inventario.df_produtos = df_produtos
+    inventario.df_vendas = df_vendas
+    financeiro.df_financeiro = df_financeiro
+    return inventario, financeiro
+
+def cronometrar(funcao, repeticoes, preparo=None):
+    """Duração (s) de cada chamada; `preparo()` roda antes de cada uma, fora da medição, e devolve os argumentos"""
+    tempos = []
+    for _ in range(repeticoes):
+        argumentos = preparo() if preparo is not None else ()
+        inicio = time.perf_counter()
+        funcao(*argumentos)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+@contextlib.contextmanager
+def silencioso():
+    """Engole os prints do código medido (mensagens de carga e gravação)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+@contextlib.contextmanager
+def diretorio_temporario():
+    """excel_io grava no diretório atual: cada caso de E/S roda numa pasta própria"""
+    anterior = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="benchmark_estoque_") as pasta:
+        os.chdir(pasta)
+        try:
+            yield pasta
+        finally:
+            os.chdir(anterior)
+
+def _salvar_completo(loja):
+    exportacao = excel_io.salvar_dados(*loja)
+    if exportacao is not None:
+        exportacao.join()
+
+# --- Casos: cada um recebe a loja e a configuração e devolve as durações ---
+
+def montar_indices(loja, config):
+    return cronometrar(lambda: montar(loja), config.repeticoes)
+
+def registrar_venda(loja, config):
+    inventario, _ = montar(loja)
+    inventario.df_produtos["estoque"] = 10 ** 9  # estoque não é o que se mede aqui
+    rng = np.random.default_rng(config.semente)
+    nomes = iter(rng.choice(inventario.df_produtos.index.to_numpy(), config.operacoes))
+    return cronometrar(inventario.registrar_venda, config.operacoes, preparo=lambda: (next(nomes), 1))
+
+def finalizar_venda_carrinho(loja, config):
+    inventario, _ = montar(loja)
+    inventario.df_produtos["estoque"] = 10 ** 9
+    rng = np.random.default_rng(config.semente)
+    nomes = inventario.df_produtos.index.to_numpy()
+
+    def encher_carrinho():
+        for nome in rng.choice(nomes, 1 + rng.poisson(max(config.media_itens - 1, 0))):
+            inventario.adicionar_ao_carrinho(nome, 1)
+        return ()
+
+    return cronometrar(inventario.finalizar_venda_carrinho, config.operacoes, preparo=encher_carrinho)
+
+def obter_vendas_agrupadas(loja, config):
+    inventario, _ = montar(loja)
+    return cronometrar(inventario.obter_vendas_agrupadas, config.repeticoes)
+
+def filtrar_vendas_por_data_mes(loja, config):
+    inventario, _ = montar(loja)
+    ultima = inventario.df_vendas["data_dt"].max()
+    return cronometrar(lambda: inventario.filtrar_vendas_por_data(mes=ultima.month, ano=ultima.year), config.repeticoes)
+
+def filtrar_vendas_por_data_produto(loja, config):
+    inventario, _ = montar(loja)
+    mais_vendido = inventario.df_vendas["produto"].value_counts().index[0]
+    return cronometrar(lambda: inventario.filtrar_vendas_por_data(produto=mais_vendido), config.repeticoes)
+
+def obter_resumo_diario_completo(loja, config):
+    _, financeiro = montar(loja)
+    # Um lançamento novo antes de cada chamada invalida a tabela diária em cache
+    return cronometrar(
+        financeiro.obter_resumo_diario_completo, config.repeticoes,
+        preparo=lambda: financeiro.adicionar_entrada("Benchmark", 1.0) or ()
+    )
+
+def salvar_dados(loja, config):
+    with diretorio_temporario(), silencioso():
+        return cronometrar(lambda: excel_io.salvar_dados(*loja, exportar_xlsx=False), config.repeticoes)
+
+def salvar_dados_xlsx(loja, config):
+    with diretorio_temporario(), silencioso():
+        return cronometrar(lambda: _salvar_completo(loja), config.repeticoes)
+
+def carregar_dados(loja, config):
+    with diretorio_temporario(), silencioso():
+        _salvar_completo(loja)
+        return cronometrar(excel_io.carregar_dados, config.repeticoes)
+
+def carregar_dados_xlsx(loja, config):
+    with diretorio_temporario(), silencioso():
+        _salvar_completo(loja)
+        # Sem snapshot a carga lê o xlsx (e recria o snapshot)
+        return cronometrar(
+            excel_io.carregar_dados, config.repeticoes,
+            preparo=lambda: shutil.rmtree(snapshot.DIRETORIO_SNAPSHOT, ignore_errors=True) or ()
+        )
+
+# Nome -> (função, lento): os casos lentos (xlsx) podem ser pulados com --rapido
+CASOS = {
+    "montar_indices": (montar_indices, False),
+    "registrar_venda": (registrar_venda, False),
+    "finalizar_venda_carrinho": (finalizar_venda_carrinho, False),
+    "obter_vendas_agrupadas": (obter_vendas_agrupadas, False),
+    "filtrar_vendas_por_data[mes]": (filtrar_vendas_por_data_mes, False),
+    "filtrar_vendas_por_data[produto]": (filtrar_vendas_por_data_produto, False),
+    "obter_resumo_diario_completo": (obter_resumo_diario_completo, False),
+    "salvar_dados": (salvar_dados, False),
+    "carregar_dados": (carregar_dados, True),
+    "salvar_dados[xlsx]": (salvar_dados_xlsx, True),
+    "carregar_dados[xlsx]": (carregar_dados_xlsx, True),
+}
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
+from utils import FORMATO_DATA
+
+def gerar_loja(produtos=200, vendas=20000, anos=2, media_itens=2.0, despesas_por_dia=2, semente=42, fim=None):
+    """Gera (df_produtos, df_vendas, df_financeiro) de uma loja sintética.
+
+    As vendas ficam espalhadas em ordem cronológica pelos `anos` que terminam
+    em `fim` (padrão: hoje); cada venda tem 1 + Poisson(media_itens - 1)
+    itens e os produtos seguem uma popularidade decrescente (poucos vendem
+    muito). O financeiro tem uma entrada por venda e `despesas_por_dia`
+    saídas por dia. Mesma `semente`, mesma loja.
+    """
+    rng = np.random.default_rng(semente)
+    fim = fim or date.today()
+    dias_periodo = max(int(anos * 365), 1)
+    inicio = fim - timedelta(days=dias_periodo - 1)
+
+    # Produtos
+    nomes = [f"produto {i:05d}" for i in range(produtos)]
+    precos = rng.uniform(1, 200, produtos).round(2)
+    df_produtos = pd.DataFrame({
+        "preco": precos,
+        "estoque": rng.integers(100, 1000, produtos),
+        "id": np.arange(produtos, dtype=np.int64),
+    }, index=nomes)
+
+    # Vendas: dia de cada venda e itens por venda
+    dias = np.sort(rng.integers(0, dias_periodo, vendas))
+    itens = 1 + rng.poisson(max(media_itens - 1, 0), vendas)
+    venda_de_cada_linha = np.repeat(np.arange(vendas), itens)
+    n_linhas = len(venda_de_cada_linha)
+
+    popularidade = 1 / np.arange(1, produtos + 1)
+    produto = rng.choice(produtos, n_linhas, p=popularidade / popularidade.sum())
+    quantidade = 1 + rng.poisson(1, n_linhas)
+    desconto = rng.choice([0.0, 0.05, 0.1], n_linhas, p=[0.8, 0.15, 0.05])
+    valor_venda = (precos[produto] * (1 - desconto) * quantidade).round(2)
+
+    # Datas dd/mm/aaaa formatadas uma vez por dia do período
+    datas_periodo = pd.date_range(inicio, periods=dias_periodo, freq="D").strftime(FORMATO_DATA).to_numpy()
+    data_venda = datas_periodo[dias]
+    venda_id = np.array([f"{i:08x}" for i in range(vendas)])
+
+    df_vendas = pd.DataFrame({
+        "data": data_venda[venda_de_cada_linha],
+        "produto": np.asarray(nomes, dtype=object)[produto],
+        "produto_id": produto.astype(np.int64),
+        "quantidade": quantidade.astype(np.int64),
+        "valor_venda": valor_venda,
+        "venda_id": venda_id[venda_de_cada_linha],
+    })
+
+    # Financeiro: uma entrada por venda e despesas diárias
+    total_venda = np.bincount(venda_de_cada_linha, weights=valor_venda, minlength=vendas)
+    entradas = pd.DataFrame({
+        "data": data_venda,
+        "tipo": "entrada",
+        "descricao": np.char.add("Venda - ID: ", venda_id),
+        "valor": total_venda.round(2),
+    })
+    dias_despesa = np.repeat(np.arange(dias_periodo), despesas_por_dia)
+    saidas = pd.DataFrame({
+        "data": datas_periodo[dias_despesa],
+        "tipo": "saida",
+        "descricao": "Despesa",
+        "valor": -rng.uniform(5, 300, len(dias_despesa)).round(2),
+    })
+    # Lançamentos em ordem cronológica, como numa loja de verdade
+    ordem = np.argsort(np.concatenate([dias, dias_despesa]), kind="stable")
+    df_financeiro = pd.concat([entradas, saidas], ignore_index=True).take(ordem).reset_index(drop=True)
+
+    return df_produtos, df_vendas, df_financeiro
@@ -0,0 +1,73 @@
+class ItemCarrinho:
+    """Linha do carrinho; `item['campo']` continua funcionando como no antigo dict"""
+
+    __slots__ = ("produto", "quantidade", "desconto", "preco_unitario", "preco_com_desconto", "total_item")
+
+    def __init__(self, produto, quantidade, desconto, preco_unitario):
+        self.produto = produto
+        self.quantidade = quantidade
+        self.desconto = desconto
+        self.preco_unitario = preco_unitario
+        self.preco_com_desconto = preco_unitario * (1 - desconto)
+        self.total_item = self.preco_com_desconto * quantidade
+
+    def __getitem__(self, campo):
+        if campo not in self.__slots__:
+            raise KeyError(campo)
+        return getattr(self, campo)
+
+    def __repr__(self):
+        return f"ItemCarrinho({self.produto!r}, {self.quantidade}, desconto={self.desconto})"
+
+class Carrinho:
+    """Itens de uma venda em pacote, com quantidade reservada por produto e total corrente.
+
+    Reservas e total são atualizados a cada inclusão/remoção, então conferir
+    o estoque ou mostrar o total não percorre o carrinho.
+    """
+
+    __slots__ = ("_itens", "_reservado", "total")
+
+    def __init__(self):
+        self._itens = []
+        self._reservado = {}  # produto -> quantidade no carrinho
+        self.total = 0.0
+
+    def adicionar(self, item):
+        self._itens.append(item)
+        self._reservado[item.produto] = self._reservado.get(item.produto, 0) + item.quantidade
+        self.total += item.total_item
+        return item
+
+    def remover(self, indice):
+        item = self._itens.pop(indice)
+        restante = self._reservado[item.produto] - item.quantidade
+        if restante:
+            self._reservado[item.produto] = restante
+        else:
+            del self._reservado[item.produto]
+        # Sem itens, zera de vez (evita resíduo de arredondamento)
+        self.total = self.total - item.total_item if self._itens else 0.0
+        return item
+
+    def limpar(self):
+        self._itens.clear()
+        self._reservado.clear()
+        self.total = 0.0
+
+    def reservado(self, produto):
+        """Quantidade do produto já no carrinho"""
+        return self._reservado.get(produto, 0)
+
+    def reservas(self):
+        """Cópia do mapa produto -> quantidade reservada"""
+        return dict(self._reservado)
+
+    def __len__(self):
+        return len(self._itens)
+
+    def __iter__(self):
+        return iter(self._itens)
+
+    def __getitem__(self, indice):
+        return self._itens[indice]
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+class Catalogo:
+    """Ids inteiros estáveis para os produtos (nome <-> id).
+
+    As vendas guardam o id do produto, então o histórico não depende do
+    nome. Um produto removido continua no catálogo para que suas vendas
+    antigas ainda tenham nome. Produtos sem id gravado (dados antigos)
+    recebem o menor id livre, o que dá os mesmos ids a cada carga.
+    """
+
+    def __init__(self):
+        self._ids = {}    # nome -> id
+        self._nomes = {}  # id -> nome
+        self._livre = 0  # nenhum id abaixo deste está livre
+
+    def registrar(self, nome, id_produto=None):
+        """Id do produto `nome`, criando um novo (ou usando `id_produto`) se ainda não existir"""
+        if nome in self._ids:
+            return self._ids[nome]
+        if id_produto is None or pd.isna(id_produto) or int(id_produto) in self._nomes:
+            while self._livre in self._nomes:
+                self._livre += 1
+            id_produto = self._livre
+        id_produto = int(id_produto)
+        self._ids[nome] = id_produto
+        self._nomes[id_produto] = nome
+        return id_produto
+
+    def obter_id(self, nome):
+        """Id do produto, ou None se o nome não está no catálogo"""
+        return self._ids.get(nome)
+
+    def nome(self, id_produto):
+        return self._nomes.get(int(id_produto))
+
+    def __contains__(self, nome):
+        return nome in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def codificar(self, nomes):
+        """Ids (int64) para uma coluna de nomes, registrando os nomes novos"""
+        nomes = pd.Series(nomes, dtype=object)
+        unicos = pd.unique(nomes.dropna())
+        mapa = {nome: self.registrar(nome) for nome in unicos}
+        return nomes.map(mapa).fillna(-1).to_numpy(dtype=np.int64)
@@ -0,0 +1,42 @@
+import threading
+import time
+from contextlib import contextmanager
+
+class Cronometro:
+    """Tempos das fases da inicialização, para acompanhar regressões.
+
+    `marcar` fecha a fase que vai do marco anterior até agora; `medir` e
+    `registrar` anotam um trecho à parte (ex.: a carga na thread de trabalho).
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self._ultimo = self.inicio
+        self.fases = []  # (fase, duração em s, fim em s desde o início)
+        self._lock = threading.Lock()
+
+    def registrar(self, fase, duracao):
+        with self._lock:
+            self.fases.append((fase, duracao, time.perf_counter() - self.inicio))
+
+    def marcar(self, fase):
+        agora = time.perf_counter()
+        with self._lock:
+            self.fases.append((fase, agora - self._ultimo, agora - self.inicio))
+            self._ultimo = agora
+
+    @contextmanager
+    def medir(self, fase):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(fase, time.perf_counter() - inicio)
+
+    def relatorio(self, titulo="Tempos de inicialização"):
+        with self._lock:
+            fases = list(self.fases)
+        linhas = [f"{titulo} (ms):"]
+        for fase, duracao, fim in fases:
+            linhas.append(f"  {fase:<36}{duracao * 1000:9.1f}   (aos {fim * 1000:.0f})")
+        return "\n".join(linhas)
@@ -0,0 +1,145 @@
+"""Linha de comando sem interface gráfica (não importa tkinter).
+
+    python -m estoque relatorio --mes 10 --ano 2026
+    python -m estoque relatorio --ano 2026 --saida relatorio.xlsx
+    python -m estoque importar vendas.csv
+"""
+import argparse
+import os
+import sys
+import time
+import instrumentacao
+
+SECOES = ("financeiro", "vendas", "produtos", "estoque")
+
+def carregar():
+    """Inventário e financeiro com os dados do armazenamento configurado"""
+    import armazenamento
+    instrumentacao.instrumentar_dados()
+    from inventario import Inventario
+    from financeiro import Financeiro
+
+    inventario = Inventario()
+    financeiro = Financeiro()
+    inventario.df_produtos, inventario.df_vendas, financeiro.df_financeiro = armazenamento.carregar_dados()
+    return inventario, financeiro
+
+def montar_relatorio(inventario, financeiro, dia=None, mes=None, ano=None, produto=None):
+    """Seções do relatório (nome -> DataFrame) para o período dado"""
+    from indices import mascara_datas
+    from utils import converter_datas
+
+    # Financeiro: os dias do filtro (com --dia, ou mês e ano), ou os meses do período.
+    # Os dias passam pela mesma máscara de dia/mês/ano que o filtro das vendas usa
+    if dia or (mes and ano):
+        resumo = financeiro.obter_resumo_diario_completo()
+        filtro = mascara_datas(converter_datas(resumo["data"]), dia, mes, ano)
+        resumo_financeiro = resumo[filtro].reset_index(drop=True)
+    else:
+        resumo_financeiro = financeiro.obter_resumo_mensal(mes, ano)
+
+    vendas = inventario.filtrar_vendas_agrupadas(dia, mes, ano, produto)
+    linhas = inventario.filtrar_vendas_por_data(dia, mes, ano, produto)
+    por_produto = (
+        linhas.assign(produto=linhas["produto"].astype(object))
+        .groupby("produto")
+        .agg(quantidade=("quantidade", "sum"), valor=("valor_venda", "sum"), vendas=("venda_id", "nunique"))
+        .sort_values("valor", ascending=False)
+        .reset_index()
+    )
+
+    estoque = inventario.df_produtos[["preco", "estoque"]].sort_values("estoque")
+    estoque.index.name = "produto"
+
+    return {
+        "financeiro": resumo_financeiro,
+        "vendas": vendas.reset_index(drop=True),
+        "produtos": por_produto,
+        "estoque": estoque.reset_index(),
+    }
+
+def exportar(secoes, saida):
+    """Grava as seções num .xlsx (uma aba por seção) ou em CSVs dentro da pasta `saida`"""
+    import pandas as pd
+
+    if saida.lower().endswith(".xlsx"):
+        with pd.ExcelWriter(saida, engine="openpyxl", mode="w") as writer:
+            for nome, df in secoes.items():
+                df.to_excel(writer, sheet_name=nome.capitalize(), index=False)
+        return [saida]
+    os.makedirs(saida, exist_ok=True)
+    arquivos = []
+    for nome, df in secoes.items():
+        caminho = os.path.join(saida, f"{nome}.csv")
+        df.to_csv(caminho, index=False)
+        arquivos.append(caminho)
+    return arquivos
+
+def imprimir(secoes, periodo):
+    import pandas as pd
+
+    print(f"Relatório {periodo}")
+    if "vendas" in secoes:
+        vendas = secoes["vendas"]
+        print(f"Vendas: {len(vendas)}  |  Itens: {int(vendas['quantidade'].sum())}  |  Total: R${vendas['lucro'].sum():.2f}")
+    with pd.option_context("display.max_rows", 50, "display.width", 120):
+        for nome, df in secoes.items():
+            if nome == "vendas":
+                continue  # Uma linha por venda: só o total acima (a lista completa sai com --saida)
+            print(f"\n== {nome.capitalize()} ==")
+            print(df.to_string(index=False) if not df.empty else "(sem dados)")
+
+def comando_relatorio(args):
+    inicio = time.perf_counter()
+    inventario, financeiro = carregar()
+    secoes = montar_relatorio(inventario, financeiro, args.dia, args.mes, args.ano, args.produto)
+    if args.secoes:
+        secoes = {nome: secoes[nome] for nome in args.secoes}
+
+    periodo = "/".join(str(v) for v in (args.dia, args.mes, args.ano) if v) or "completo"
+    if args.produto:
+        periodo += f" (produto: {args.produto})"
+    if args.saida:
+        for caminho in exportar(secoes, args.saida):
+            print(f"Relatório gravado em {caminho}")
+    else:
+        imprimir(secoes, periodo)
+    print(f"\nGerado em {time.perf_counter() - inicio:.2f}s", file=sys.stderr)
+    return 0
+
+def comando_importar(args):
+    import importar_vendas
+    argv = list(args.arquivos)
+    if args.recusadas:
+        argv += ["--recusadas", args.recusadas]
+    return importar_vendas.main(argv)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="estoque", description="Relatórios e importação sem abrir a interface.")
+    parser.add_argument("--instrumentar", action="store_true", help="mede as chamadas (log em instrumentacao.log)")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    relatorio = comandos.add_parser("relatorio", aliases=["report"], help="resumo de vendas, financeiro e estoque")
+    relatorio.add_argument("--dia", type=int)
+    relatorio.add_argument("--mes", type=int)
+    relatorio.add_argument("--ano", type=int)
+    relatorio.add_argument("--produto", help="só vendas que contêm este produto")
+    relatorio.add_argument("--secoes", nargs="+", choices=SECOES, help="seções a incluir (padrão: todas)")
+    relatorio.add_argument("--saida", help="arquivo .xlsx ou pasta para CSVs; sem ela o relatório é impresso")
+    relatorio.set_defaults(funcao=comando_relatorio)
+
+    importar = comandos.add_parser("importar", aliases=["import"], help="importa vendas de arquivos CSV")
+    importar.add_argument("arquivos", nargs="+")
+    importar.add_argument("--recusadas", help="grava as linhas recusadas, com o motivo, neste CSV")
+    importar.set_defaults(funcao=comando_importar)
+
+    args = parser.parse_args(argv)
+    if args.instrumentar:
+        instrumentacao.ativar()
+    codigo = args.funcao(args)
+    if instrumentacao.ativa():
+        print(instrumentacao.relatorio(), file=sys.stderr)
+    return codigo
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,47 @@
+import functools
+import threading
+
+# Segurada por toda mudança de dados junto com o aviso dela, e pela compactação
+# do journal ao copiar os dados e selar o arquivo: assim nenhuma mudança fica
+# no retrato sem o seu registro ter entrado no trecho selado (ou vice-versa)
+TRAVA_ESCRITA = threading.RLock()
+
+def escrita(metodo):
+    """Roda o método (mudança + avisos aos ouvintes) com a TRAVA_ESCRITA"""
+    @functools.wraps(metodo)
+    def embrulhado(*args, **kwargs):
+        with TRAVA_ESCRITA:
+            return metodo(*args, **kwargs)
+    return embrulhado
+
+class Observavel:
+    """Mixin simples de notificação de mudanças linha a linha.
+
+    Ouvintes recebem `(evento, dados)`, onde `dados` é um dict. Eventos usados:
+
+    - "produto_atualizado": nome, preco, estoque, id, estoque_minimo
+    - "produto_removido": nome
+    - "estoque_baixo": nome, estoque, estoque_minimo (o produto acabou de chegar ao mínimo)
+    - "vendas_registradas": linhas (lista de dicts no formato de df_vendas)
+    - "lancamentos_registrados": linhas (lista de dicts no formato de df_financeiro)
+    """
+
+    def _ouvintes_lista(self):
+        if "_ouvintes" not in self.__dict__:
+            self._ouvintes = []
+        return self._ouvintes
+
+    def inscrever(self, ouvinte):
+        """Registra uma função chamada a cada mudança"""
+        self._ouvintes_lista().append(ouvinte)
+        return ouvinte
+
+    def cancelar_inscricao(self, ouvinte):
+        """Remove um ouvinte registrado"""
+        lista = self._ouvintes_lista()
+        if ouvinte in lista:
+            lista.remove(ouvinte)
+
+    def _notificar(self, evento, **dados):
+        for ouvinte in list(self._ouvintes_lista()):
+            ouvinte(evento, dados)
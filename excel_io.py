@@ -2,10 +2,37 @@ import pandas as pd
 import os
 import shutil
 from datetime import datetime
+import time
+import threading
+from openpyxl import load_workbook
+import eventos
+import journal
+import snapshot
 
 ARQUIVO_DADOS = "dados.xlsx"
 ARQUIVO_BACKUP = "dados_backup.xlsx"  # Backup fixo
 
+# Colunas de cada planilha (Produtos tem ainda o nome como índice)
+COLUNAS_PRODUTOS = ["preco", "estoque", "id", "estoque_minimo"]
+COLUNAS_VENDAS = ["data", "produto", "produto_id", "quantidade", "valor_venda", "venda_id"]
+COLUNAS_FINANCEIRO = ["data", "tipo", "descricao", "valor"]
+
+# Tipos das colunas numéricas das planilhas, aplicados já na leitura
+TIPOS_COLUNAS = {
+    "id": "int64",
+    "produto_id": "int64",
+    "preco": "float64",
+    "estoque": "int64",
+    "estoque_minimo": "int64",
+    "quantidade": "int64",
+    "valor_venda": "float64",
+    "lucro": "float64",
+    "valor": "float64",
+}
+
+# Impede duas exportações simultâneas do mesmo xlsx
+_lock_exportacao = threading.Lock()
+
 def criar_backup():
     """Cria backup do arquivo antes de modificar (overwrite)"""
     if os.path.exists(ARQUIVO_DADOS):
@@ -15,144 +42,338 @@ def criar_backup():
         except Exception as e:
             print(f"Erro ao criar backup: {e}")
 
-def carregar_dados():
+def journal_ativo():
+    """O journal fica ligado a menos que ESTOQUE_JOURNAL=0"""
+    return os.environ.get("ESTOQUE_JOURNAL", "1") != "0"
+
+def carregar_dados(arquivo=None):
+    """Carrega dados do Excel e reproduz o journal de mudanças ainda não salvas"""
+    arquivo = arquivo or ARQUIVO_DADOS
+    if arquivo != ARQUIVO_DADOS:
+        return _carregar_planilha(arquivo)
+
+    checkpoint = None
+    if snapshot.fresco(ARQUIVO_DADOS):
+        inicio = time.perf_counter()
+        df_produtos, df_vendas, df_financeiro = snapshot.carregar()
+        print(f"Snapshot carregado em {(time.perf_counter() - inicio) * 1000:.1f} ms "
+              f"({len(df_produtos)} produtos, {len(df_vendas)} vendas, {len(df_financeiro)} lançamentos)")
+        # Último registro do journal incluído, gravado junto com o snapshot
+        checkpoint = snapshot.seq_journal()
+    elif not os.path.exists(ARQUIVO_DADOS):
+        df_produtos, df_vendas, df_financeiro = _carregar_planilha(ARQUIVO_DADOS)
+    else:
+        try:
+            df_produtos, df_vendas, df_financeiro = _ler_tabelas(ARQUIVO_DADOS)
+        except Exception as e:
+            print(f"Erro geral ao carregar dados: {e}")
+            # xlsx ilegível: o snapshot anterior não é substituído por tabelas vazias
+            if snapshot.disponivel():
+                print(f"Aviso: {ARQUIVO_DADOS} não pôde ser lido; usando o último snapshot")
+                df_produtos, df_vendas, df_financeiro = snapshot.carregar()
+                checkpoint = snapshot.seq_journal()
+            else:
+                df_produtos, df_vendas, df_financeiro = _tabelas_vazias()
+        else:
+            if snapshot.exportacao_pendente():
+                print(f"Aviso: {ARQUIVO_DADOS} foi editado fora do app; alterações do snapshot não exportadas foram descartadas")
+            # Guarda o que acabou de ser lido para a próxima abertura ser rápida.
+            # O xlsx vale até o checkpoint gravado depois da última compactação
+            checkpoint = journal.ler_checkpoint()
+            snapshot.salvar(df_produtos, df_vendas, df_financeiro, ARQUIVO_DADOS, de_xlsx=True, seq_journal=checkpoint)
+
+    if journal_ativo():
+        df_produtos, df_vendas, df_financeiro, registros = journal.reproduzir(
+            df_produtos, df_vendas, df_financeiro, checkpoint=checkpoint
+        )
+        if registros:
+            # Linhas do journal vêm do JSON (ex.: estoque 5.0); voltam aos tipos das planilhas
+            df_produtos, df_vendas, df_financeiro = (
+                _tipar_dataframe(df) for df in (df_produtos, df_vendas, df_financeiro)
+            )
+    return df_produtos, df_vendas, df_financeiro
+
+def acompanhar(inventario, financeiro):
+    """Grava cada mudança no journal e compacta no snapshot/dados.xlsx em segundo plano"""
+    if not journal_ativo():
+        return None
+
+    def obter_dados():
+        return inventario.df_produtos.copy(), inventario.df_vendas.copy(), financeiro.df_financeiro.copy()
+
+    registro = journal.Journal(checkpoint=snapshot.seq_journal())
+    registro.configurar_compactacao(obter_dados, salvar_dados, trava=eventos.TRAVA_ESCRITA)
+    inventario.inscrever(registro)
+    financeiro.inscrever(registro)
+    # Sobras de uma sessão anterior (ex.: queda) já foram reproduzidas; dobra no xlsx
+    if registro.registros:
+        registro.compactar_em_segundo_plano()
+    return registro
+
+def _carregar_planilha(arquivo):
     """Carrega dados do Excel ou cria estrutura inicial se não existir"""
     
     # Se o arquivo não existir, cria a estrutura inicial
-    if not os.path.exists(ARQUIVO_DADOS):
+    if not os.path.exists(arquivo):
         print("Arquivo não encontrado. Criando estrutura inicial...")
-        df_produtos = pd.DataFrame(columns=["preco", "estoque"])
-        df_vendas = pd.DataFrame(columns=["data", "produto", "quantidade", "valor_venda", "venda_id"])
-        df_financeiro = pd.DataFrame(columns=["data", "tipo", "descricao", "valor"])
+        df_produtos = pd.DataFrame(columns=COLUNAS_PRODUTOS)
+        df_vendas = pd.DataFrame(columns=COLUNAS_VENDAS)
+        df_financeiro = pd.DataFrame(columns=COLUNAS_FINANCEIRO)
         
         # Salva a estrutura inicial
         salvar_dados(df_produtos, df_vendas, df_financeiro)
         return df_produtos, df_vendas, df_financeiro
     
     try:
-        # Carrega produtos
-        try:
-            df_produtos = pd.read_excel(ARQUIVO_DADOS, sheet_name="Produtos", index_col=0)
-            print(f"Produtos carregados: {len(df_produtos)} itens")
-        except Exception as e:
-            print(f"Erro ao carregar produtos: {e}")
-            df_produtos = pd.DataFrame(columns=["preco", "estoque"])
-        
-        # Carrega vendas
-        try:
-            df_vendas = pd.read_excel(ARQUIVO_DADOS, sheet_name="Vendas")
-            print(f"Vendas carregadas: {len(df_vendas)} registros")
-            
-            # Verifica se existe coluna "lucro" e converte para "valor_venda"
-            if "lucro" in df_vendas.columns and "valor_venda" not in df_vendas.columns:
-                df_vendas = df_vendas.rename(columns={"lucro": "valor_venda"})
-            
-            # Garante que todas as colunas necessárias existem
-            colunas_necessarias = ["data", "produto", "quantidade", "valor_venda", "venda_id"]
-            for col in colunas_necessarias:
-                if col not in df_vendas.columns:
-                    df_vendas[col] = None
-            
-            # Reordena colunas para consistência
-            df_vendas = df_vendas[colunas_necessarias]
-            
-        except Exception as e:
-            print(f"Erro ao carregar vendas: {e}")
-            df_vendas = pd.DataFrame(columns=["data", "produto", "quantidade", "valor_venda", "venda_id"])
-        
-        # Carrega financeiro
-        try:
-            # Verifica se existe a planilha "Financeiro" ou "Gastos" (compatibilidade)
-            try:
-                df_financeiro = pd.read_excel(ARQUIVO_DADOS, sheet_name="Financeiro")
-            except:
-                try:
-                    df_financeiro = pd.read_excel(ARQUIVO_DADOS, sheet_name="Gastos")
-                except:
-                    df_financeiro = pd.DataFrame(columns=["data", "tipo", "descricao", "valor"])
-            
-            print(f"Financeiro carregado: {len(df_financeiro)} registros")
-            
-            # Garante que todas as colunas necessárias existem no financeiro
-            colunas_financeiro = ["data", "tipo", "descricao", "valor"]
-            for col in colunas_financeiro:
-                if col not in df_financeiro.columns:
-                    df_financeiro[col] = None
-            
-            # Reordena colunas para consistência
-            df_financeiro = df_financeiro[colunas_financeiro]
-            
-        except Exception as e:
-            print(f"Erro ao carregar financeiro: {e}")
-            df_financeiro = pd.DataFrame(columns=["data", "tipo", "descricao", "valor"])
-
-        return df_produtos, df_vendas, df_financeiro
-        
+        return _ler_tabelas(arquivo)
     except Exception as e:
         print(f"Erro geral ao carregar dados: {e}")
         # Em caso de erro, retorna DataFrames vazios
-        return (
-            pd.DataFrame(columns=["preco", "estoque"]),
-            pd.DataFrame(columns=["data", "produto", "quantidade", "valor_venda", "venda_id"]),
-            pd.DataFrame(columns=["data", "tipo", "descricao", "valor"])
-        )
+        return _tabelas_vazias()
+
+def _tabelas_vazias():
+    return (
+        pd.DataFrame(columns=COLUNAS_PRODUTOS),
+        pd.DataFrame(columns=COLUNAS_VENDAS),
+        pd.DataFrame(columns=COLUNAS_FINANCEIRO)
+    )
+
+def _ler_tabelas(arquivo):
+    """Lê as três tabelas do xlsx; se o arquivo não puder ser lido, o erro sobe para quem chamou"""
+    # Abre a pasta de trabalho uma única vez e lê todas as planilhas
+    planilhas = ler_planilhas(arquivo)
 
-def salvar_dados(df_produtos, df_vendas, df_financeiro):
-    """Salva dados no Excel com verificações de segurança"""
+    # Carrega produtos
+    try:
+        df_produtos = planilhas["Produtos"]
+        df_produtos = df_produtos.set_index(df_produtos.columns[0])
+        df_produtos.index.name = None
+        print(f"Produtos carregados: {len(df_produtos)} itens")
+    except Exception as e:
+        print(f"Erro ao carregar produtos: {e}")
+        df_produtos = pd.DataFrame(columns=COLUNAS_PRODUTOS)
     
+    # Carrega vendas
     try:
-        # Cria backup antes de salvar
-        criar_backup()
+        df_vendas = planilhas["Vendas"]
+        print(f"Vendas carregadas: {len(df_vendas)} registros")
         
-        # Prepara DataFrames para salvar
-        # Produtos - sempre mantém estrutura mesmo se vazio
-        if df_produtos.empty:
-            df_produtos_salvar = pd.DataFrame(columns=["preco", "estoque"])
-        else:
-            df_produtos_salvar = df_produtos.copy()
-            colunas_produtos = ["preco", "estoque"]
-            for col in colunas_produtos:
-                if col not in df_produtos_salvar.columns:
-                    df_produtos_salvar[col] = 0
-            df_produtos_salvar = df_produtos_salvar[colunas_produtos]
-        
-        # Vendas - sempre mantém estrutura mesmo se vazio
-        if df_vendas.empty:
-            df_vendas_salvar = pd.DataFrame(columns=["data", "produto", "quantidade", "valor_venda", "venda_id"])
-        else:
-            df_vendas_salvar = df_vendas.copy()
-            colunas_vendas = ["data", "produto", "quantidade", "valor_venda", "venda_id"]
-            for col in colunas_vendas:
-                if col not in df_vendas_salvar.columns:
-                    df_vendas_salvar[col] = None
-            df_vendas_salvar = df_vendas_salvar[colunas_vendas]
-        
-        # Financeiro - sempre mantém estrutura mesmo se vazio
-        if df_financeiro.empty:
-            df_financeiro_salvar = pd.DataFrame(columns=["data", "tipo", "descricao", "valor"])
+        # Verifica se existe coluna "lucro" e converte para "valor_venda"
+        if "lucro" in df_vendas.columns and "valor_venda" not in df_vendas.columns:
+            df_vendas = df_vendas.rename(columns={"lucro": "valor_venda"})
+        
+        # Garante que todas as colunas necessárias existem
+        colunas_necessarias = COLUNAS_VENDAS
+        for col in colunas_necessarias:
+            if col not in df_vendas.columns:
+                df_vendas[col] = None
+        
+        # Reordena colunas para consistência
+        df_vendas = df_vendas[colunas_necessarias]
+        
+    except Exception as e:
+        print(f"Erro ao carregar vendas: {e}")
+        df_vendas = pd.DataFrame(columns=COLUNAS_VENDAS)
+    
+    # Carrega financeiro
+    try:
+        # Verifica se existe a planilha "Financeiro" ou "Gastos" (compatibilidade)
+        if "Financeiro" in planilhas:
+            df_financeiro = planilhas["Financeiro"]
+        elif "Gastos" in planilhas:
+            df_financeiro = planilhas["Gastos"]
         else:
-            df_financeiro_salvar = df_financeiro.copy()
-            colunas_financeiro = ["data", "tipo", "descricao", "valor"]
-            for col in colunas_financeiro:
-                if col not in df_financeiro_salvar.columns:
-                    df_financeiro_salvar[col] = None
-            df_financeiro_salvar = df_financeiro_salvar[colunas_financeiro]
-        
-        # Salva no Excel
-        with pd.ExcelWriter(ARQUIVO_DADOS, engine="openpyxl", mode="w") as writer:
-            df_produtos_salvar.to_excel(writer, sheet_name="Produtos", index=True)
-            df_vendas_salvar.to_excel(writer, sheet_name="Vendas", index=False)
-            df_financeiro_salvar.to_excel(writer, sheet_name="Financeiro", index=False)
+            df_financeiro = pd.DataFrame(columns=COLUNAS_FINANCEIRO)
         
-        print(f"Dados salvos com sucesso!")
-        print(f"- Produtos: {len(df_produtos_salvar)} itens")
-        print(f"- Vendas: {len(df_vendas_salvar)} registros")
-        print(f"- Financeiro: {len(df_financeiro_salvar)} registros")
+        print(f"Financeiro carregado: {len(df_financeiro)} registros")
+        
+        # Garante que todas as colunas necessárias existem no financeiro
+        colunas_financeiro = COLUNAS_FINANCEIRO
+        for col in colunas_financeiro:
+            if col not in df_financeiro.columns:
+                df_financeiro[col] = None
+        
+        # Reordena colunas para consistência
+        df_financeiro = df_financeiro[colunas_financeiro]
+        
+    except Exception as e:
+        print(f"Erro ao carregar financeiro: {e}")
+        df_financeiro = pd.DataFrame(columns=COLUNAS_FINANCEIRO)
+
+    return df_produtos, df_vendas, df_financeiro
+
+def ler_planilhas(arquivo=None):
+    """Lê todas as planilhas numa única passada (openpyxl em modo somente leitura).
+
+    Retorna {nome_da_planilha: DataFrame}, com as colunas numéricas conhecidas
+    já tipadas, e imprime o tempo gasto em cada planilha.
+    """
+    arquivo = arquivo or ARQUIVO_DADOS
+    inicio_total = time.perf_counter()
+    livro = load_workbook(arquivo, read_only=True, data_only=True)
+    planilhas = {}
+    try:
+        for folha in livro.worksheets:
+            inicio = time.perf_counter()
+            planilhas[folha.title] = _montar_dataframe(folha.iter_rows(values_only=True))
+            print(f"Planilha {folha.title}: {len(planilhas[folha.title])} linhas em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    finally:
+        livro.close()
+    print(f"Leitura do {arquivo}: {(time.perf_counter() - inicio_total) * 1000:.1f} ms")
+    return planilhas
+
+def _montar_dataframe(linhas):
+    """Monta o DataFrame coluna a coluna a partir das tuplas de valores da planilha"""
+    cabecalho = next(linhas, None)
+    if cabecalho is None:
+        return pd.DataFrame()
+    # Cabeçalho vazio (ex.: coluna de índice dos produtos) recebe o nome que o pandas usaria
+    nomes = [nome if nome is not None else f"Unnamed: {i}" for i, nome in enumerate(cabecalho)]
+
+    # Linhas totalmente vazias (formatação residual do Excel) são ignoradas
+    registros = [linha for linha in linhas if any(valor is not None for valor in linha)]
+    colunas = list(zip(*registros)) if registros else [()] * len(nomes)
+
+    return pd.DataFrame({
+        nome: _tipar_coluna(nome, valores)
+        for nome, valores in zip(nomes, colunas)
+    })
+
+def _tipar_coluna(nome, valores):
+    """Converte a coluna para o tipo esperado (numéricos conhecidos); demais ficam como estão"""
+    tipo = TIPOS_COLUNAS.get(nome)
+    if tipo is None:
+        return pd.Series(valores, dtype=object if not valores else None)
+    serie = pd.to_numeric(pd.Series(valores, dtype=object), errors="coerce")
+    if tipo == "int64" and serie.notna().all():
+        return serie.astype("int64")
+    return serie.astype("float64")
+
+def salvar_dados(df_produtos, df_vendas, df_financeiro, exportar_xlsx=True, seq_journal=None):
+    """Salva dados no snapshot binário e exporta o Excel com verificações de segurança.
+
+    Com o snapshot disponível (pyarrow instalado), a exportação do xlsx roda
+    numa thread em segundo plano, devolvida para quem quiser aguardá-la;
+    `exportar_xlsx=False` pula essa etapa. Sem pyarrow, o xlsx é escrito na hora.
+    `seq_journal` (compactação do journal) é gravado no meta do snapshot.
+    """
+    
+    try:
+        df_produtos_salvar, df_vendas_salvar, df_financeiro_salvar = _preparar_para_salvar(
+            df_produtos, df_vendas, df_financeiro
+        )
+
+        versao = snapshot.salvar(
+            df_produtos_salvar, df_vendas_salvar, df_financeiro_salvar, ARQUIVO_DADOS, seq_journal=seq_journal
+        )
+        if versao is None:
+            _escrever_xlsx(df_produtos_salvar, df_vendas_salvar, df_financeiro_salvar)
+            return None
+
+        print(f"Snapshot salvo (versão {versao})")
+        if not exportar_xlsx:
+            return None
+        exportacao = threading.Thread(
+            target=_exportar_em_segundo_plano,
+            args=(df_produtos_salvar, df_vendas_salvar, df_financeiro_salvar, versao),
+            name="exportacao-xlsx"
+        )
+        exportacao.start()
+        return exportacao
         
     except Exception as e:
         print(f"Erro ao salvar dados: {e}")
         raise e
 
+def _preparar_para_salvar(df_produtos, df_vendas, df_financeiro):
+    """Garante estrutura e ordem de colunas das três tabelas antes de salvar"""
+    # Produtos - sempre mantém estrutura mesmo se vazio
+    if df_produtos.empty:
+        df_produtos_salvar = pd.DataFrame(columns=COLUNAS_PRODUTOS)
+    else:
+        df_produtos_salvar = df_produtos.copy()
+        colunas_produtos = COLUNAS_PRODUTOS
+        for col in colunas_produtos:
+            if col not in df_produtos_salvar.columns:
+                # Sem id gravado, o catálogo atribui um ao carregar
+                df_produtos_salvar[col] = None if col == "id" else 0
+        df_produtos_salvar = df_produtos_salvar[colunas_produtos]
+    
+    # Vendas - sempre mantém estrutura mesmo se vazio
+    if df_vendas.empty:
+        df_vendas_salvar = pd.DataFrame(columns=COLUNAS_VENDAS)
+    else:
+        df_vendas_salvar = df_vendas.copy()
+        colunas_vendas = COLUNAS_VENDAS
+        for col in colunas_vendas:
+            if col not in df_vendas_salvar.columns:
+                df_vendas_salvar[col] = None
+        df_vendas_salvar = df_vendas_salvar[colunas_vendas]
+    
+    # Financeiro - sempre mantém estrutura mesmo se vazio
+    if df_financeiro.empty:
+        df_financeiro_salvar = pd.DataFrame(columns=COLUNAS_FINANCEIRO)
+    else:
+        df_financeiro_salvar = df_financeiro.copy()
+        colunas_financeiro = COLUNAS_FINANCEIRO
+        for col in colunas_financeiro:
+            if col not in df_financeiro_salvar.columns:
+                df_financeiro_salvar[col] = None
+        df_financeiro_salvar = df_financeiro_salvar[colunas_financeiro]
+
+    df_produtos_salvar = _tipar_dataframe(df_produtos_salvar)
+    _conferir_produtos(df_produtos, df_produtos_salvar)
+    return (
+        df_produtos_salvar,
+        _tipar_dataframe(df_vendas_salvar),
+        _tipar_dataframe(df_financeiro_salvar)
+    )
+
+def _tipar_dataframe(df):
+    """Aplica os tipos numéricos conhecidos (ex.: colunas criadas vazias ficam como object)"""
+    for col in df.columns:
+        if col in TIPOS_COLUNAS and df[col].dtype != TIPOS_COLUNAS[col]:
+            # Por posição: o índice dos produtos são os nomes, não 0..n-1
+            df[col] = _tipar_coluna(col, list(df[col])).to_numpy()
+    return df
+
+def _conferir_produtos(original, salvar):
+    """Recusa salvar produtos se a tipagem perdeu valores numéricos presentes na entrada"""
+    for col in salvar.columns:
+        if col in TIPOS_COLUNAS and col in original.columns:
+            presentes = pd.to_numeric(original[col], errors="coerce").notna().sum()
+            if salvar[col].notna().sum() < presentes:
+                raise Exception(f"Coluna '{col}' dos produtos perdeu valores ao preparar para salvar")
+
+def _escrever_xlsx(df_produtos_salvar, df_vendas_salvar, df_financeiro_salvar):
+    """Cria o backup e reescreve o dados.xlsx"""
+    with _lock_exportacao:
+        # Cria backup antes de salvar
+        criar_backup()
+
+        # Salva num temporário e troca de uma vez: uma queda no meio não deixa o xlsx pela metade
+        raiz, extensao = os.path.splitext(ARQUIVO_DADOS)
+        temporario = f"{raiz}.tmp{extensao}"  # o ExcelWriter exige a extensão .xlsx
+        with pd.ExcelWriter(temporario, engine="openpyxl", mode="w") as writer:
+            df_produtos_salvar.to_excel(writer, sheet_name="Produtos", index=True)
+            df_vendas_salvar.to_excel(writer, sheet_name="Vendas", index=False)
+            df_financeiro_salvar.to_excel(writer, sheet_name="Financeiro", index=False)
+        with open(temporario, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(temporario, ARQUIVO_DADOS)
+    
+    print(f"Dados salvos com sucesso!")
+    print(f"- Produtos: {len(df_produtos_salvar)} itens")
+    print(f"- Vendas: {len(df_vendas_salvar)} registros")
+    print(f"- Financeiro: {len(df_financeiro_salvar)} registros")
+
+def _exportar_em_segundo_plano(df_produtos_salvar, df_vendas_salvar, df_financeiro_salvar, versao):
+    try:
+        _escrever_xlsx(df_produtos_salvar, df_vendas_salvar, df_financeiro_salvar)
+        snapshot.registrar_exportacao(ARQUIVO_DADOS, versao)
+    except Exception as e:
+        print(f"Erro ao exportar {ARQUIVO_DADOS}: {e}")
+
 def verificar_integridade():
     """Verifica a integridade do arquivo de dados"""
     if not os.path.exists(ARQUIVO_DADOS):
@@ -160,10 +381,11 @@ def verificar_integridade():
         return False
     
     try:
-        # Tenta carregar todas as planilhas
-        df_produtos = pd.read_excel(ARQUIVO_DADOS, sheet_name="Produtos", index_col=0)
-        df_vendas = pd.read_excel(ARQUIVO_DADOS, sheet_name="Vendas")
-        df_financeiro = pd.read_excel(ARQUIVO_DADOS, sheet_name="Financeiro")
+        # Tenta carregar todas as planilhas (uma única abertura do arquivo)
+        planilhas = ler_planilhas(ARQUIVO_DADOS)
+        df_produtos = planilhas["Produtos"]
+        df_vendas = planilhas["Vendas"]
+        df_financeiro = planilhas["Financeiro"]
         
         print("Verificação de integridade:")
         print(f"✓ Produtos: {len(df_produtos)} itens")
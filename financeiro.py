@@ -1,27 +1,66 @@
 import pandas as pd
-from datetime import datetime
+from registro import Registro
+from eventos import Observavel, escrita
+from acumulados import TotaisPorPeriodo
+from utils import converter_datas, converter_data, hoje_str
 
-class Financeiro:
+COLUNAS_FINANCEIRO = ["data", "tipo", "descricao", "valor"]
+TIPOS_FINANCEIRO = {"valor": "float64"}
+# Data tipada (datetime64) mantida ao lado da data de exibição dd/mm/aaaa
+DERIVADAS_FINANCEIRO = {"data_dt": lambda df: converter_datas(df["data"])}
+
+class Financeiro(Observavel):
     def __init__(self):
-        self.df_financeiro = pd.DataFrame(columns=["data", "tipo", "descricao", "valor"])
-        self._inicializar_dia_atual()
+        # Lançamentos ficam num log somente-anexação; o DataFrame é montado na leitura
+        self._lancamentos = Registro(COLUNAS_FINANCEIRO, tipos=TIPOS_FINANCEIRO, derivadas=DERIVADAS_FINANCEIRO)
+        # Totais por dia/mês/ano e saldo acumulado, mantidos a cada lançamento
+        self._totais = TotaisPorPeriodo()
+        # (DataFrame, {data: posições}) do último agrupamento por dia
+        self._posicoes_dias = None
+        self.inicializar_dia_atual()
+
+    @property
+    def df_financeiro(self):
+        """Lançamentos como DataFrame (materializado sob demanda)"""
+        return self._lancamentos.dataframe
+
+    @df_financeiro.setter
+    def df_financeiro(self, df):
+        self._lancamentos.substituir(df)
+        self._totais = TotaisPorPeriodo(self.df_financeiro)
+
+    def _anexar(self, lancamento):
+        """Anexa um lançamento ao log sem reconstruir o DataFrame"""
+        self._anexar_lote([lancamento])
+
+    @escrita
+    def _anexar_lote(self, lancamentos):
+        """Anexa vários lançamentos numa única gravação e num único aviso aos ouvintes"""
+        self._lancamentos.anexar_lote(lancamentos)
+        somas = {}
+        for lancamento in lancamentos:
+            chave = (lancamento["data"], lancamento["tipo"])
+            somas[chave] = somas.get(chave, 0.0) + lancamento["valor"]
+        for (data, tipo), valor in somas.items():
+            self._totais.somar(data, tipo, valor)
+        self._notificar("lancamentos_registrados", linhas=lancamentos)
         
-    def _inicializar_dia_atual(self):
+    def inicializar_dia_atual(self):
         """Inicializa o dia atual com saldo 0 se não existir"""
-        hoje = datetime.today().strftime("%d/%m/%Y")
-        if self.df_financeiro.empty or not (self.df_financeiro["data"] == hoje).any():
+        hoje = hoje_str()
+        if hoje not in self._totais:
             entrada_inicial = {
                 "data": hoje,
                 "tipo": "entrada",
                 "descricao": "Saldo inicial do dia",
                 "valor": 0
             }
-            self.df_financeiro = pd.concat([self.df_financeiro, pd.DataFrame([entrada_inicial])], ignore_index=True)
+            self._anexar(entrada_inicial)
     
     def adicionar_entrada(self, descricao, valor, data=None):
         """Adiciona uma entrada de receita"""
         if data is None:
-            data = datetime.today().strftime("%d/%m/%Y")
+            data = hoje_str()
         
         nova_entrada = {
             "data": data,
@@ -29,15 +68,30 @@ class Financeiro:
             "descricao": descricao,
             "valor": valor
         }
-        self.df_financeiro = pd.concat([self.df_financeiro, pd.DataFrame([nova_entrada])], ignore_index=True)
+        self._anexar(nova_entrada)
+    
+    def adicionar_entradas_em_lote(self, entradas):
+        """Adiciona várias entradas de uma vez; cada uma é um dict com descricao, valor e data (opcional)"""
+        hoje = hoje_str()
+        lancamentos = [
+            {
+                "data": entrada.get("data") or hoje,
+                "tipo": "entrada",
+                "descricao": entrada["descricao"],
+                "valor": float(entrada["valor"])
+            }
+            for entrada in entradas
+        ]
+        if lancamentos:
+            self._anexar_lote(lancamentos)
     
     def adicionar_saida(self, descricao, valor, data=None):
         """Adiciona uma saída de despesa"""
         if data is None:
-            data = datetime.today().strftime("%d/%m/%Y")
+            data = hoje_str()
         
         # Verifica se é possível adicionar despesa (apenas no dia atual)
-        hoje = datetime.today().strftime("%d/%m/%Y")
+        hoje = hoje_str()
         if data != hoje:
             raise Exception("Não é possível adicionar despesas em datas passadas.")
         
@@ -47,24 +101,34 @@ class Financeiro:
             "descricao": descricao,
             "valor": -abs(valor)  # Garante que saídas sejam negativas
         }
-        self.df_financeiro = pd.concat([self.df_financeiro, pd.DataFrame([nova_saida])], ignore_index=True)
+        self._anexar(nova_saida)
     
     def obter_resumo_diario(self):
         """Retorna um resumo agrupado por dia"""
-        if self.df_financeiro.empty:
-            return pd.DataFrame(columns=["data", "total"])
-        
         # Garantir que o dia atual está inicializado
-        self._inicializar_dia_atual()
+        self.inicializar_dia_atual()
         
-        resumo = self.df_financeiro.groupby("data")["valor"].sum().reset_index()
-        resumo.columns = ["data", "total"]
-        resumo = resumo.sort_values("data", ascending=False)
-        return resumo
+        resumo = self._totais.tabela_dias()
+        # Como antes, dias com data inválida ficam de fora
+        return resumo[resumo["data_dt"].notna()][["data", "total", "saldo_acumulado"]].reset_index(drop=True)
     
+    def obter_resumo_dia(self, data):
+        """Entradas, saídas, total e saldo acumulado de um único dia (sem percorrer os lançamentos)"""
+        return self._totais.dia(data)
+
+    def _agrupar_por_dia(self):
+        """Posições dos lançamentos de cada dia, recalculadas só quando houve lançamentos novos"""
+        df = self.df_financeiro
+        cache = self._posicoes_dias
+        if cache is None or cache[0] is not df:
+            cache = (df, df.groupby("data", sort=False).indices)
+            self._posicoes_dias = cache
+        return cache[1]
+
     def obter_detalhes_dia(self, data):
         """Retorna os detalhes de movimentação de um dia específico"""
-        detalhes = self.df_financeiro[self.df_financeiro["data"] == data].copy()
+        posicoes = self._agrupar_por_dia().get(data, [])
+        detalhes = self.df_financeiro.take(posicoes)
         # Filtra o saldo inicial se for 0 e houver outras movimentações
         if len(detalhes) > 1:
             detalhes = detalhes[~((detalhes["descricao"] == "Saldo inicial do dia") & (detalhes["valor"] == 0))]
@@ -72,68 +136,40 @@ class Financeiro:
     
     def obter_resumo_mensal(self, mes=None, ano=None):
         """Retorna um resumo mensal"""
-        if self.df_financeiro.empty:
-            return pd.DataFrame(columns=["mes_ano", "total"])
-        
-        df = self.df_financeiro.copy()
+        resumo = self._totais.tabela_meses()
         
+        filtro = pd.Series(True, index=resumo.index)
         if ano:
-            df = df[df["data"].str[6:] == f"{int(ano):04d}"]
+            filtro &= resumo["chave"].str[0] == int(ano)
         if mes:
-            df = df[df["data"].str[3:5] == f"{int(mes):02d}"]
-        
-        # Cria coluna mes_ano
-        df["mes_ano"] = df["data"].str[3:5] + "/" + df["data"].str[6:]
+            filtro &= resumo["chave"].str[1] == int(mes)
         
-        resumo = df.groupby("mes_ano")["valor"].sum().reset_index()
-        resumo.columns = ["mes_ano", "total"]
-        return resumo.sort_values("mes_ano", ascending=False)
+        return resumo[filtro][["mes_ano", "total", "saldo_acumulado"]].reset_index(drop=True)
     
     def obter_resumo_anual(self):
         """Retorna um resumo anual"""
-        if self.df_financeiro.empty:
-            return pd.DataFrame(columns=["ano", "total"])
-        
-        df = self.df_financeiro.copy()
-        df["ano"] = df["data"].str[6:]
-        
-        resumo = df.groupby("ano")["valor"].sum().reset_index()
-        resumo.columns = ["ano", "total"]
-        return resumo.sort_values("ano", ascending=False)
+        return self._totais.tabela_anos()[["ano", "total", "saldo_acumulado"]]
     
     def filtrar_por_periodo(self, data_inicio=None, data_fim=None):
         """Filtra movimentações por período"""
         if self.df_financeiro.empty:
             return pd.DataFrame(columns=["data", "tipo", "descricao", "valor"])
         
-        df = self.df_financeiro.copy()
+        df = self.df_financeiro
         
         if data_inicio:
-            df = df[pd.to_datetime(df["data"], format="%d/%m/%Y") >= pd.to_datetime(data_inicio, format="%d/%m/%Y")]
+            df = df[df["data_dt"] >= converter_data(data_inicio)]
         if data_fim:
-            df = df[pd.to_datetime(df["data"], format="%d/%m/%Y") <= pd.to_datetime(data_fim, format="%d/%m/%Y")]
+            df = df[df["data_dt"] <= converter_data(data_fim)]
         
-        return df.sort_values("data", ascending=False)
+        return df.sort_values("data_dt", ascending=False, kind="stable")
     
     def pode_adicionar_despesa(self, data):
         """Verifica se pode adicionar despesa em uma data"""
-        hoje = datetime.today().strftime("%d/%m/%Y")
+        hoje = hoje_str()
         return data == hoje
     
     def obter_resumo_diario_completo(self):
-        """Retorna resumo diário com entradas, saídas e total"""
-        if self.df_financeiro.empty:
-            return pd.DataFrame(columns=["data", "entrada", "saida", "total"])
-        self._inicializar_dia_atual()
-        df = self.df_financeiro.copy()
-        entradas = df[df["tipo"] == "entrada"].groupby("data")["valor"].sum()
-        saidas = df[df["tipo"] == "saida"].groupby("data")["valor"].sum()
-        total = df.groupby("data")["valor"].sum()
-        datas = sorted(set(df["data"]), reverse=True)
-        rows = []
-        for d in datas:
-            ent = entradas.get(d, 0.0)
-            sai = saidas.get(d, 0.0)
-            tot = total.get(d, 0.0)
-            rows.append({"data": d, "entrada": ent, "saida": abs(sai), "total": tot})
-        return pd.DataFrame(rows)
\ No newline at end of file
+        """Retorna resumo diário com entradas, saídas, total e saldo acumulado"""
+        self.inicializar_dia_atual()
+        return self._totais.tabela_dias()[["data", "entrada", "saida", "total", "saldo_acumulado"]]
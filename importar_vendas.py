@@ -0,0 +1,68 @@
+import argparse
+import pandas as pd
+import armazenamento
+import instrumentacao
+from inventario import Inventario
+from financeiro import Financeiro
+
+def ler_csv(caminho):
+    """Lê um CSV de vendas (separador "," ou ";") com todas as colunas como texto"""
+    df = pd.read_csv(caminho, sep=None, engine="python", dtype=str, encoding="utf-8-sig")
+    df.columns = [col.strip().lower() for col in df.columns]
+    if "desconto" in df.columns:
+        # No arquivo o desconto vem em %, como no formulário
+        df["desconto"] = pd.to_numeric(df["desconto"], errors="coerce") / 100
+    # Número da linha no arquivo (a 1ª é o cabeçalho), para o relatório de recusadas
+    return df.assign(arquivo=caminho, linha=df.index + 2)
+
+def importar_vendas(inventario, financeiro, vendas):
+    """Importa as vendas e lança no financeiro uma entrada por venda aceita.
+
+    Retorna (aceitas, recusadas) como `Inventario.importar_vendas_em_lote`.
+    """
+    aceitas, recusadas = inventario.importar_vendas_em_lote(vendas)
+    if not aceitas.empty:
+        # Vendas com linhas de datas diferentes já foram recusadas: "first" é a data da venda
+        por_venda = aceitas.groupby("venda_id", sort=False).agg(data=("data", "first"), valor=("valor_venda", "sum"))
+        financeiro.adicionar_entradas_em_lote(
+            {"descricao": f"Venda importada - ID: {venda_id}", "valor": venda.valor, "data": venda.data}
+            for venda_id, venda in zip(por_venda.index, por_venda.itertuples())
+        )
+    return aceitas, recusadas
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa vendas de outros terminais a partir de arquivos CSV.")
+    parser.add_argument(
+        "arquivos", nargs="+",
+        help="CSV com as colunas produto e quantidade e, opcionalmente, data (dd/mm/aaaa), desconto (%%), valor_venda e venda_id"
+    )
+    parser.add_argument("--recusadas", help="grava as linhas recusadas, com o motivo, neste CSV")
+    args = parser.parse_args(argv)
+
+    lote = pd.concat([ler_csv(caminho) for caminho in args.arquivos], ignore_index=True)
+
+    instrumentacao.instrumentar_dados()
+    inventario = Inventario()
+    financeiro = Financeiro()
+    inventario.df_produtos, inventario.df_vendas, financeiro.df_financeiro = armazenamento.carregar_dados()
+    # Com gravação incremental (journal/SQLite) cada lote já é gravado ao ser importado
+    persistencia = armazenamento.acompanhar(inventario, financeiro)
+    try:
+        aceitas, recusadas = importar_vendas(inventario, financeiro, lote)
+        if persistencia is None and not aceitas.empty:
+            armazenamento.salvar_dados(inventario.df_produtos, inventario.df_vendas, financeiro.df_financeiro)
+    finally:
+        if persistencia is not None:
+            persistencia.fechar()
+
+    print(f"Linhas importadas: {len(aceitas)} ({aceitas['venda_id'].nunique()} vendas, R${aceitas['valor_venda'].sum():.2f})")
+    print(f"Linhas recusadas: {len(recusadas)}")
+    for motivo, quantidade in recusadas["motivo"].value_counts().items():
+        print(f"  {motivo}: {quantidade}")
+    if args.recusadas and not recusadas.empty:
+        recusadas.to_csv(args.recusadas, index=False)
+        print(f"Linhas recusadas gravadas em {args.recusadas}")
+    return 1 if len(recusadas) else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
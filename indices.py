@@ -0,0 +1,268 @@
+import bisect
+import heapq
+import re
+import unicodedata
+import numpy as np
+from datetime import date
+
+class VetorCrescente:
+    """Array numpy com capacidade que dobra ao crescer (anexação amortizada O(1))"""
+
+    def __init__(self, valores=None, dtype=np.int64, capacidade_minima=16):
+        valores = np.asarray(valores if valores is not None else [], dtype=dtype)
+        self._dados = np.empty(max(capacidade_minima, len(valores), 1), dtype=dtype)
+        self._dados[:len(valores)] = valores
+        self._n = len(valores)
+
+    def anexar(self, valor):
+        if self._n == len(self._dados):
+            novo = np.empty(len(self._dados) * 2, dtype=self._dados.dtype)
+            novo[:self._n] = self._dados[:self._n]
+            self._dados = novo
+        self._dados[self._n] = valor
+        self._n += 1
+
+    def inserir(self, posicao, valor):
+        """Insere no meio (O(n)); usado só quando a ordem não é preservada"""
+        self.anexar(valor)
+        self._dados[posicao + 1:self._n] = self._dados[posicao:self._n - 1].copy()
+        self._dados[posicao] = valor
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def valores(self):
+        """Visão (sem cópia) dos valores válidos"""
+        return self._dados[:self._n]
+
+def ordinal_dia(data):
+    """Número do dia (dias desde 1970-01-01) de um date/datetime/Timestamp"""
+    return int(np.datetime64(date(data.year, data.month, data.day), "D").astype(np.int64))
+
+def ordinais_dias(serie_datas):
+    """Versão vetorizada de `ordinal_dia` para uma coluna datetime64 (NaT vira o menor inteiro)"""
+    return serie_datas.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]").astype(np.int64)
+
+def intervalo_datas(dia=None, mes=None, ano=None):
+    """Intervalo [inicio, fim) de ordinais de dia para o filtro dado.
+
+    Só ano, ano+mês ou ano+mês+dia formam um intervalo contínuo; para os
+    demais casos (ex.: dia e ano sem o mês) devolve None e o chamador filtra
+    por máscara. Uma data impossível (31/02, mês 13) dá o intervalo vazio.
+    """
+    if not ano or (dia and not mes):
+        return None
+    try:
+        ano = int(ano)
+        if not mes:
+            return ordinal_dia(date(ano, 1, 1)), ordinal_dia(date(ano + 1, 1, 1))
+        mes = int(mes)
+        inicio_mes = date(ano, mes, 1)
+        fim_mes = date(ano + 1, 1, 1) if mes == 12 else date(ano, mes + 1, 1)
+        if not dia:
+            return ordinal_dia(inicio_mes), ordinal_dia(fim_mes)
+        inicio = ordinal_dia(date(ano, mes, int(dia)))
+    except ValueError:
+        return 0, 0
+    return inicio, inicio + 1
+
+def mascara_datas(datas, dia=None, mes=None, ano=None):
+    """Máscara (array de bool) das datas de uma coluna datetime64 com o dia, o mês e o ano dados.
+
+    Cada parte só filtra quando informada, como no filtro do histórico;
+    datas inválidas (NaT) ficam de fora.
+    """
+    filtro = np.ones(len(datas), dtype=bool)
+    for parte, valor in (("day", dia), ("month", mes), ("year", ano)):
+        if valor:
+            filtro &= (getattr(datas.dt, parte) == int(valor)).to_numpy()
+    return filtro
+
+class IndiceDatas:
+    """Índice ordenado por dia: chaves (ordinal do dia) e as posições das linhas.
+
+    Como as vendas chegam em ordem cronológica, em geral as posições são a
+    própria sequência 0..n-1; nesse caso um intervalo de datas é um intervalo
+    contínuo de linhas e o filtro pode devolver uma fatia em vez de uma cópia.
+    """
+
+    def __init__(self, ordinais=None):
+        ordinais = np.asarray(ordinais if ordinais is not None else [], dtype=np.int64)
+        ordem = np.argsort(ordinais, kind="stable")
+        self._chaves = VetorCrescente(ordinais[ordem])
+        self._posicoes = VetorCrescente(ordem)
+        self.sequencial = bool(np.array_equal(ordem, np.arange(len(ordem))))
+
+    def anexar(self, ordinal, posicao):
+        chaves = self._chaves.valores
+        if not len(chaves) or ordinal >= chaves[-1]:
+            self._chaves.anexar(ordinal)
+            self._posicoes.anexar(posicao)
+            self.sequencial = self.sequencial and posicao == len(self._posicoes) - 1
+        else:
+            # Data retroativa: insere mantendo a ordem (raro)
+            i = int(np.searchsorted(chaves, ordinal, side="right"))
+            self._chaves.inserir(i, ordinal)
+            self._posicoes.inserir(i, posicao)
+            self.sequencial = False
+
+    def __len__(self):
+        return len(self._chaves)
+
+    def limites(self, inicio, fim):
+        """Posições [a, b) no índice cujas chaves estão em [inicio, fim) (busca binária)"""
+        chaves = self._chaves.valores
+        return int(np.searchsorted(chaves, inicio, side="left")), int(np.searchsorted(chaves, fim, side="left"))
+
+    def posicoes(self, a=0, b=None):
+        """Posições das linhas entre os limites a e b do índice"""
+        return self._posicoes.valores[a:b]
+
+class IndicePosicoes:
+    """Índice hash valor -> posições das linhas com esse valor, em ordem crescente.
+
+    Usado por produto e por venda_id; a busca é O(1) e a anexação amortizada O(1).
+    """
+
+    def __init__(self, valores=None):
+        self._posicoes = {}
+        if valores is not None and len(valores):
+            for chave, posicoes in valores.groupby(valores.to_numpy(), sort=False).indices.items():
+                self._posicoes[chave] = VetorCrescente(posicoes, capacidade_minima=1)
+
+    def anexar(self, chave, posicao):
+        if chave not in self._posicoes:
+            # Capacidade pequena: a maioria das chaves (ex.: venda_id) tem poucas linhas
+            self._posicoes[chave] = VetorCrescente(capacidade_minima=1)
+        self._posicoes[chave].anexar(posicao)
+
+    def __contains__(self, chave):
+        return chave in self._posicoes
+
+    def posicoes(self, chave):
+        vetor = self._posicoes.get(chave)
+        return vetor.valores if vetor is not None else np.empty(0, dtype=np.int64)
+
+class IndiceEstoque:
+    """Heap de (margem, produto), com margem = estoque - estoque_minimo.
+
+    Cada mudança de estoque empilha a nova margem em O(log n); as entradas
+    antigas ficam no heap e são ignoradas na leitura (a margem vigente de cada
+    produto está em `margens`). Listar os produtos em baixa percorre só o topo
+    do heap, os nós com margem até o limite, sem varrer o catálogo.
+    """
+
+    def __init__(self, margens=None):
+        self.margens = dict(margens or {})  # produto -> margem vigente
+        self._reconstruir()
+
+    def _reconstruir(self):
+        self._heap = [(margem, nome) for nome, margem in self.margens.items()]
+        heapq.heapify(self._heap)
+
+    def atualizar(self, nome, margem):
+        """Registra a margem atual do produto; devolve a anterior (None se era novo)"""
+        margem = int(margem)
+        anterior = self.margens.get(nome)
+        if anterior == margem:
+            return anterior
+        self.margens[nome] = margem
+        heapq.heappush(self._heap, (margem, nome))
+        # Entradas vencidas demais: refaz o heap só com as vigentes
+        if len(self._heap) > 2 * len(self.margens) + 64:
+            self._reconstruir()
+        return anterior
+
+    def remover(self, nome):
+        self.margens.pop(nome, None)
+
+    def em_baixa(self, limite=0):
+        """(produto, margem) com margem <= limite, da menor margem para a maior"""
+        heap = self._heap
+        encontrados = {}
+        pendentes = [0] if heap else []
+        while pendentes:
+            i = pendentes.pop()
+            margem, nome = heap[i]
+            if margem > limite:
+                continue  # filhos têm margem maior ou igual: a subárvore inteira fica de fora
+            if self.margens.get(nome) == margem:
+                encontrados[nome] = margem
+            pendentes.extend(filho for filho in (2 * i + 1, 2 * i + 2) if filho < len(heap))
+        return sorted(encontrados.items(), key=lambda item: (item[1], item[0]))
+
+    def __len__(self):
+        return len(self.margens)
+
+
+def normalizar_busca(texto):
+    """Minúsculas e sem acentos, para comparar o que foi digitado com os nomes"""
+    decomposto = unicodedata.normalize("NFKD", str(texto))
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+class IndiceBusca:
+    """Busca de produtos pelo começo de qualquer palavra do nome, sem diferenciar acentos.
+
+    Guarda duas listas ordenadas: (nome normalizado, nome) e (sufixo
+    normalizado, nome) com um sufixo por palavra do nome ("Pão de Queijo" ->
+    "pao de queijo", "de queijo", "queijo"). A busca faz um bisect em cada
+    uma: primeiro os nomes que começam pelo texto, depois os que têm outra
+    palavra começando por ele, até o limite.
+    """
+
+    def __init__(self, nomes=()):
+        nomes = [str(nome) for nome in nomes]
+        self._inicios = sorted((normalizar_busca(nome), nome) for nome in nomes)
+        self._chaves = sorted(chave for nome in nomes for chave in self._chaves_de(nome))
+
+    @staticmethod
+    def _chaves_de(nome):
+        normalizado = normalizar_busca(nome)
+        return [(normalizado[inicio.start():], nome) for inicio in re.finditer(r"\w+", normalizado)]
+
+    def adicionar(self, nome):
+        nome = str(nome)
+        bisect.insort(self._inicios, (normalizar_busca(nome), nome))
+        for chave in self._chaves_de(nome):
+            bisect.insort(self._chaves, chave)
+
+    def remover(self, nome):
+        nome = str(nome)
+        _remover_ordenado(self._inicios, (normalizar_busca(nome), nome))
+        for chave in self._chaves_de(nome):
+            _remover_ordenado(self._chaves, chave)
+
+    def buscar(self, texto, limite=50):
+        """Até `limite` nomes com uma palavra começando por `texto`; os que começam pelo texto vêm antes"""
+        prefixo = normalizar_busca(texto).strip()
+        encontrados = dict.fromkeys(_com_prefixo(self._inicios, prefixo, limite))
+        if len(encontrados) < limite and prefixo:
+            outros = set()
+            for nome in _com_prefixo(self._chaves, prefixo):
+                if nome not in encontrados:
+                    outros.add(nome)
+                    if len(encontrados) + len(outros) >= limite:
+                        break
+            encontrados.update(dict.fromkeys(sorted(outros, key=normalizar_busca)))
+        return list(encontrados)
+
+    def __len__(self):
+        return len(self._inicios)
+
+def _com_prefixo(ordenada, prefixo, limite=None):
+    """Nomes das entradas (chave, nome) de `ordenada` cuja chave começa por `prefixo`, em ordem"""
+    i = bisect.bisect_left(ordenada, (prefixo,))
+    vistos = 0
+    while i < len(ordenada) and (limite is None or vistos < limite):
+        chave, nome = ordenada[i]
+        if not chave.startswith(prefixo):
+            break
+        yield nome
+        vistos += 1
+        i += 1
+
+def _remover_ordenado(lista, valor):
+    i = bisect.bisect_left(lista, valor)
+    if i < len(lista) and lista[i] == valor:
+        del lista[i]
@@ -0,0 +1,184 @@
+"""Instrumentação opcional dos caminhos críticos.
+
+Desligada por padrão. Liga com ESTOQUE_INSTRUMENTACAO=1 ou com a opção
+--instrumentar (main.py / estoque.py). Ligada, registra por função o número de
+chamadas, um histograma de latência e o tamanho dos DataFrames envolvidos,
+grava cada chamada num log rotativo e gera um resumo sob demanda (F12 na
+interface, `relatorio()` / `despejar()` no código) e ao sair.
+
+Desligada, nada é embrulhado: `medido` devolve a própria função e
+`instrumentar_dados` não faz nada, então o custo é só o de um `if` na carga.
+"""
+import atexit
+import bisect
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+ARQUIVO_LOG = "instrumentacao.log"
+ARQUIVO_RESUMO = "instrumentacao_resumo.json"
+# Limites (ms) das faixas do histograma de latência; a última faixa é "acima de 1000"
+LIMITES_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+_ativa = False
+_lock = threading.Lock()
+_estatisticas = {}  # nome -> Estatistica
+_log = None
+_dados_instrumentados = False
+
+class Estatistica:
+    """Chamadas, tempos e linhas de DataFrame de uma função"""
+
+    __slots__ = ("chamadas", "total_ms", "max_ms", "faixas", "max_linhas")
+
+    def __init__(self):
+        self.chamadas = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.faixas = [0] * (len(LIMITES_MS) + 1)
+        self.max_linhas = None
+
+    def somar(self, duracao_ms, linhas):
+        self.chamadas += 1
+        self.total_ms += duracao_ms
+        self.max_ms = max(self.max_ms, duracao_ms)
+        self.faixas[bisect.bisect_left(LIMITES_MS, duracao_ms)] += 1
+        if linhas is not None:
+            self.max_linhas = linhas if self.max_linhas is None else max(self.max_linhas, linhas)
+
+    def como_dict(self):
+        rotulos = [f"<={limite}ms" for limite in LIMITES_MS] + [f">{LIMITES_MS[-1]}ms"]
+        return {
+            "chamadas": self.chamadas,
+            "total_ms": round(self.total_ms, 3),
+            "media_ms": round(self.total_ms / self.chamadas, 3) if self.chamadas else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "histograma": {rotulo: n for rotulo, n in zip(rotulos, self.faixas) if n},
+            "max_linhas": self.max_linhas,
+        }
+
+def ativa():
+    return _ativa
+
+def ativar():
+    """Liga a instrumentação (deve ser chamada antes de montar a interface ou carregar os dados)"""
+    global _ativa, _log
+    if _log is not None:
+        return
+    _ativa = True
+    _log = logging.getLogger("estoque.instrumentacao")
+    _log.setLevel(logging.INFO)
+    _log.propagate = False
+    manipulador = RotatingFileHandler(ARQUIVO_LOG, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
+    manipulador.setFormatter(logging.Formatter("%(asctime)s %(threadName)s %(message)s"))
+    _log.addHandler(manipulador)
+    atexit.register(despejar)
+    print(f"Instrumentação ligada: log em {ARQUIVO_LOG}")
+
+def _linhas(valor):
+    """Linhas de um DataFrame (ou soma de uma tupla deles); None se não houver"""
+    if hasattr(valor, "shape") and hasattr(valor, "columns"):
+        return len(valor)
+    if isinstance(valor, tuple):
+        tamanhos = [_linhas(v) for v in valor]
+        tamanhos = [t for t in tamanhos if t is not None]
+        return sum(tamanhos) if tamanhos else None
+    return None
+
+def _embrulhar(funcao, nome):
+    @functools.wraps(funcao)
+    def embrulhada(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            resultado = funcao(*args, **kwargs)
+        finally:
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+        # Tamanho do DataFrame devolvido; sem ele, o dos DataFrames recebidos (ex.: salvar_dados)
+        linhas = _linhas(resultado)
+        if linhas is None:
+            linhas = _linhas(tuple(args))
+        registrar(nome, duracao_ms, linhas)
+        return resultado
+    embrulhada.__instrumentada__ = True
+    return embrulhada
+
+def registrar(nome, duracao_ms, linhas=None):
+    """Anota uma medição feita por fora (ex.: uma fase da interface)"""
+    with _lock:
+        estatistica = _estatisticas.get(nome)
+        if estatistica is None:
+            estatistica = _estatisticas[nome] = Estatistica()
+        estatistica.somar(duracao_ms, linhas)
+    if _log is not None:
+        _log.info("%s %.3fms%s", nome, duracao_ms, f" linhas={linhas}" if linhas is not None else "")
+
+def medido(funcao):
+    """Decorador para funções da interface: mede quando ligada, devolve a própria função quando não"""
+    if not _ativa:
+        return funcao
+    return _embrulhar(funcao, f"{funcao.__module__}.{funcao.__name__}")
+
+def instrumentar_classe(classe):
+    """Embrulha os métodos públicos definidos na própria classe"""
+    for nome, atributo in list(vars(classe).items()):
+        if nome.startswith("_") or not callable(atributo) or getattr(atributo, "__instrumentada__", False):
+            continue
+        if isinstance(atributo, (staticmethod, classmethod, property)):
+            continue
+        setattr(classe, nome, _embrulhar(atributo, f"{classe.__name__}.{nome}"))
+
+def instrumentar_modulo(modulo):
+    """Embrulha as funções públicas definidas no módulo (não as importadas de outros)"""
+    for nome, atributo in list(vars(modulo).items()):
+        if (nome.startswith("_") or not callable(atributo) or isinstance(atributo, type)
+                or getattr(atributo, "__module__", None) != modulo.__name__
+                or getattr(atributo, "__instrumentada__", False)):
+            continue
+        setattr(modulo, nome, _embrulhar(atributo, f"{modulo.__name__}.{nome}"))
+
+def instrumentar_dados():
+    """Embrulha Inventario, Financeiro e excel_io, se a instrumentação estiver ligada"""
+    global _dados_instrumentados
+    if not _ativa or _dados_instrumentados:
+        return
+    import excel_io
+    from inventario import Inventario
+    from financeiro import Financeiro
+
+    instrumentar_classe(Inventario)
+    instrumentar_classe(Financeiro)
+    instrumentar_modulo(excel_io)
+    _dados_instrumentados = True
+
+def resumo():
+    """Estatísticas por função, das mais caras (tempo total) para as mais baratas"""
+    with _lock:
+        itens = [(nome, estatistica.como_dict()) for nome, estatistica in _estatisticas.items()]
+    return dict(sorted(itens, key=lambda item: item[1]["total_ms"], reverse=True))
+
+def relatorio():
+    """Resumo em texto, uma linha por função"""
+    linhas = [f"{'função':<48}{'chamadas':>9}{'total ms':>11}{'média ms':>10}{'máx ms':>10}{'linhas':>9}"]
+    for nome, dados in resumo().items():
+        linhas.append(
+            f"{nome:<48}{dados['chamadas']:>9}{dados['total_ms']:>11.1f}{dados['media_ms']:>10.2f}"
+            f"{dados['max_ms']:>10.1f}{dados['max_linhas'] if dados['max_linhas'] is not None else '':>9}"
+        )
+    return "\n".join(linhas)
+
+def despejar(caminho=None):
+    """Grava o resumo em JSON (padrão: instrumentacao_resumo.json) e devolve o caminho"""
+    caminho = caminho or ARQUIVO_RESUMO
+    dados = resumo()
+    if not dados:
+        return None
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f, indent=2, ensure_ascii=False)
+    return caminho
+
+if os.environ.get("ESTOQUE_INSTRUMENTACAO", "0") not in ("", "0"):
+    ativar()
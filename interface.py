@@ -1,38 +1,113 @@
+import time
+_inicio_importacao = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, messagebox
-from inventario import Inventario
-from financeiro import Financeiro
 from datetime import datetime
-import pandas as pd
-import excel_io
-
-inventario = Inventario()
-financeiro = Financeiro()
+import armazenamento
+import instrumentacao
+from cronometro import Cronometro
+from tarefas import ExecutorTarefas
+from treeview_paginado import TreeviewPaginado
+from utils import hoje_str
+
+# Inventário e financeiro (e com eles o pandas) são importados e criados na
+# carga dos dados, em segundo plano, para a janela aparecer antes
+inventario = None
+financeiro = None
 filtro_atual = {"dia": None, "mes": None, "ano": None, "produto": None}
+TAMANHO_PAGINA = 200  # Linhas por página nas abas Histórico e Financeiro
+LIMITE_SUGESTOES = 50  # Produtos listados nos combos enquanto se digita
+ATRASO_BUSCA_MS = 150  # Pausa na digitação antes de filtrar os combos
+# Teclas que não mudam o texto do combo (navegar na lista não refaz a busca)
+TECLAS_NAVEGACAO = {"Up", "Down", "Left", "Right", "Return", "Escape", "Tab", "Home", "End"}
+TEMPO_IMPORTACAO = time.perf_counter() - _inicio_importacao
+
+def criar_modelos():
+    """Importa os módulos de dados e cria o inventário e o financeiro"""
+    global inventario, financeiro
+    instrumentacao.instrumentar_dados()
+    from inventario import Inventario
+    from financeiro import Financeiro
+    inventario = Inventario()
+    financeiro = Financeiro()
 
 def iniciar_interface():
+    cronometro = Cronometro()
+    cronometro.registrar("importações da interface", TEMPO_IMPORTACAO)
+
     root = tk.Tk()
     root.title("Controle de Estoque e Vendas")
     root.geometry("1200x800")
 
-    # Carrega dados do Excel
-    df_produtos, df_vendas, df_financeiro = excel_io.carregar_dados()
-    inventario.df_produtos = df_produtos
-    inventario.df_vendas = df_vendas
-    financeiro.df_financeiro = df_financeiro
+    # Barra de status: mostra a tarefa em segundo plano em andamento
+    frame_status = tk.Frame(root)
+    frame_status.pack(side="bottom", fill="x")
+    lbl_status = tk.Label(frame_status, text="", anchor="w")
+    lbl_status.pack(side="left", padx=10)
+    barra_progresso = ttk.Progressbar(frame_status, mode="indeterminate", length=120)
+
+    def mostrar_status(texto):
+        lbl_status.config(text=texto)
+        if texto:
+            barra_progresso.pack(side="right", padx=10, pady=2)
+            barra_progresso.start(10)
+        else:
+            barra_progresso.stop()
+            barra_progresso.pack_forget()
+
+    # Carga, gravação e agregações pesadas rodam fora da thread do Tk
+    tarefas = ExecutorTarefas(root, ao_mudar_status=mostrar_status)
+    persistencia = None
+    carregado = False
+    fechando = False
+
+    def ligar_busca(combo, fixos=()):
+        """Filtra as opções do combo pelo texto digitado, só depois de uma pausa na digitação.
+
+        Devolve a função que refaz o filtro na hora (usada para preencher o combo ao montá-lo).
+        """
+        agendado = None
+
+        def filtrar():
+            nonlocal agendado
+            agendado = None
+            if carregado:
+                combo["values"] = [*fixos, *inventario.buscar_produtos(combo.get(), LIMITE_SUGESTOES)]
+
+        def ao_digitar(event):
+            nonlocal agendado
+            if event.keysym in TECLAS_NAVEGACAO:
+                return
+            if agendado is not None:
+                root.after_cancel(agendado)
+            agendado = root.after(ATRASO_BUSCA_MS, filtrar)
+
+        combo.bind("<KeyRelease>", ao_digitar, add="+")
+        return filtrar
 
+    style = ttk.Style()
+    style.configure("Treeview.Heading", font=("Arial", 11, "bold"))
+    style.configure("Treeview", font=("Arial", 10))
+
+    # Só a aba Vendas é montada agora; as outras na primeira vez que forem
+    # selecionadas, e ficam desabilitadas até os dados carregarem
     aba = ttk.Notebook(root)
-    aba.pack(fill="both", expand=True)
 
     aba_vendas = ttk.Frame(aba)
     aba_historico = ttk.Frame(aba)
     aba_estoque_total = ttk.Frame(aba)
     aba_financeiro = ttk.Frame(aba)
-    
+
     aba.add(aba_vendas, text="Vendas")
-    aba.add(aba_historico, text="Histórico")
-    aba.add(aba_estoque_total, text="Estoque")
-    aba.add(aba_financeiro, text="Financeiro")
+    aba.add(aba_historico, text="Histórico", state="disabled")
+    aba.add(aba_estoque_total, text="Estoque", state="disabled")
+    aba.add(aba_financeiro, text="Financeiro", state="disabled")
+    aba.pack(fill="both", expand=True)
+    cronometro.marcar("janela")
+
+    # Funções (evento, dados) das abas já montadas, chamadas por ao_mudar_dados
+    ouvintes_abas = []
 
     # --- ABA VENDAS ---
     # Frame para tipo de venda
@@ -52,6 +127,7 @@ def iniciar_interface():
     tk.Label(frame_venda, text="Desconto (%):").grid(row=0, column=4)
 
     combo_produtos = ttk.Combobox(frame_venda, width=20)
+    ligar_busca(combo_produtos)
     entry_quantidade = tk.Entry(frame_venda, width=10)
     entry_desconto = tk.Entry(frame_venda, width=10)
 
@@ -64,20 +140,17 @@ def iniciar_interface():
             produto = combo_produtos.get()
             qtd = int(entry_quantidade.get())
             desconto = float(entry_desconto.get() or 0) / 100
-            
+
             if var_tipo_venda.get() == "simples":
                 venda_id, lucro = inventario.registrar_venda(produto, qtd, desconto)
                 messagebox.showinfo("Sucesso", f"Venda registrada! Lucro: R${lucro:.2f}")
-                atualizar_tree_vendas_dia()
-                atualizar_tabela_produtos()
-                # Atualiza financeiro
+                # Treeviews são atualizadas pelos eventos (ver ao_mudar_dados)
                 financeiro.adicionar_entrada(f"Venda - {produto}", lucro)
-                atualizar_tree_financeiro()
             else:
                 item = inventario.adicionar_ao_carrinho(produto, qtd, desconto)
-                atualizar_tree_carrinho()
+                inserir_item_carrinho(item)
                 messagebox.showinfo("Sucesso", f"Produto adicionado ao carrinho!")
-            
+
             entry_quantidade.delete(0, tk.END)
             entry_desconto.delete(0, tk.END)
         except Exception as e:
@@ -106,45 +179,57 @@ def iniciar_interface():
         if selecionado:
             index = tree_carrinho.index(selecionado[0])
             inventario.remover_do_carrinho(index)
-            atualizar_tree_carrinho()
+            tree_carrinho.delete(selecionado[0])
+            atualizar_total_carrinho()
 
     def finalizar_venda():
         if not inventario.carrinho:
             messagebox.showwarning("Aviso", "Carrinho vazio!")
             return
-        
+
         try:
             venda_id, lucro_total = inventario.finalizar_venda_carrinho()
             messagebox.showinfo("Sucesso", f"Venda finalizada! Lucro total: R${lucro_total:.2f}")
             atualizar_tree_carrinho()
-            atualizar_tree_vendas_dia()
-            atualizar_tabela_produtos()
-            # Atualiza financeiro
             financeiro.adicionar_entrada(f"Venda em pacote - ID: {venda_id}", lucro_total)
-            atualizar_tree_financeiro()
         except Exception as e:
             messagebox.showerror("Erro", str(e))
 
-    tk.Button(frame_carrinho_botoes, text="Remover Selecionado", command=remover_do_carrinho).pack(side="left", padx=5)
-    tk.Button(frame_carrinho_botoes, text="Limpar Carrinho", command=lambda: [inventario.limpar_carrinho(), atualizar_tree_carrinho()]).pack(side="left", padx=5)
-    tk.Button(frame_carrinho_botoes, text="Finalizar Venda", command=finalizar_venda).pack(side="right", padx=5)
+    btn_remover_carrinho = tk.Button(frame_carrinho_botoes, text="Remover Selecionado", command=remover_do_carrinho)
+    btn_remover_carrinho.pack(side="left", padx=5)
+    btn_limpar_carrinho = tk.Button(frame_carrinho_botoes, text="Limpar Carrinho", command=lambda: [inventario.limpar_carrinho(), atualizar_tree_carrinho()])
+    btn_limpar_carrinho.pack(side="left", padx=5)
+    btn_finalizar_venda = tk.Button(frame_carrinho_botoes, text="Finalizar Venda", command=finalizar_venda)
+    btn_finalizar_venda.pack(side="right", padx=5)
+
+    # Botões que mexem nos dados ficam desabilitados até a carga terminar
+    botoes_vendas = [btn_adicionar, btn_remover_carrinho, btn_limpar_carrinho, btn_finalizar_venda]
+    for botao in botoes_vendas:
+        botao.config(state="disabled")
 
     lbl_total_carrinho = tk.Label(frame_carrinho_botoes, text="Total: R$0,00", font=("Arial", 12, "bold"))
     lbl_total_carrinho.pack(side="right", padx=10)
 
+    def inserir_item_carrinho(item):
+        tree_carrinho.insert("", tk.END, values=(
+            item.produto,
+            item.quantidade,
+            f"{item.desconto*100:.1f}%",
+            f"R${item.preco_com_desconto:.2f}",
+            f"R${item.total_item:.2f}"
+        ))
+        atualizar_total_carrinho()
+
+    def atualizar_total_carrinho():
+        # Total corrente mantido pelo carrinho, sem somar os itens
+        lbl_total_carrinho.config(text=f"Total: R${inventario.obter_total_carrinho():.2f}")
+
+    @instrumentacao.medido
     def atualizar_tree_carrinho():
         tree_carrinho.delete(*tree_carrinho.get_children())
-        total = 0
         for item in inventario.carrinho:
-            tree_carrinho.insert("", tk.END, values=(
-                item['produto'],
-                item['quantidade'],
-                f"{item['desconto']*100:.1f}%",
-                f"R${item['preco_com_desconto']:.2f}",
-                f"R${item['total_item']:.2f}"
-            ))
-            total += item['total_item']
-        lbl_total_carrinho.config(text=f"Total: R${total:.2f}")
+            inserir_item_carrinho(item)
+        atualizar_total_carrinho()
 
     # Frame vendas do dia
     frame_vendas_dia = ttk.LabelFrame(aba_vendas, text="Vendas do Dia")
@@ -158,86 +243,105 @@ def iniciar_interface():
     tree_vendas_dia.heading("venda_id", text="ID Venda")
     tree_vendas_dia.pack(fill="both", expand=True)
 
+    def inserir_venda_dia(row, posicao=tk.END):
+        tree_vendas_dia.insert("", posicao, iid=row["venda_id"], values=(
+            row["data"],
+            row["produto"],
+            row["quantidade"],
+            f"R${row['lucro']:.2f}",
+            row["venda_id"]
+        ))
+
+    @instrumentacao.medido
     def atualizar_tree_vendas_dia():
-        hoje_str = datetime.today().strftime("%d/%m/%Y")
-        vendas_agrupadas = inventario.obter_vendas_agrupadas()
-        vendas_hoje = vendas_agrupadas[vendas_agrupadas["data"] == hoje_str] if not vendas_agrupadas.empty else pd.DataFrame()
-        
+        hoje = datetime.today()
+        # Busca só o dia de hoje pelo índice de datas, sem agrupar o histórico todo
+        vendas_hoje = inventario.filtrar_vendas_agrupadas(dia=hoje.day, mes=hoje.month, ano=hoje.year)
+
         tree_vendas_dia.delete(*tree_vendas_dia.get_children())
-        
-        if not vendas_hoje.empty:
-            for _, row in vendas_hoje.iterrows():
-                tree_vendas_dia.insert("", tk.END, values=(
-                    row["data"], 
-                    row["produto"], 
-                    row["quantidade"], 
-                    f"R${row['lucro']:.2f}",
-                    row["venda_id"]
-                ))
+
+        for row in vendas_hoje.to_dict("records"):
+            inserir_venda_dia(row)
+
+    @instrumentacao.medido
+    def atualizar_combo_produtos():
+        # Só as primeiras sugestões; as demais aparecem ao digitar
+        produtos = inventario.buscar_produtos("", LIMITE_SUGESTOES)
+        combo_produtos['values'] = produtos
+        if produtos:
+            combo_produtos.current(0)
+
+    def ao_mudar_vendas(evento, dados):
+        from inventario import agrupar_linhas_venda
+
+        # Produtos novos entram pela busca ao digitar; os removidos saem das opções visíveis
+        if evento == "produto_removido":
+            combo_produtos["values"] = [p for p in combo_produtos["values"] if p != dados["nome"]]
+        elif evento == "vendas_registradas":
+            # Uma importação em lote traz várias vendas no mesmo aviso
+            por_venda = {}
+            for linha in dados["linhas"]:
+                por_venda.setdefault(linha["venda_id"], []).append(linha)
+            hoje = hoje_str()
+            for linhas in por_venda.values():
+                venda = agrupar_linhas_venda(linhas)
+                # Vendas do dia ficam da mais recente para a mais antiga
+                if venda["data"] == hoje:
+                    inserir_venda_dia(venda, 0)
+
+    ouvintes_abas.append(ao_mudar_vendas)
+    cronometro.marcar("aba Vendas")
 
     # --- ABA FINANCEIRO ---
-    frame_resumo = ttk.LabelFrame(aba_financeiro, text="Resumo Diário")
-    frame_resumo.pack(padx=10, pady=5, fill="both", expand=True)
-
-    # Tree com scrollbar
-    tree_scroll = ttk.Scrollbar(frame_resumo)
-    tree_scroll.pack(side="right", fill="y")
-
-    tree_financeiro = ttk.Treeview(
-        frame_resumo,
-        columns=("data", "entrada", "saida", "total"),
-        show="tree headings",
-        yscrollcommand=tree_scroll.set
-    )
-    tree_scroll.config(command=tree_financeiro.yview)
-    
-    # Configure columns
-    tree_financeiro.heading("#0", text="")
-    tree_financeiro.heading("data", text="Data")
-    tree_financeiro.heading("entrada", text="Total Entradas")
-    tree_financeiro.heading("saida", text="Total Saídas")
-    tree_financeiro.heading("total", text="Total Geral")
-    
-    # Configure column widths
-    tree_financeiro.column("#0", width=30)
-    tree_financeiro.column("data", width=100)
-    tree_financeiro.column("entrada", width=150)
-    tree_financeiro.column("saida", width=150)
-    tree_financeiro.column("total", width=150)
-    
-    tree_financeiro.pack(fill="both", expand=True)
-
-    def atualizar_tree_financeiro():
-        tree_financeiro.delete(*tree_financeiro.get_children())
-        resumo = financeiro.obter_resumo_diario_completo()
-
-        hoje_str = datetime.today().strftime("%d/%m/%Y")
-        if resumo.empty or hoje_str not in resumo["data"].values:
-            resumo = pd.concat([resumo, pd.DataFrame([{
-                "data": hoje_str, "entrada": 0.0, "saida": 0.0, "total": 0.0
-            }])], ignore_index=True)
-
-        for _, row in resumo.iterrows():
-            # Inserir linha principal com totais
-            parent = tree_financeiro.insert(
-                "", "end",
-                values=(
-                    row["data"],
-                    f"R${row['entrada']:.2f}",
-                    f"R${abs(row['saida']):.2f}",
-                    f"R${row['total']:.2f}"
-                ),
-                tags=('day',)
-            )
+    def montar_aba_financeiro():
+        frame_resumo = ttk.LabelFrame(aba_financeiro, text="Resumo Diário")
+        frame_resumo.pack(padx=10, pady=5, fill="both", expand=True)
+
+        # Tree com scrollbar
+        tree_scroll = ttk.Scrollbar(frame_resumo)
+        tree_scroll.pack(side="right", fill="y")
+
+        tree_financeiro = ttk.Treeview(
+            frame_resumo,
+            columns=("data", "entrada", "saida", "total", "saldo"),
+            show="tree headings",
+            yscrollcommand=tree_scroll.set
+        )
+        tree_scroll.config(command=tree_financeiro.yview)
+
+        # Configure columns
+        tree_financeiro.heading("#0", text="")
+        tree_financeiro.heading("data", text="Data")
+        tree_financeiro.heading("entrada", text="Total Entradas")
+        tree_financeiro.heading("saida", text="Total Saídas")
+        tree_financeiro.heading("total", text="Total Geral")
+        tree_financeiro.heading("saldo", text="Saldo Acumulado")
+
+        # Configure column widths
+        tree_financeiro.column("#0", width=30)
+        tree_financeiro.column("data", width=100)
+        tree_financeiro.column("entrada", width=150)
+        tree_financeiro.column("saida", width=150)
+        tree_financeiro.column("total", width=150)
+        tree_financeiro.column("saldo", width=150)
+
+        tree_financeiro.pack(fill="both", expand=True)
+
+        # Configurar estilos
+        tree_financeiro.tag_configure('day', font=('Arial', 10, 'bold'))
+        tree_financeiro.tag_configure('header', font=('Arial', 9, 'bold'), background='#f0f0f0')
+        tree_financeiro.tag_configure('entrada', foreground='green')
+        tree_financeiro.tag_configure('saida', foreground='red')
+
+        def expandir_dia_financeiro(data):
+            """Monta os lançamentos de um dia só quando o nó é aberto"""
+            detalhes = financeiro.obter_detalhes_dia(data)
 
-            # Buscar detalhes do dia
-            detalhes = financeiro.obter_detalhes_dia(row["data"])
-            
             # Inserir entradas
             entradas = detalhes[detalhes["tipo"] == "entrada"]
             if not entradas.empty:
-                entrada_header = tree_financeiro.insert(parent, "end", values=("", "ENTRADAS", "", ""), tags=('header',))
-                for _, ent in entradas.iterrows():
+                entrada_header = tree_financeiro.insert(data, "end", values=("", "ENTRADAS", "", ""), tags=('header',))
+                for ent in entradas.to_dict("records"):
                     if ent['descricao'] != "Saldo inicial do dia" or ent['valor'] != 0:
                         tree_financeiro.insert(
                             entrada_header, "end",
@@ -248,342 +352,572 @@ def iniciar_interface():
             # Inserir saídas
             saidas = detalhes[detalhes["tipo"] == "saida"]
             if not saidas.empty:
-                saida_header = tree_financeiro.insert(parent, "end", values=("", "SAÍDAS", "", ""), tags=('header',))
-                for _, sai in saidas.iterrows():
+                saida_header = tree_financeiro.insert(data, "end", values=("", "SAÍDAS", "", ""), tags=('header',))
+                for sai in saidas.to_dict("records"):
                     tree_financeiro.insert(
                         saida_header, "end",
                         values=("", sai['descricao'], "", f"R${abs(sai['valor']):.2f}"),
                         tags=('saida',)
                     )
 
-        # Configurar estilos
-        tree_financeiro.tag_configure('day', font=('Arial', 10, 'bold'))
-        tree_financeiro.tag_configure('header', font=('Arial', 9, 'bold'), background='#f0f0f0')
-        tree_financeiro.tag_configure('entrada', foreground='green')
-        tree_financeiro.tag_configure('saida', foreground='red')
+        # Só a página atual de dias fica no widget; os filhos são criados ao abrir o dia
+        paginas_financeiro = TreeviewPaginado(
+            tree_financeiro,
+            lambda row: (
+                row["data"],
+                f"R${row['entrada']:.2f}",
+                f"R${abs(row['saida']):.2f}",
+                f"R${row['total']:.2f}",
+                f"R${row['saldo_acumulado']:.2f}"
+            ),
+            coluna_iid="data",
+            tamanho_pagina=TAMANHO_PAGINA,
+            expandir=expandir_dia_financeiro,
+            tags=('day',)
+        )
+        paginas_financeiro.criar_controles(frame_resumo).pack(side="bottom", fill="x", pady=5, before=tree_financeiro)
+
+        # Conta lançamentos vistos pela interface, para descartar resumos calculados antes deles
+        versao_financeiro = [0]
+
+        @instrumentacao.medido
+        def atualizar_tree_financeiro():
+            # Lançamento do dia (se faltar) é criado aqui, nunca na thread de cálculo
+            financeiro.inicializar_dia_atual()
+            versao = versao_financeiro[0]
+            tarefas.executar(
+                financeiro.obter_resumo_diario_completo,
+                ao_concluir=lambda resumo: exibir_resumo_financeiro(resumo, versao),
+                chave="financeiro",
+                descricao="Calculando resumo financeiro..."
+            )
 
-    # Frame para botão de nova despesa
-    frame_nova_despesa = ttk.Frame(aba_financeiro)
-    frame_nova_despesa.pack(padx=10, pady=5, fill="x")
+        @instrumentacao.medido
+        def exibir_resumo_financeiro(resumo, versao):
+            import pandas as pd
 
-    def abrir_popup_nova_despesa():
-        hoje_str = datetime.today().strftime("%d/%m/%Y")
-        popup = tk.Toplevel(root)
-        popup.title(f"Lançar Nova Despesa - {hoje_str}")
-        popup.geometry("400x150")
-        
-        frame = ttk.LabelFrame(popup, text=f"Nova Despesa - {hoje_str}")
-        frame.pack(padx=10, pady=5, fill="x")
-        
-        tk.Label(frame, text="Descrição:").grid(row=0, column=0, padx=5, pady=5)
-        tk.Label(frame, text="Valor:").grid(row=1, column=0, padx=5, pady=5)
-        
-        entry_desc = tk.Entry(frame, width=30)
-        entry_valor = tk.Entry(frame, width=15)
-        
-        entry_desc.grid(row=0, column=1, padx=5, pady=5)
-        entry_valor.grid(row=1, column=1, padx=5, pady=5)
-        
-        def salvar_despesa():
-            try:
-                desc = entry_desc.get()
-                valor = float(entry_valor.get())
-                financeiro.adicionar_saida(desc, valor)
+            if versao != versao_financeiro[0]:
+                # Houve lançamentos durante o cálculo: recalcula
                 atualizar_tree_financeiro()
-                popup.destroy()
-            except Exception as e:
-                messagebox.showerror("Erro", str(e))
-        
-        tk.Button(frame, text="Salvar", command=salvar_despesa).grid(row=2, column=0, columnspan=2, pady=10)
-
-    btn_nova_despesa = ttk.Button(
-        frame_nova_despesa, 
-        text="Lançar Nova Despesa", 
-        command=abrir_popup_nova_despesa
-    )
-    btn_nova_despesa.pack(side="left", padx=5)
+                return
+
+            hoje = hoje_str()
+            if resumo.empty or hoje not in resumo["data"].values:
+                resumo = pd.concat([resumo, pd.DataFrame([financeiro.obter_resumo_dia(hoje)])], ignore_index=True)
+
+            paginas_financeiro.definir_dados(resumo, manter_pagina=True)
+
+        # Frame para botão de nova despesa
+        frame_nova_despesa = ttk.Frame(aba_financeiro)
+        frame_nova_despesa.pack(padx=10, pady=5, fill="x")
+
+        def abrir_popup_nova_despesa():
+            hoje = hoje_str()
+            popup = tk.Toplevel(root)
+            popup.title(f"Lançar Nova Despesa - {hoje}")
+            popup.geometry("400x150")
+
+            frame = ttk.LabelFrame(popup, text=f"Nova Despesa - {hoje}")
+            frame.pack(padx=10, pady=5, fill="x")
+
+            tk.Label(frame, text="Descrição:").grid(row=0, column=0, padx=5, pady=5)
+            tk.Label(frame, text="Valor:").grid(row=1, column=0, padx=5, pady=5)
+
+            entry_desc = tk.Entry(frame, width=30)
+            entry_valor = tk.Entry(frame, width=15)
+
+            entry_desc.grid(row=0, column=1, padx=5, pady=5)
+            entry_valor.grid(row=1, column=1, padx=5, pady=5)
+
+            def salvar_despesa():
+                try:
+                    desc = entry_desc.get()
+                    valor = float(entry_valor.get())
+                    financeiro.adicionar_saida(desc, valor)
+                    popup.destroy()
+                except Exception as e:
+                    messagebox.showerror("Erro", str(e))
+
+            tk.Button(frame, text="Salvar", command=salvar_despesa).grid(row=2, column=0, columnspan=2, pady=10)
+
+        btn_nova_despesa = ttk.Button(
+            frame_nova_despesa,
+            text="Lançar Nova Despesa",
+            command=abrir_popup_nova_despesa
+        )
+        btn_nova_despesa.pack(side="left", padx=5)
+
+        def ao_mudar_financeiro(evento, dados):
+            if evento != "lancamentos_registrados":
+                return
+            versao_financeiro[0] += 1
+            datas = dict.fromkeys(linha["data"] for linha in dados["linhas"])
+            hoje = hoje_str()
+            if any(data != hoje for data in datas):
+                # Lançamento retroativo muda o saldo acumulado dos dias seguintes
+                atualizar_tree_financeiro()
+            else:
+                paginas_financeiro.atualizar_linha(financeiro.obter_resumo_dia(hoje))
+
+        ouvintes_abas.append(ao_mudar_financeiro)
+        atualizar_tree_financeiro()
 
     # --- ABA HISTÓRICO (Atualizada) ---
-    frame_filtro = ttk.LabelFrame(aba_historico, text="Filtrar Vendas")
-    frame_filtro.pack(padx=10, pady=10, fill="x")
-
-    tk.Label(frame_filtro, text="Dia:").grid(row=0, column=0)
-    entry_dia = tk.Entry(frame_filtro, width=5)
-    entry_dia.grid(row=0, column=1)
-
-    tk.Label(frame_filtro, text="Mês:").grid(row=0, column=2)
-    entry_mes = tk.Entry(frame_filtro, width=5)
-    entry_mes.grid(row=0, column=3)
-
-    tk.Label(frame_filtro, text="Ano:").grid(row=0, column=4)
-    entry_ano = tk.Entry(frame_filtro, width=6)
-    entry_ano.grid(row=0, column=5)
-
-    tk.Label(frame_filtro, text="Produto:").grid(row=0, column=6)
-    combo_filtro_produto = ttk.Combobox(frame_filtro, width=20)
-    combo_filtro_produto.grid(row=0, column=7)
-
-    def atualizar_combo_filtro_produto():
-        produtos = list(inventario.df_produtos.index)
-        combo_filtro_produto["values"] = [""] + produtos
-
-    def atualizar_historico():
-        filtro_atual["dia"] = entry_dia.get() or None
-        filtro_atual["mes"] = entry_mes.get() or None
-        filtro_atual["ano"] = entry_ano.get() or None
-        filtro_atual["produto"] = combo_filtro_produto.get() or None
-
-        df = inventario.filtrar_vendas_por_data(**filtro_atual)
-        vendas_agrupadas = inventario.obter_vendas_agrupadas()
-        
-        # Filtra vendas agrupadas se necessário
-        if any(filtro_atual.values()):
-            # Aplica filtros nas vendas agrupadas
-            if filtro_atual["ano"]:
-                vendas_agrupadas = vendas_agrupadas[vendas_agrupadas["data"].str[6:] == f"{int(filtro_atual['ano']):04d}"]
-            if filtro_atual["mes"]:
-                vendas_agrupadas = vendas_agrupadas[vendas_agrupadas["data"].str[3:5] == f"{int(filtro_atual['mes']):02d}"]
-            if filtro_atual["dia"]:
-                vendas_agrupadas = vendas_agrupadas[vendas_agrupadas["data"].str[:2] == f"{int(filtro_atual['dia']):02d}"]
-            if filtro_atual["produto"]:
-                vendas_agrupadas = vendas_agrupadas[vendas_agrupadas["produto"].str.contains(filtro_atual["produto"], na=False)]
-
-        tree_vendas.delete(*tree_vendas.get_children())
-        
-        if not vendas_agrupadas.empty:
-            for _, row in vendas_agrupadas.iterrows():
-                tree_vendas.insert("", tk.END, values=(
-                    row["data"], 
-                    row["produto"], 
-                    row["quantidade"], 
-                    f"R${row['lucro']:.2f}",
-                    row["venda_id"]
-                ))
+    def montar_aba_historico():
+        frame_filtro = ttk.LabelFrame(aba_historico, text="Filtrar Vendas")
+        frame_filtro.pack(padx=10, pady=10, fill="x")
+
+        tk.Label(frame_filtro, text="Dia:").grid(row=0, column=0)
+        entry_dia = tk.Entry(frame_filtro, width=5)
+        entry_dia.grid(row=0, column=1)
+
+        tk.Label(frame_filtro, text="Mês:").grid(row=0, column=2)
+        entry_mes = tk.Entry(frame_filtro, width=5)
+        entry_mes.grid(row=0, column=3)
+
+        tk.Label(frame_filtro, text="Ano:").grid(row=0, column=4)
+        entry_ano = tk.Entry(frame_filtro, width=6)
+        entry_ano.grid(row=0, column=5)
+
+        tk.Label(frame_filtro, text="Produto:").grid(row=0, column=6)
+        combo_filtro_produto = ttk.Combobox(frame_filtro, width=20)
+        combo_filtro_produto.grid(row=0, column=7)
+        # "" no topo: sem filtro de produto
+        atualizar_combo_filtro_produto = instrumentacao.medido(ligar_busca(combo_filtro_produto, fixos=("",)))
+
+        @instrumentacao.medido
+        def atualizar_historico():
+            filtro_atual["dia"] = entry_dia.get() or None
+            filtro_atual["mes"] = entry_mes.get() or None
+            filtro_atual["ano"] = entry_ano.get() or None
+            filtro_atual["produto"] = combo_filtro_produto.get() or None
+
+            # Filtra as vendas agrupadas pela data tipada (sem fatiar strings), em segundo plano;
+            # um novo filtro cancela o anterior
+            filtro = dict(filtro_atual)
+            tarefas.executar(
+                lambda: inventario.filtrar_vendas_agrupadas(**filtro),
+                ao_concluir=paginas_vendas.definir_dados,
+                chave="historico",
+                descricao="Filtrando histórico..."
+            )
 
-    def limpar_filtros():
-        entry_dia.delete(0, tk.END)
-        entry_mes.delete(0, tk.END)
-        entry_ano.delete(0, tk.END)
-        combo_filtro_produto.set("")
-        filtro_atual.update({"dia": None, "mes": None, "ano": None, "produto": None})
-        atualizar_historico()
+        def limpar_filtros():
+            entry_dia.delete(0, tk.END)
+            entry_mes.delete(0, tk.END)
+            entry_ano.delete(0, tk.END)
+            combo_filtro_produto.set("")
+            filtro_atual.update({"dia": None, "mes": None, "ano": None, "produto": None})
+            atualizar_historico()
 
-    tk.Button(frame_filtro, text="Filtrar", command=atualizar_historico).grid(row=0, column=8, padx=5)
-    tk.Button(frame_filtro, text="Limpar Filtros", command=limpar_filtros).grid(row=0, column=9)
+        tk.Button(frame_filtro, text="Filtrar", command=atualizar_historico).grid(row=0, column=8, padx=5)
+        tk.Button(frame_filtro, text="Limpar Filtros", command=limpar_filtros).grid(row=0, column=9)
+
+        frame_vendas = ttk.LabelFrame(aba_historico, text="Vendas")
+        frame_vendas.pack(padx=10, pady=10, fill="both", expand=True)
+
+        tree_vendas = ttk.Treeview(frame_vendas, columns=("data", "produto", "quantidade", "lucro", "venda_id"), show="headings")
+        tree_vendas.heading("data", text="Data")
+        tree_vendas.heading("produto", text="Produto(s)")
+        tree_vendas.heading("quantidade", text="Qtd Total")
+        tree_vendas.heading("lucro", text="Lucro")
+        tree_vendas.heading("venda_id", text="ID Venda")
+        tree_vendas.pack(fill="both", expand=True)
+
+        # iid = venda_id: evita que o Tk converta ids só com dígitos em números
+        paginas_vendas = TreeviewPaginado(
+            tree_vendas,
+            lambda row: (
+                row["data"],
+                row["produto"],
+                row["quantidade"],
+                f"R${row['lucro']:.2f}",
+                row["venda_id"]
+            ),
+            coluna_iid="venda_id",
+            tamanho_pagina=TAMANHO_PAGINA
+        )
+        paginas_vendas.criar_controles(frame_vendas).pack(side="bottom", fill="x", pady=5, before=tree_vendas)
+
+        def mostrar_detalhes_venda():
+            selecionado = tree_vendas.selection()
+            if not selecionado:
+                return
+
+            venda_id = selecionado[0]
+
+            popup = tk.Toplevel(root)
+            popup.title(f"Detalhes da Venda - ID: {venda_id}")
+            popup.geometry("500x300")
+
+            detalhes = inventario.obter_detalhes_venda(venda_id)
+
+            tree_detalhes_venda = ttk.Treeview(popup, columns=("produto", "quantidade", "lucro"), show="headings")
+            tree_detalhes_venda.heading("produto", text="Produto")
+            tree_detalhes_venda.heading("quantidade", text="Quantidade")
+            tree_detalhes_venda.heading("lucro", text="Lucro")
+            tree_detalhes_venda.pack(fill="both", expand=True)
+
+            for _, row in detalhes.iterrows():
+                tree_detalhes_venda.insert("", tk.END, values=(
+                    row["produto"],
+                    row["quantidade"],
+                    f"R${row['lucro']:.2f}"
+                ))
 
-    frame_vendas = ttk.LabelFrame(aba_historico, text="Vendas")
-    frame_vendas.pack(padx=10, pady=10, fill="both", expand=True)
+        tree_vendas.bind("<Double-1>", lambda e: mostrar_detalhes_venda())
 
-    tree_vendas = ttk.Treeview(frame_vendas, columns=("data", "produto", "quantidade", "lucro", "venda_id"), show="headings")
-    tree_vendas.heading("data", text="Data")
-    tree_vendas.heading("produto", text="Produto(s)")
-    tree_vendas.heading("quantidade", text="Qtd Total")
-    tree_vendas.heading("lucro", text="Lucro")
-    tree_vendas.heading("venda_id", text="ID Venda")
-    tree_vendas.pack(fill="both", expand=True)
+        def ao_trocar_aba(event):
+            # Financeiro, Estoque e Vendas do Dia são mantidos pelos eventos (ao_mudar_dados)
+            if aba.index("current") == 1:  # Histórico
+                atualizar_historico()
 
-    def mostrar_detalhes_venda():
-        selecionado = tree_vendas.selection()
-        if not selecionado:
-            return
-        
-        item = tree_vendas.item(selecionado[0])
-        venda_id = item["values"][4]
-        
-        popup = tk.Toplevel(root)
-        popup.title(f"Detalhes da Venda - ID: {venda_id}")
-        popup.geometry("500x300")
-        
-        detalhes = inventario.obter_detalhes_venda(venda_id)
-        
-        tree_detalhes_venda = ttk.Treeview(popup, columns=("produto", "quantidade", "lucro"), show="headings")
-        tree_detalhes_venda.heading("produto", text="Produto")
-        tree_detalhes_venda.heading("quantidade", text="Quantidade")
-        tree_detalhes_venda.heading("lucro", text="Lucro")
-        tree_detalhes_venda.pack(fill="both", expand=True)
-        
-        for _, row in detalhes.iterrows():
-            tree_detalhes_venda.insert("", tk.END, values=(
-                row["produto"], 
-                row["quantidade"], 
-                f"R${row['lucro']:.2f}"
-            ))
-
-    tree_vendas.bind("<Double-1>", lambda e: mostrar_detalhes_venda())
+        aba.bind("<<NotebookTabChanged>>", ao_trocar_aba, add="+")
 
-    def ao_trocar_aba(event):
-        if aba.index("current") == 1:  # Histórico
-            atualizar_historico()
-        elif aba.index("current") == 3:  # Financeiro
-            atualizar_tree_financeiro()
+        def ao_mudar_historico(evento, dados):
+            if evento == "produto_removido":
+                combo_filtro_produto["values"] = [p for p in combo_filtro_produto["values"] if p != dados["nome"]]
 
-    aba.bind("<<NotebookTabChanged>>", ao_trocar_aba)
+        ouvintes_abas.append(ao_mudar_historico)
+        atualizar_combo_filtro_produto()
+        atualizar_historico()
 
     # --- ABA ESTOQUE ---
-    frame_top = ttk.Frame(aba_estoque_total)
-    frame_top.pack(padx=10, pady=10, fill="x")
-
-    btn_novo_produto = tk.Button(frame_top, text="+ Novo Produto", command=lambda: abrir_popup_novo_produto())
-    btn_novo_produto.pack(side="left", padx=(0, 10))
-
-    btn_editar_produto = tk.Button(frame_top, text="Editar Produto", command=lambda: abrir_popup_editar_produto())
-    btn_editar_produto.pack(side="left", padx=(0, 10))
-    btn_editar_produto.config(state="disabled")
-
-    btn_remover_produto = tk.Button(frame_top, text="Remover Produto", command=lambda: remover_produto())
-    btn_remover_produto.pack(side="left")
-    btn_remover_produto.config(state="disabled")
+    def montar_aba_estoque():
+        frame_top = ttk.Frame(aba_estoque_total)
+        frame_top.pack(padx=10, pady=10, fill="x")
 
-    frame_tabela = ttk.LabelFrame(aba_estoque_total, text="Produtos em Estoque")
-    frame_tabela.pack(padx=10, pady=10, fill="both", expand=True)
+        btn_novo_produto = tk.Button(frame_top, text="+ Novo Produto", command=lambda: abrir_popup_novo_produto())
+        btn_novo_produto.pack(side="left", padx=(0, 10))
 
-    tree_frame = tk.Frame(frame_tabela)
-    tree_frame.pack(fill="both", expand=True)
-
-    scroll_estoque = ttk.Scrollbar(tree_frame, orient="vertical")
-    scroll_estoque.pack(side="right", fill="y")
+        btn_editar_produto = tk.Button(frame_top, text="Editar Produto", command=lambda: abrir_popup_editar_produto())
+        btn_editar_produto.pack(side="left", padx=(0, 10))
+        btn_editar_produto.config(state="disabled")
 
-    # Removido campo "custo" da tabela
-    tree_produtos = ttk.Treeview(tree_frame, columns=("nome", "estoque", "preco"), show="headings", yscrollcommand=scroll_estoque.set)
-    tree_produtos.heading("nome", text="PRODUTO")
-    tree_produtos.heading("estoque", text="ESTOQUE")
-    tree_produtos.heading("preco", text="PREÇO")
-    tree_produtos.pack(side="left", fill="both", expand=True)
+        btn_remover_produto = tk.Button(frame_top, text="Remover Produto", command=lambda: remover_produto())
+        btn_remover_produto.pack(side="left")
+        btn_remover_produto.config(state="disabled")
 
-    scroll_estoque.config(command=tree_produtos.yview)
+        var_so_baixa = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            frame_top, text="Só estoque baixo", variable=var_so_baixa, command=lambda: atualizar_tabela_produtos()
+        ).pack(side="right")
+
+        frame_tabela = ttk.LabelFrame(aba_estoque_total, text="Produtos em Estoque")
+        frame_tabela.pack(padx=10, pady=10, fill="both", expand=True)
+
+        tree_frame = tk.Frame(frame_tabela)
+        tree_frame.pack(fill="both", expand=True)
+
+        scroll_estoque = ttk.Scrollbar(tree_frame, orient="vertical")
+        scroll_estoque.pack(side="right", fill="y")
+
+        # Removido campo "custo" da tabela
+        tree_produtos = ttk.Treeview(tree_frame, columns=("nome", "estoque", "minimo", "preco"), show="headings", yscrollcommand=scroll_estoque.set)
+        tree_produtos.heading("nome", text="PRODUTO")
+        tree_produtos.heading("estoque", text="ESTOQUE")
+        tree_produtos.heading("minimo", text="MÍNIMO")
+        tree_produtos.heading("preco", text="PREÇO")
+        tree_produtos.pack(side="left", fill="both", expand=True)
+
+        scroll_estoque.config(command=tree_produtos.yview)
+
+        tree_produtos.tag_configure('bold', font=('Arial', 10, 'bold'))
+        tree_produtos.tag_configure('baixo', foreground="red")
+
+        def valores_produto(nome, estoque, estoque_minimo, preco):
+            return (nome.upper(), estoque, estoque_minimo, f"R${preco:.2f}")
+
+        def tags_produto(estoque, estoque_minimo):
+            return ('bold', 'baixo') if estoque <= estoque_minimo else ('bold',)
+
+        @instrumentacao.medido
+        def atualizar_tabela_produtos():
+            tree_produtos.delete(*tree_produtos.get_children())
+            df = inventario.df_produtos
+            if var_so_baixa.get():
+                # Já vem do índice de estoque, dos mais urgentes para os menos
+                df = df.loc[inventario.produtos_em_baixa().index]
+            for nome, estoque, estoque_minimo, preco in zip(df.index, df["estoque"], df["estoque_minimo"], df["preco"]):
+                tree_produtos.insert(
+                    "", tk.END, iid=nome,
+                    values=valores_produto(nome, estoque, estoque_minimo, preco),
+                    tags=tags_produto(estoque, estoque_minimo)
+                )
+            desabilitar_botoes()
 
-    style = ttk.Style()
-    style.configure("Treeview.Heading", font=("Arial", 11, "bold"))
-    style.configure("Treeview", font=("Arial", 10))
-    tree_produtos.tag_configure('bold', font=('Arial', 10, 'bold'))
+        def abrir_popup_novo_produto():
+            popup = tk.Toplevel(root)
+            popup.title("Adicionar Novo Produto")
+            popup.geometry("400x240")
+
+            tk.Label(popup, text="Nome:").grid(row=0, column=0, sticky="e", padx=5, pady=5)
+            tk.Label(popup, text="Estoque:").grid(row=1, column=0, sticky="e", padx=5, pady=5)
+            tk.Label(popup, text="Preço:").grid(row=2, column=0, sticky="e", padx=5, pady=5)
+            tk.Label(popup, text="Estoque mínimo:").grid(row=3, column=0, sticky="e", padx=5, pady=5)
+
+            e_nome = tk.Entry(popup, font=("Arial", 12))
+            e_estoque = tk.Entry(popup, font=("Arial", 12))
+            e_preco = tk.Entry(popup, font=("Arial", 12))
+            e_minimo = tk.Entry(popup, font=("Arial", 12))
+
+            e_nome.grid(row=0, column=1, padx=5, pady=5)
+            e_estoque.grid(row=1, column=1, padx=5, pady=5)
+            e_preco.grid(row=2, column=1, padx=5, pady=5)
+            e_minimo.grid(row=3, column=1, padx=5, pady=5)
+
+            def confirmar():
+                try:
+                    nome = e_nome.get()
+                    estoque = int(e_estoque.get())
+                    preco = float(e_preco.get())
+                    minimo = e_minimo.get()
+                    inventario.adicionar_produto(nome, preco, estoque, int(minimo) if minimo else 0)
+                    popup.destroy()
+                except Exception as e:
+                    messagebox.showerror("Erro", str(e))
+
+            tk.Button(popup, text="Confirmar", font=("Arial", 12), command=confirmar).grid(row=4, column=0, columnspan=2, pady=10)
+
+        def abrir_popup_editar_produto():
+            selecionado = tree_produtos.selection()
+            if not selecionado:
+                messagebox.showwarning("Aviso", "Selecione um produto para editar.")
+                return
+            nome = selecionado[0]
+            popup = tk.Toplevel(root)
+            popup.title(f"Editar Produto: {nome}")
+
+            tk.Label(popup, text=f"Produto: {nome.upper()}").grid(row=0, column=0, columnspan=2, pady=(5,10))
+
+            tk.Label(popup, text="Novo preço:").grid(row=1, column=0, sticky="e")
+            tk.Label(popup, text="Ajustar estoque (+/-):").grid(row=2, column=0, sticky="e")
+            tk.Label(popup, text="Novo estoque mínimo:").grid(row=3, column=0, sticky="e")
+
+            e_preco = tk.Entry(popup)
+            e_ajuste = tk.Entry(popup)
+            e_minimo = tk.Entry(popup)
+
+            e_preco.grid(row=1, column=1, padx=5, pady=2)
+            e_ajuste.grid(row=2, column=1, padx=5, pady=2)
+            e_minimo.grid(row=3, column=1, padx=5, pady=2)
+            e_minimo.insert(0, str(inventario.df_produtos.at[nome, "estoque_minimo"]))
+
+            def confirmar():
+                try:
+                    preco = e_preco.get()
+                    ajuste = e_ajuste.get()
+                    minimo = e_minimo.get()
+
+                    inventario.editar_produto(
+                        nome,
+                        float(preco) if preco else None,
+                        int(minimo) if minimo else None
+                    )
+                    if ajuste:
+                        inventario.alterar_estoque(nome, int(ajuste))
+
+                    popup.destroy()
+                except Exception as e:
+                    messagebox.showerror("Erro", str(e))
+
+            tk.Button(popup, text="Salvar", command=confirmar).grid(row=4, column=0, pady=10)
+            tk.Button(popup, text="Cancelar", command=popup.destroy).grid(row=4, column=1, pady=10)
+
+        def remover_produto():
+            selecionado = tree_produtos.selection()
+            if not selecionado:
+                messagebox.showwarning("Aviso", "Selecione um produto para remover.")
+                return
+            nome = selecionado[0]
+            if messagebox.askyesno("Confirmação", f"Remover '{nome}' do estoque?"):
+                try:
+                    inventario.remover_produto(nome)
+                except Exception as e:
+                    messagebox.showerror("Erro", str(e))
+
+        def ao_selecionar_produto(event):
+            selecionado = tree_produtos.selection()
+            if selecionado:
+                btn_editar_produto.config(state="normal")
+                btn_remover_produto.config(state="normal")
+            else:
+                desabilitar_botoes()
+
+        def desabilitar_botoes():
+            btn_editar_produto.config(state="disabled")
+            btn_remover_produto.config(state="disabled")
+
+        tree_produtos.bind("<<TreeviewSelect>>", ao_selecionar_produto)
+
+        def ao_mudar_estoque(evento, dados):
+            if evento == "produto_atualizado":
+                nome = dados["nome"]
+                estoque, estoque_minimo = dados["estoque"], dados["estoque_minimo"]
+                valores = valores_produto(nome, estoque, estoque_minimo, dados["preco"])
+                tags = tags_produto(estoque, estoque_minimo)
+                if var_so_baixa.get() and 'baixo' not in tags:
+                    # Saiu da baixa: some da vista filtrada
+                    if tree_produtos.exists(nome):
+                        tree_produtos.delete(nome)
+                        desabilitar_botoes()
+                elif tree_produtos.exists(nome):
+                    tree_produtos.item(nome, values=valores, tags=tags)
+                else:
+                    tree_produtos.insert("", tk.END, iid=nome, values=valores, tags=tags)
+            elif evento == "produto_removido":
+                if tree_produtos.exists(dados["nome"]):
+                    tree_produtos.delete(dados["nome"])
+                desabilitar_botoes()
+
+        ouvintes_abas.append(ao_mudar_estoque)
+        atualizar_tabela_produtos()
+
+    # Índice da aba -> função que a monta na primeira seleção
+    montadores = {
+        1: ("Histórico", montar_aba_historico),
+        2: ("Estoque", montar_aba_estoque),
+        3: ("Financeiro", montar_aba_financeiro),
+    }
 
-    def atualizar_tabela_produtos():
-        tree_produtos.delete(*tree_produtos.get_children())
-        for nome, row in inventario.df_produtos.iterrows():
-            tree_produtos.insert("", tk.END, iid=nome, values=(nome.upper(), row["estoque"], f"R${row['preco']:.2f}"), tags=('bold',))
-        atualizar_combo_produtos()
-        atualizar_combo_filtro_produto()
-        desabilitar_botoes()
+    def ao_trocar_aba(event):
+        indice = aba.index("current")
+        if indice in montadores:
+            nome, montar = montadores.pop(indice)
+            with cronometro.medir(f"aba {nome}"):
+                montar()
+            print(f"Aba {nome} montada em {cronometro.fases[-1][1] * 1000:.1f} ms")
 
-    def atualizar_combo_produtos():
-        produtos = list(inventario.df_produtos.index)
-        combo_produtos['values'] = produtos
-        if produtos:
-            combo_produtos.current(0)
+    aba.bind("<<NotebookTabChanged>>", ao_trocar_aba)
 
-    def abrir_popup_novo_produto():
+    def mostrar_instrumentacao(event=None):
+        """Resumo das medições (F12, só com a instrumentação ligada)"""
         popup = tk.Toplevel(root)
-        popup.title("Adicionar Novo Produto")
-        popup.geometry("400x200")
-
-        tk.Label(popup, text="Nome:").grid(row=0, column=0, sticky="e", padx=5, pady=5)
-        tk.Label(popup, text="Estoque:").grid(row=1, column=0, sticky="e", padx=5, pady=5)
-        tk.Label(popup, text="Preço:").grid(row=2, column=0, sticky="e", padx=5, pady=5)
-
-        e_nome = tk.Entry(popup, font=("Arial", 12))
-        e_estoque = tk.Entry(popup, font=("Arial", 12))
-        e_preco = tk.Entry(popup, font=("Arial", 12))
-
-        e_nome.grid(row=0, column=1, padx=5, pady=5)
-        e_estoque.grid(row=1, column=1, padx=5, pady=5)
-        e_preco.grid(row=2, column=1, padx=5, pady=5)
-
-        def confirmar():
-            try:
-                nome = e_nome.get()
-                estoque = int(e_estoque.get())
-                preco = float(e_preco.get())
-                inventario.adicionar_produto(nome, preco, estoque)
-                popup.destroy()
-                atualizar_tabela_produtos()
-                atualizar_tree_vendas_dia()
-            except Exception as e:
-                messagebox.showerror("Erro", str(e))
-
-        tk.Button(popup, text="Confirmar", font=("Arial", 12), command=confirmar).grid(row=3, column=0, columnspan=2, pady=10)
-
-    def abrir_popup_editar_produto():
-        selecionado = tree_produtos.selection()
-        if not selecionado:
-            messagebox.showwarning("Aviso", "Selecione um produto para editar.")
+        popup.title("Instrumentação")
+        popup.geometry("900x400")
+        texto = tk.Text(popup, font=("Courier", 9), wrap="none")
+        texto.insert("1.0", instrumentacao.relatorio())
+        texto.config(state="disabled")
+        texto.pack(fill="both", expand=True)
+
+        def gravar():
+            caminho = instrumentacao.despejar()
+            if caminho:
+                messagebox.showinfo("Instrumentação", f"Resumo gravado em {caminho}", parent=popup)
+
+        tk.Button(popup, text="Gravar resumo", command=gravar).pack(pady=5)
+
+    if instrumentacao.ativa():
+        root.bind("<F12>", mostrar_instrumentacao)
+
+    # Aviso de estoque baixo: os produtos que chegam ao mínimo são juntados e
+    # avisados uma vez só quando o Tk fica livre (uma importação pode derrubar vários)
+    chegaram_ao_minimo = []
+    alerta_agendado = False
+
+    def atualizar_rotulo_estoque():
+        em_baixa = inventario.quantidade_em_baixa()
+        aba.tab(aba_estoque_total, text=f"Estoque ({em_baixa} em baixa)" if em_baixa else "Estoque")
+
+    def mostrar_alerta_estoque():
+        nonlocal alerta_agendado
+        alerta_agendado = False
+        atualizar_rotulo_estoque()
+        if not chegaram_ao_minimo:
             return
-        nome = selecionado[0]
-        popup = tk.Toplevel(root)
-        popup.title(f"Editar Produto: {nome}")
-
-        tk.Label(popup, text=f"Produto: {nome.upper()}").grid(row=0, column=0, columnspan=2, pady=(5,10))
-
-        tk.Label(popup, text="Novo preço:").grid(row=1, column=0, sticky="e")
-        tk.Label(popup, text="Ajustar estoque (+/-):").grid(row=2, column=0, sticky="e")
+        nomes = [nome.upper() for nome in dict.fromkeys(chegaram_ao_minimo)]
+        chegaram_ao_minimo.clear()
+        lista = "\n".join(nomes[:10]) + (f"\n... e mais {len(nomes) - 10}" if len(nomes) > 10 else "")
+        messagebox.showwarning("Estoque baixo", f"Chegaram ao estoque mínimo:\n{lista}")
+
+    def ao_mudar_alertas(evento, dados):
+        nonlocal alerta_agendado
+        if evento == "estoque_baixo":
+            chegaram_ao_minimo.append(dados["nome"])
+        elif evento not in ("produto_atualizado", "produto_removido"):
+            return
+        if not alerta_agendado:
+            alerta_agendado = True
+            root.after_idle(mostrar_alerta_estoque)
 
-        e_preco = tk.Entry(popup)
-        e_ajuste = tk.Entry(popup)
+    ouvintes_abas.append(ao_mudar_alertas)
 
-        e_preco.grid(row=1, column=1, padx=5, pady=2)
-        e_ajuste.grid(row=2, column=1, padx=5, pady=2)
+    @instrumentacao.medido
+    def ao_mudar_dados(evento, dados):
+        """Aplica nas Treeviews das abas já montadas só as linhas afetadas por cada mudança"""
+        for ouvinte in ouvintes_abas:
+            ouvinte(evento, dados)
 
-        def confirmar():
-            try:
-                preco = e_preco.get()
-                ajuste = e_ajuste.get()
+    def encerrar():
+        tarefas.encerrar()
+        root.destroy()
 
-                inventario.editar_produto(
-                    nome,
-                    float(preco) if preco else None
-                )
-                if ajuste:
-                    inventario.alterar_estoque(nome, int(ajuste))
-
-                popup.destroy()
-                atualizar_tabela_produtos()
-                atualizar_tree_vendas_dia()
-            except Exception as e:
-                messagebox.showerror("Erro", str(e))
-
-        tk.Button(popup, text="Salvar", command=confirmar).grid(row=3, column=0, pady=10)
-        tk.Button(popup, text="Cancelar", command=popup.destroy).grid(row=3, column=1, pady=10)
-
-    def remover_produto():
-        selecionado = tree_produtos.selection()
-        if not selecionado:
-            messagebox.showwarning("Aviso", "Selecione um produto para remover.")
+    def salvar_automaticamente():
+        nonlocal fechando
+        if fechando:
             return
-        nome = selecionado[0]
-        if messagebox.askyesno("Confirmação", f"Remover '{nome}' do estoque?"):
-            try:
-                inventario.remover_produto(nome)
-                atualizar_tabela_produtos()
-                atualizar_tree_vendas_dia()
-            except Exception as e:
-                messagebox.showerror("Erro", str(e))
-
-    def ao_selecionar_produto(event):
-        selecionado = tree_produtos.selection()
-        if selecionado:
-            btn_editar_produto.config(state="normal")
-            btn_remover_produto.config(state="normal")
+        fechando = True
+        if not carregado:
+            encerrar()
+        elif persistencia is None:
+            # Cópias tiradas aqui: a gravação roda em segundo plano com a janela ainda responsiva
+            dados = (inventario.df_produtos.copy(), inventario.df_vendas.copy(), financeiro.df_financeiro.copy())
+            tarefas.executar(
+                armazenamento.salvar_dados, *dados,
+                ao_concluir=lambda _: encerrar(),
+                ao_falhar=falha_ao_salvar,
+                descricao="Salvando dados..."
+            )
         else:
-            desabilitar_botoes()
-
-    def desabilitar_botoes():
-        btn_editar_produto.config(state="disabled")
-        btn_remover_produto.config(state="disabled")
-
-    tree_produtos.bind("<<TreeviewSelect>>", ao_selecionar_produto)
+            # Com gravação incremental (journal ou SQLite) basta fechar: tudo já está no disco
+            persistencia.fechar()
+            encerrar()
 
-    def salvar_automaticamente():
-        excel_io.salvar_dados(inventario.df_produtos, inventario.df_vendas, financeiro.df_financeiro)
-        root.destroy()
+    def falha_ao_salvar(erro):
+        nonlocal fechando
+        fechando = False
+        messagebox.showerror("Erro", f"Erro ao salvar dados: {erro}")
 
     root.protocol("WM_DELETE_WINDOW", salvar_automaticamente)
 
-    # Inicialização
-    atualizar_combo_produtos()
-    atualizar_combo_filtro_produto()
-    atualizar_tree_vendas_dia()
-    atualizar_tabela_produtos()
-    atualizar_tree_financeiro()
-    atualizar_tree_carrinho()
-    desabilitar_botoes()
-
-    root.mainloop()
\ No newline at end of file
+    def carregar():
+        # pandas e os módulos de dados são importados aqui, fora da thread do Tk
+        with cronometro.medir("importação dos módulos de dados"):
+            criar_modelos()
+        # Carrega dados do backend configurado (Excel por padrão) e monta os índices
+        with cronometro.medir("carga dos dados"):
+            df_produtos, df_vendas, df_financeiro = armazenamento.carregar_dados()
+            inventario.df_produtos = df_produtos
+            inventario.df_vendas = df_vendas
+            financeiro.df_financeiro = df_financeiro
+
+    def ao_carregar(_):
+        nonlocal persistencia, carregado
+        persistencia = armazenamento.acompanhar(inventario, financeiro)
+        carregado = True
+        financeiro.inicializar_dia_atual()
+
+        # Eventos disparados fora da thread do Tk são repassados a ela
+        inventario.inscrever(lambda evento, dados: tarefas.no_thread_principal(ao_mudar_dados, evento, dados))
+        financeiro.inscrever(lambda evento, dados: tarefas.no_thread_principal(ao_mudar_dados, evento, dados))
+
+        # Inicialização: só a aba Vendas; as demais ao serem selecionadas
+        atualizar_combo_produtos()
+        atualizar_tree_vendas_dia()
+        atualizar_tree_carrinho()
+        for botao in botoes_vendas:
+            botao.config(state="normal")
+        for indice in montadores:
+            aba.tab(indice, state="normal")
+        atualizar_rotulo_estoque()
+        cronometro.marcar("dados exibidos")
+        print(cronometro.relatorio())
+
+    def falha_ao_carregar(erro):
+        messagebox.showerror("Erro", f"Erro ao carregar dados: {erro}")
+        encerrar()
+
+    tarefas.executar(carregar, ao_concluir=ao_carregar, ao_falhar=falha_ao_carregar, descricao="Carregando dados...")
+    root.after_idle(lambda: cronometro.marcar("primeira exibição"))
+
+    root.mainloop()
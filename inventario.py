@@ -1,39 +1,221 @@
 import pandas as pd
 from datetime import datetime
 import uuid
+import threading
+import numpy as np
+from registro import Registro
+from catalogo import Catalogo
+from carrinho import Carrinho, ItemCarrinho
+from eventos import Observavel, escrita
+from indices import IndiceBusca, IndiceDatas, IndiceEstoque, IndicePosicoes, intervalo_datas, mascara_datas, ordinal_dia, ordinais_dias
+from utils import FORMATO_DATA, converter_datas, hoje_str
 
-class Inventario:
+COLUNAS_PRODUTOS = ["preco", "estoque", "id", "estoque_minimo"]
+# produto_id é o id estável do catálogo; o nome fica como categoria (um código por linha)
+COLUNAS_VENDAS = ["data", "produto", "produto_id", "quantidade", "valor_venda", "venda_id"]
+TIPOS_VENDAS = {"produto": "category", "produto_id": "int64", "quantidade": "int64", "valor_venda": "float64"}
+# Data tipada (datetime64) mantida ao lado da data de exibição dd/mm/aaaa
+DERIVADAS_VENDAS = {"data_dt": lambda df: converter_datas(df["data"])}
+# Tabela materializada com uma linha por venda (venda_id)
+COLUNAS_AGRUPADAS = ["data", "venda_id", "produto", "quantidade", "lucro"]
+TIPOS_AGRUPADAS = {"quantidade": "int64", "lucro": "float64"}
+
+class Inventario(Observavel):
     def __init__(self):
-        self.df_produtos = pd.DataFrame(columns=["preco", "estoque"])
-        self.df_vendas = pd.DataFrame(columns=["data", "produto", "quantidade", "valor_venda", "venda_id"])
-        self.carrinho = []
+        self.catalogo = Catalogo()
+        self.df_produtos = pd.DataFrame(columns=COLUNAS_PRODUTOS)
+        # Vendas ficam num log somente-anexação; o DataFrame é montado na leitura
+        self._vendas = Registro(COLUNAS_VENDAS, tipos=TIPOS_VENDAS, derivadas=DERIVADAS_VENDAS)
+        self._agrupadas = Registro(COLUNAS_AGRUPADAS, tipos=TIPOS_AGRUPADAS, derivadas=DERIVADAS_VENDAS)
+        # Protege vendas e índices entre a interface e consultas em segundo plano
+        self._lock = threading.RLock()
+        self._reconstruir_indices()
+        self.carrinho = Carrinho()
+
+    @property
+    def df_produtos(self):
+        """Produtos indexados pelo nome; "id" é o id no catálogo e "estoque_minimo" o ponto de reposição"""
+        return self._produtos
+
+    @df_produtos.setter
+    def df_produtos(self, df):
+        df = df.copy()
+        if "id" not in df.columns:
+            df["id"] = np.nan
+        # Ids já gravados primeiro, para que produtos sem id não tomem o id de outro
+        self.catalogo = Catalogo()
+        com_id = df["id"].notna()
+        for nome, id_produto in zip(df.index[com_id], df["id"][com_id]):
+            self.catalogo.registrar(nome, id_produto)
+        df["id"] = [self.catalogo.registrar(nome) for nome in df.index]
+        df["id"] = df["id"].astype("int64")
+        if "estoque_minimo" not in df.columns:
+            df["estoque_minimo"] = 0
+        df["estoque_minimo"] = pd.to_numeric(df["estoque_minimo"], errors="coerce").fillna(0).astype("int64")
+        self._produtos = df
+        # Margem até o mínimo de cada produto, para achar os em baixa sem varrer a tabela
+        self._indice_estoque = IndiceEstoque(zip(df.index, df["estoque"].fillna(0) - df["estoque_minimo"]))
+        # Nomes para a busca enquanto se digita (combos de produto)
+        self._indice_busca = IndiceBusca(df.index)
+        if hasattr(self, "_vendas"):
+            # Produtos que só existem no histórico continuam no catálogo
+            self._registrar_vendas_no_catalogo(self.df_vendas)
+
+    def _registrar_vendas_no_catalogo(self, df):
+        if "produto_id" not in df.columns:
+            return
+        conhecidos = df.dropna(subset=["produto_id"]).drop_duplicates("produto_id", keep="last")
+        for nome, id_produto in zip(conhecidos["produto"], conhecidos["produto_id"]):
+            self.catalogo.registrar(nome, id_produto)
+
+    def _codificar_produtos(self, df):
+        """Preenche produto_id pelo catálogo (vendas antigas só têm o nome) e guarda o nome como categoria"""
+        if df is None:
+            return None
+        df = df.copy()
+        if "produto_id" not in df.columns:
+            df["produto_id"] = np.nan
+        self._registrar_vendas_no_catalogo(df)
+        faltando = df["produto_id"].isna()
+        if faltando.any():
+            df.loc[faltando, "produto_id"] = self.catalogo.codificar(df.loc[faltando, "produto"])
+        df["produto_id"] = df["produto_id"].astype("int64")
+        df["produto"] = df["produto"].astype("category")
+        return df.reindex(columns=COLUNAS_VENDAS + [col for col in df.columns if col not in COLUNAS_VENDAS])
+
+    @property
+    def df_vendas(self):
+        """Histórico de vendas como DataFrame (materializado sob demanda)"""
+        return self._vendas.dataframe
+
+    @df_vendas.setter
+    def df_vendas(self, df):
+        with self._lock:
+            self._vendas.substituir(self._codificar_produtos(df))
+            self._reconstruir_indices()
+
+    def _reconstruir_indices(self):
+        """Recria os índices e a tabela de vendas agrupadas a partir do histórico completo"""
+        df = self.df_vendas
+        self._indice_datas = IndiceDatas(ordinais_dias(df["data_dt"]))
+        # Chave inteira (produto_id): filtros por produto não comparam strings
+        self._indice_produtos = IndicePosicoes(df["produto_id"])
+        self._indice_vendas = IndicePosicoes(df["venda_id"])
+        self.reconstruir_vendas_agrupadas()
+
+    def _anexar_vendas(self, linhas, data):
+        """Anexa as linhas de uma venda ao log, aos índices e à tabela agrupada.
+
+        O custo depende só do número de itens, não do tamanho do histórico.
+        """
+        self._anexar_lote_vendas(linhas, [ordinal_dia(data)] * len(linhas))
+
+    def _anexar_lote_vendas(self, linhas, ordinais):
+        """Anexa linhas de uma ou mais vendas (agrupadas por venda_id) num único lote do log"""
+        with self._lock:
+            inicio = len(self._vendas)
+            self._vendas.anexar_lote(linhas)
+            por_venda = {}  # venda_id -> (linhas, ordinal), na ordem de chegada
+            for posicao, (venda, ordinal) in enumerate(zip(linhas, ordinais), start=inicio):
+                self._indice_datas.anexar(ordinal, posicao)
+                self._indice_produtos.anexar(venda["produto_id"], posicao)
+                self._indice_vendas.anexar(venda["venda_id"], posicao)
+                por_venda.setdefault(venda["venda_id"], ([], ordinal))[0].append(venda)
+
+            posicao = len(self._agrupadas)
+            self._agrupadas.anexar_lote([agrupar_linhas_venda(grupo) for grupo, _ in por_venda.values()])
+            for posicao, (_, ordinal) in enumerate(por_venda.values(), start=posicao):
+                self._indice_agrupadas.anexar(ordinal, posicao)
+
+    def _notificar_produto(self, nome):
+        """Avisa os ouvintes do estado atual de um produto.
+
+        Toda mudança de produto passa por aqui, então é aqui que o índice de
+        estoque é atualizado; ao cair para o mínimo ou abaixo dele sai também
+        o aviso "estoque_baixo".
+        """
+        estoque = self.df_produtos.at[nome, "estoque"]
+        estoque_minimo = self.df_produtos.at[nome, "estoque_minimo"]
+        margem = (0 if pd.isna(estoque) else estoque) - estoque_minimo
+        anterior = self._indice_estoque.atualizar(nome, margem)
+        self._notificar(
+            "produto_atualizado",
+            nome=nome,
+            preco=self.df_produtos.at[nome, "preco"],
+            estoque=estoque,
+            id=self.df_produtos.at[nome, "id"],
+            estoque_minimo=estoque_minimo
+        )
+        if margem <= 0 and (anterior is None or anterior > 0):
+            self._notificar("estoque_baixo", nome=nome, estoque=estoque, estoque_minimo=estoque_minimo)
     
-    def adicionar_produto(self, nome, preco, estoque):
+    @escrita
+    def adicionar_produto(self, nome, preco, estoque, estoque_minimo=0):
         """Adiciona novo produto (sem custo)"""
         if nome in self.df_produtos.index:
             raise Exception("Produto já cadastrado.")
-        self.df_produtos.loc[nome] = [preco, estoque]
+        if estoque_minimo < 0:
+            raise Exception("Estoque mínimo não pode ser negativo.")
+        self.df_produtos.loc[nome] = [preco, estoque, self.catalogo.registrar(nome), estoque_minimo]
+        # A linha nova vem como float; id, estoque e estoque mínimo continuam inteiros
+        for coluna in ("id", "estoque", "estoque_minimo"):
+            if self.df_produtos[coluna].notna().all():
+                self.df_produtos[coluna] = self.df_produtos[coluna].astype("int64")
+        self._indice_busca.adicionar(nome)
+        self._notificar_produto(nome)
     
-    def editar_produto(self, nome, novo_preco=None):
-        """Edita produto (apenas preço)"""
+    @escrita
+    def editar_produto(self, nome, novo_preco=None, novo_estoque_minimo=None):
+        """Edita preço e/ou estoque mínimo do produto"""
         if nome not in self.df_produtos.index:
             raise Exception("Produto não encontrado.")
+        if novo_estoque_minimo is not None and novo_estoque_minimo < 0:
+            raise Exception("Estoque mínimo não pode ser negativo.")
         if novo_preco is not None:
             self.df_produtos.at[nome, "preco"] = novo_preco
+        if novo_estoque_minimo is not None:
+            self.df_produtos.at[nome, "estoque_minimo"] = novo_estoque_minimo
+        if novo_preco is not None or novo_estoque_minimo is not None:
+            self._notificar_produto(nome)
     
+    @escrita
     def alterar_estoque(self, nome, ajuste):
         """Altera estoque do produto"""
         if nome not in self.df_produtos.index:
             raise Exception("Produto não encontrado.")
-        self.df_produtos.at[nome, "estoque"] += ajuste
-        if self.df_produtos.at[nome, "estoque"] < 0:
+        if self.df_produtos.at[nome, "estoque"] + ajuste < 0:
             raise Exception("Estoque não pode ser negativo.")
+        self.df_produtos.at[nome, "estoque"] += ajuste
+        self._notificar_produto(nome)
     
+    @escrita
     def remover_produto(self, nome):
         """Remove produto do inventário"""
         if nome not in self.df_produtos.index:
             raise Exception("Produto não encontrado.")
         self.df_produtos.drop(nome, inplace=True)
+        self._indice_estoque.remover(nome)
+        self._indice_busca.remover(nome)
+        self._notificar("produto_removido", nome=nome)
+
+    def produtos_em_baixa(self, limite=0):
+        """Produtos com estoque até `limite` unidades acima do mínimo (padrão: no mínimo ou abaixo).
+
+        Vem do índice de margens, sem percorrer o catálogo; os mais urgentes primeiro.
+        """
+        em_baixa = self._indice_estoque.em_baixa(limite)
+        nomes = [nome for nome, _ in em_baixa]
+        resultado = self.df_produtos.loc[nomes, ["estoque", "estoque_minimo"]]
+        resultado.insert(2, "margem", [margem for _, margem in em_baixa])
+        return resultado
+
+    def buscar_produtos(self, texto, limite=50):
+        """Nomes de produtos com uma palavra começando por `texto` (sem diferenciar acentos)"""
+        return self._indice_busca.buscar(texto, limite)
+
+    def quantidade_em_baixa(self, limite=0):
+        """Quantos produtos estão até `limite` unidades acima do mínimo"""
+        return len(self._indice_estoque.em_baixa(limite))
     
     def adicionar_ao_carrinho(self, nome_produto, quantidade, desconto=0):
         """Adiciona produto ao carrinho para venda em pacote"""
@@ -42,77 +224,84 @@ class Inventario:
         
         estoque_atual = self.df_produtos.at[nome_produto, "estoque"]
         
-        # Verifica quantidade já no carrinho
-        quantidade_carrinho = sum(item['quantidade'] for item in self.carrinho if item['produto'] == nome_produto)
-        
-        if estoque_atual < quantidade + quantidade_carrinho:
+        # Verifica quantidade já reservada no carrinho
+        if estoque_atual < quantidade + self.carrinho.reservado(nome_produto):
             raise Exception("Estoque insuficiente.")
         
         preco = self.df_produtos.at[nome_produto, "preco"]
-        preco_com_desconto = preco * (1 - desconto)
-        total_item = preco_com_desconto * quantidade
-        
-        item = {
-            'produto': nome_produto,
-            'quantidade': quantidade,
-            'desconto': desconto,
-            'preco_unitario': preco,
-            'preco_com_desconto': preco_com_desconto,
-            'total_item': total_item  # Mudança aqui para consistência
-        }
-        
-        self.carrinho.append(item)
-        return item
+        return self.carrinho.adicionar(ItemCarrinho(nome_produto, quantidade, desconto, preco))
     
     def remover_do_carrinho(self, index):
         """Remove item do carrinho pelo índice"""
         if 0 <= index < len(self.carrinho):
-            return self.carrinho.pop(index)
+            return self.carrinho.remover(index)
         else:
             raise Exception("Índice inválido.")
     
     def limpar_carrinho(self):
         """Limpa todos os itens do carrinho"""
-        self.carrinho.clear()
+        self.carrinho.limpar()
     
     def obter_total_carrinho(self):
         """Retorna o total do carrinho"""
-        return sum(item['total_item'] for item in self.carrinho)
+        return self.carrinho.total
     
+    @escrita
     def finalizar_venda_carrinho(self):
-        """Finaliza a venda do carrinho"""
+        """Finaliza a venda do carrinho de forma atômica.
+
+        Todo o estoque é conferido antes de qualquer mudança; se algum produto
+        não tiver estoque (ou tiver sido removido) nada é gravado.
+        """
         if not self.carrinho:
             raise Exception("Carrinho vazio.")
+
+        # Confere todas as reservas de uma vez contra o estoque atual
+        reservas = pd.Series(self.carrinho.reservas(), dtype="int64")
+        removidos = reservas.index.difference(self.df_produtos.index)
+        if len(removidos):
+            raise Exception(f"Produto não cadastrado: {', '.join(removidos)}")
+        estoque_anterior = self.df_produtos.loc[reservas.index, "estoque"]
+        insuficientes = reservas.index[(estoque_anterior < reservas).to_numpy()]
+        if len(insuficientes):
+            raise Exception(f"Estoque insuficiente: {', '.join(insuficientes)}")
         
         # Gera ID único para a venda
         venda_id = str(uuid.uuid4())[:8]
-        data_venda = datetime.today().strftime("%d/%m/%Y")
-        
-        # Valor total da venda
-        valor_total_venda = 0
+        agora = datetime.today()
+        data_venda = agora.strftime(FORMATO_DATA)
         
-        # Registra cada item da venda
-        for item in self.carrinho:
-            nova_venda = {
+        linhas = [
+            {
                 "data": data_venda,
-                "produto": item['produto'],
-                "quantidade": item['quantidade'],
-                "valor_venda": item['total_item'],  # Mudança aqui para consistência
+                "produto": item.produto,
+                "produto_id": self.catalogo.obter_id(item.produto),
+                "quantidade": item.quantidade,
+                "valor_venda": item.total_item,  # Mudança aqui para consistência
                 "venda_id": venda_id
             }
-            # Ensure DataFrame columns match
-            self.df_vendas = pd.concat([self.df_vendas, pd.DataFrame([nova_venda])], ignore_index=True)
-            
-            # Atualiza estoque
-            self.df_produtos.at[item['produto'], "estoque"] -= item['quantidade']
-            
-            valor_total_venda += item['total_item']
+            for item in self.carrinho
+        ]
+        valor_total_venda = self.carrinho.total
+
+        # Baixa de estoque numa única atribuição vetorizada; desfeita se a gravação falhar
+        self.df_produtos.loc[reservas.index, "estoque"] = estoque_anterior - reservas
+        try:
+            self._anexar_vendas(linhas, agora)
+        except Exception:
+            self.df_produtos.loc[reservas.index, "estoque"] = estoque_anterior
+            raise
         
         # Limpa carrinho
         self.limpar_carrinho()
+
+        self._notificar("vendas_registradas", linhas=linhas)
+        for nome in dict.fromkeys(linha["produto"] for linha in linhas):
+            self._notificar_produto(nome)
         
         return venda_id, valor_total_venda
     
+    @escrita
     def registrar_venda(self, nome_produto, quantidade, desconto=0):
         """Registra uma venda simples"""
         if nome_produto not in self.df_produtos.index:
@@ -128,30 +317,123 @@ class Inventario:
         
         # Gera ID único para a venda
         venda_id = str(uuid.uuid4())[:8]
+        agora = datetime.today()
         
         nova_venda = {
-            "data": datetime.today().strftime("%d/%m/%Y"),
+            "data": agora.strftime(FORMATO_DATA),
             "produto": nome_produto,
+            "produto_id": self.catalogo.obter_id(nome_produto),
             "quantidade": quantidade,
             "valor_venda": valor_venda,
             "venda_id": venda_id
         }
-        self.df_vendas = pd.concat([self.df_vendas, pd.DataFrame([nova_venda])], ignore_index=True)
+        self._anexar_vendas([nova_venda], agora)
         
         self.df_produtos.at[nome_produto, "estoque"] -= quantidade
+
+        self._notificar("vendas_registradas", linhas=[nova_venda])
+        self._notificar_produto(nome_produto)
         return venda_id, valor_venda
     
-    def obter_vendas_agrupadas(self):
-        """Retorna vendas agrupadas por venda_id"""
-        # Retorna DataFrame vazio com estrutura correta se não há vendas
-        if self.df_vendas.empty:
-            return pd.DataFrame(columns=["data", "venda_id", "produto", "quantidade", "lucro"])
-        
-        # Cria uma cópia do DataFrame para evitar alterações no original
-        df_temp = self.df_vendas.copy()
-        
+    @escrita
+    def importar_vendas_em_lote(self, vendas):
+        """Registra de uma vez vendas vindas de outros terminais (CSV, PDV offline).
+
+        `vendas` é um DataFrame ou iterável de dicts com produto e quantidade e,
+        opcionalmente, data (dd/mm/aaaa, padrão hoje), desconto, valor_venda e
+        venda_id (linhas com o mesmo id formam uma venda; sem id, cada linha é
+        uma venda). Linhas inválidas são recusadas sem abortar o lote; uma
+        venda com linhas de datas diferentes é recusada inteira. O estoque é
+        consumido na ordem das linhas: a partir da primeira linha que não cabe
+        no estoque de um produto, as seguintes dele também são recusadas.
+
+        Retorna (aceitas, recusadas): as aceitas no formato de df_vendas e as
+        recusadas com as colunas recebidas mais "motivo".
+        """
+        lote = vendas.copy() if isinstance(vendas, pd.DataFrame) else pd.DataFrame(list(vendas))
+        lote = lote.reset_index(drop=True)
+        obrigatorias = [col for col in ("produto", "quantidade") if col not in lote.columns]
+        if obrigatorias:
+            raise Exception(f"Colunas obrigatórias ausentes: {', '.join(obrigatorias)}")
+
+        hoje = hoje_str()
+        produto = lote["produto"].where(lote["produto"].notna()).astype(object)
+        produto = produto.where(produto.isna(), produto.astype(str).str.strip())
+        quantidade = pd.to_numeric(lote["quantidade"], errors="coerce")
+        desconto = pd.to_numeric(lote.get("desconto", pd.Series(0.0, index=lote.index)), errors="coerce").fillna(0.0)
+        data = lote.get("data", pd.Series(None, index=lote.index, dtype=object))
+        data = data.where(data.notna(), hoje).astype(str).str.strip()
+        data_dt = converter_datas(data)
+        venda_id = lote.get("venda_id", pd.Series(None, index=lote.index, dtype=object))
+        venda_id = venda_id.where(venda_id.isna(), venda_id.astype(str).str.strip())
+
+        motivo = pd.Series(None, index=lote.index, dtype=object)
+        def recusar(mascara, texto):
+            motivo[mascara.to_numpy() & motivo.isna().to_numpy()] = texto
+
+        with self._lock:
+            recusar(~produto.isin(self.df_produtos.index), "Produto não cadastrado")
+            recusar(quantidade.isna() | (quantidade <= 0) | (quantidade % 1 != 0), "Quantidade inválida")
+            recusar((desconto < 0) | (desconto > 1), "Desconto inválido")
+            recusar(data_dt.isna(), "Data inválida")
+            recusar(pd.Series([v in self._indice_vendas for v in venda_id], index=lote.index), "Venda já registrada")
+            # Uma venda tem uma data só (no financeiro e nas vendas agrupadas)
+            com_id = venda_id.notna() & motivo.isna()
+            datas_por_venda = data_dt[com_id].groupby(venda_id[com_id]).transform("nunique")
+            recusar(datas_por_venda.reindex(lote.index, fill_value=1) > 1, "Datas diferentes na mesma venda")
+
+            # Quantidade pedida acumulada por produto, na ordem das linhas
+            pedido = quantidade.where(motivo.isna(), 0).groupby(produto).cumsum()
+            recusar(pedido > produto.map(self.df_produtos["estoque"]), "Estoque insuficiente")
+
+            aceitas = motivo.isna().to_numpy()
+            recusadas = lote[~aceitas].assign(motivo=motivo[~aceitas])
+            if not aceitas.any():
+                return pd.DataFrame(columns=COLUNAS_VENDAS), recusadas
+
+            produto, quantidade, desconto = produto[aceitas], quantidade[aceitas].astype("int64"), desconto[aceitas]
+            valor_calculado = produto.map(self.df_produtos["preco"]) * (1 - desconto) * quantidade
+            valor_venda = pd.to_numeric(lote["valor_venda"], errors="coerce")[aceitas] if "valor_venda" in lote.columns else valor_calculado
+            # Array object: uma coluna de texto do pandas não aceita a atribuição por máscara
+            ids = venda_id[aceitas].to_numpy(dtype=object)
+            sem_id = pd.isna(ids)
+            ids[sem_id] = [str(uuid.uuid4())[:8] for _ in range(int(sem_id.sum()))]
+
+            novas = pd.DataFrame({
+                "data": data[aceitas],
+                "produto": produto,
+                "produto_id": produto.map(self.df_produtos["id"]).astype("int64"),
+                "quantidade": quantidade,
+                "valor_venda": valor_venda.fillna(valor_calculado).astype("float64"),
+                "venda_id": ids,
+            })
+            # Ordem cronológica: mantém o índice de datas sequencial quando o lote é recente
+            ordem = np.argsort(data_dt[aceitas].to_numpy(), kind="stable")
+            novas = novas.iloc[ordem].reset_index(drop=True)
+            linhas = novas.to_dict("records")
+
+            # Baixa de estoque numa única atribuição vetorizada; desfeita se a gravação falhar
+            consumo = novas.groupby("produto", sort=False)["quantidade"].sum()
+            estoque_anterior = self.df_produtos.loc[consumo.index, "estoque"]
+            self.df_produtos.loc[consumo.index, "estoque"] = estoque_anterior - consumo
+            try:
+                self._anexar_lote_vendas(linhas, ordinais_dias(data_dt[aceitas].iloc[ordem]))
+            except Exception:
+                self.df_produtos.loc[consumo.index, "estoque"] = estoque_anterior
+                raise
+
+        self._notificar("vendas_registradas", linhas=linhas)
+        for nome in consumo.index:
+            self._notificar_produto(nome)
+        return novas, recusadas
+
+    def _agrupar_vendas(self, df):
+        """Agrupa linhas de venda por venda_id, em ordem cronológica"""
+        # Nomes juntados viram texto; sem isso o pandas tenta devolver a categoria
+        df = df.assign(produto=df["produto"].astype(object))
         # Agrupa por data e venda_id
-        vendas_agrupadas = df_temp.groupby(['data', 'venda_id']).agg({
+        vendas_agrupadas = df.groupby(['data', 'venda_id']).agg({
+            'data_dt': 'first',
             'produto': lambda x: ', '.join(x) if len(x) > 1 else x.iloc[0],
             'quantidade': 'sum',
             'valor_venda': 'sum'
@@ -159,42 +441,130 @@ class Inventario:
         
         # Renomeia a coluna para compatibilidade com a interface
         vendas_agrupadas = vendas_agrupadas.rename(columns={'valor_venda': 'lucro'})
-        
-        # Ordena por data (converte para datetime para ordenação correta)
+        return vendas_agrupadas.sort_values('data_dt', kind='stable').reset_index(drop=True)
+
+    def reconstruir_vendas_agrupadas(self):
+        """Recalcula do zero a tabela de vendas agrupadas (carga de dados ou conferência)"""
+        df = self.df_vendas
+        agrupadas = self._agrupar_vendas(df) if not df.empty else None
+        self._agrupadas.substituir(agrupadas)
+        self._indice_agrupadas = IndiceDatas(ordinais_dias(self._agrupadas.dataframe["data_dt"]))
+
+    def verificar_vendas_agrupadas(self):
+        """Confere a tabela mantida incrementalmente contra um agrupamento completo"""
+        colunas = COLUNAS_AGRUPADAS
+        mantida = self._agrupadas.dataframe[colunas].sort_values(["data", "venda_id"]).reset_index(drop=True)
+        if self.df_vendas.empty:
+            return mantida.empty
+        completa = self._agrupar_vendas(self.df_vendas)[colunas].sort_values(["data", "venda_id"]).reset_index(drop=True)
         try:
-            vendas_agrupadas['data_sort'] = pd.to_datetime(vendas_agrupadas['data'], format='%d/%m/%Y')
-            vendas_agrupadas = vendas_agrupadas.sort_values('data_sort', ascending=False)
-            vendas_agrupadas = vendas_agrupadas.drop('data_sort', axis=1)
-        except:
-            # Se falhar na conversão, ordena como string
-            vendas_agrupadas = vendas_agrupadas.sort_values('data', ascending=False)
+            pd.testing.assert_frame_equal(mantida, completa, check_dtype=False)
+            return True
+        except AssertionError:
+            return False
+
+    def obter_vendas_agrupadas(self):
+        """Retorna vendas agrupadas por venda_id"""
+        # Retorna DataFrame vazio com estrutura correta se não há vendas
+        if self.df_vendas.empty:
+            return pd.DataFrame(columns=["data", "venda_id", "produto", "quantidade", "lucro"])
         
-        return vendas_agrupadas
+        return self.filtrar_vendas_agrupadas()
+
+    def filtrar_vendas_agrupadas(self, dia=None, mes=None, ano=None, produto=None):
+        """Vendas agrupadas (mais recentes primeiro) filtradas por data e pelas vendas que contêm o produto"""
+        with self._lock:
+            if self.df_vendas.empty:
+                return pd.DataFrame(columns=["data", "venda_id", "produto", "quantidade", "lucro"])
+
+            agrupadas = self._agrupadas.dataframe
+            selecao = _selecao_por_data(agrupadas, self._indice_agrupadas, dia, mes, ano)
+            if isinstance(selecao, slice) and self._indice_agrupadas.sequencial:
+                # Trecho contínuo em ordem cronológica: fatia invertida, sem cópia
+                resultado = agrupadas.iloc[selecao][::-1]
+            else:
+                if isinstance(selecao, slice):
+                    selecao = np.arange(len(agrupadas))[selecao]
+                ordem = self._indice_agrupadas.posicoes()
+                selecao = ordem[np.isin(ordem, selecao)][::-1]
+                resultado = agrupadas.take(selecao)
+
+            if produto:
+                # Mantém as vendas em que o produto aparece
+                posicoes = self._posicoes_filtradas(dia, mes, ano, produto)
+                vendas_com_produto = self.df_vendas["venda_id"].to_numpy()[posicoes]
+                resultado = resultado[resultado["venda_id"].isin(vendas_com_produto)]
+            return resultado[COLUNAS_AGRUPADAS]
     
     def obter_detalhes_venda(self, venda_id):
         """Retorna os detalhes de uma venda específica"""
         if self.df_vendas.empty:
             return pd.DataFrame(columns=["data", "produto", "quantidade", "lucro", "venda_id"])
         
-        detalhes = self.df_vendas[self.df_vendas['venda_id'] == venda_id].copy()
+        # Busca direta no índice venda_id -> posições, sem varrer o histórico
+        detalhes = self.df_vendas.take(self.posicoes_da_venda(venda_id))
         # Renomeia a coluna para compatibilidade com a interface
         detalhes = detalhes.rename(columns={'valor_venda': 'lucro'})
         return detalhes
     
+    def posicoes_da_venda(self, venda_id):
+        """Posições em df_vendas das linhas de uma venda (base para devoluções, reimpressões etc.)"""
+        return self._indice_vendas.posicoes(str(venda_id))
+
+    def _posicoes_filtradas(self, dia=None, mes=None, ano=None, produto=None):
+        """Posições (ordenadas) das linhas que passam no filtro, usando os índices.
+
+        Devolve um `slice` quando o resultado é um trecho contínuo do histórico,
+        ou um array de posições caso contrário.
+        """
+        selecao = _selecao_por_data(self.df_vendas, self._indice_datas, dia, mes, ano)
+
+        if produto:
+            posicoes_produto = self._indice_produtos.posicoes(self.catalogo.obter_id(produto))
+            if isinstance(selecao, slice):
+                a = np.searchsorted(posicoes_produto, selecao.start, side="left")
+                b = np.searchsorted(posicoes_produto, selecao.stop, side="left")
+                selecao = posicoes_produto[a:b]
+            else:
+                selecao = np.intersect1d(selecao, posicoes_produto, assume_unique=True)
+        return selecao
+
     def filtrar_vendas_por_data(self, dia=None, mes=None, ano=None, produto=None):
         """Filtra vendas por data e produto"""
-        if self.df_vendas.empty:
-            return pd.DataFrame(columns=["data", "produto", "quantidade", "valor_venda", "venda_id"])
-            
-        df = self.df_vendas.copy()
-        
-        if ano:
-            df = df[df["data"].str[6:] == f"{int(ano):04d}"]
-        if mes:
-            df = df[df["data"].str[3:5] == f"{int(mes):02d}"]
-        if dia:
-            df = df[df["data"].str[:2] == f"{int(dia):02d}"]
-        if produto:
-            df = df[df["produto"] == produto]
-        
-        return df
\ No newline at end of file
+        with self._lock:
+            if self.df_vendas.empty:
+                return pd.DataFrame(columns=COLUNAS_VENDAS)
+
+            selecao = self._posicoes_filtradas(dia, mes, ano, produto)
+            if isinstance(selecao, slice):
+                # Trecho contínuo: fatia sem copiar o histórico
+                return self.df_vendas.iloc[selecao]
+            return self.df_vendas.take(selecao)
+
+def agrupar_linhas_venda(linhas):
+    """Linha da tabela agrupada (formato de COLUNAS_AGRUPADAS) para as linhas de uma venda"""
+    return {
+        "data": linhas[0]["data"],
+        "venda_id": linhas[0]["venda_id"],
+        "produto": ", ".join(venda["produto"] for venda in linhas),
+        "quantidade": sum(venda["quantidade"] for venda in linhas),
+        "lucro": sum(venda["valor_venda"] for venda in linhas)
+    }
+
+def _selecao_por_data(df, indice, dia=None, mes=None, ano=None):
+    """Linhas de `df` no filtro de data, via busca binária no índice quando possível.
+
+    Devolve um `slice` quando o resultado é um trecho contínuo de `df`, ou um
+    array ordenado de posições caso contrário.
+    """
+    intervalo = intervalo_datas(dia, mes, ano)
+    if intervalo is not None:
+        a, b = indice.limites(*intervalo)
+        if indice.sequencial:
+            return slice(a, b)
+        return np.sort(indice.posicoes(a, b))
+
+    # Dia sem o mês, ou mês sem o ano: não há intervalo contínuo, filtra por máscara
+    if dia or mes:
+        return np.flatnonzero(mascara_datas(df["data_dt"], dia, mes, ano))
+    return slice(0, len(df))
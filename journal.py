@@ -0,0 +1,248 @@
+import contextlib
+import json
+import os
+import threading
+import time
+import pandas as pd
+
+ARQUIVO_JOURNAL = "dados.journal"
+# Eventos que mudam os dados; os demais (ex.: "estoque_baixo") são só avisos e não vão para o arquivo
+EVENTOS_GRAVADOS = {"produto_atualizado", "produto_removido", "vendas_registradas", "lancamentos_registrados"}
+
+class Journal:
+    """Journal de escrita antecipada (NDJSON) das mudanças de inventário e financeiro.
+
+    Cada evento vira uma linha `{"seq", "evento", "dados"}` gravada no fim do
+    arquivo. O flush é imediato (sobrevive a queda do processo) e o fsync é
+    feito em lotes: a cada `lote_fsync` registros ou `intervalo_fsync` segundos.
+
+    A compactação sela o arquivo atual e salva um retrato dos dados no
+    armazenamento principal em segundo plano. O último `seq` incluído vai
+    junto com o retrato (no snapshot, na mesma gravação do meta.json) e depois
+    para o arquivo de checkpoint; só então o arquivo selado é descartado.
+    """
+
+    def __init__(self, arquivo=None, lote_fsync=20, intervalo_fsync=1.0, limite_compactacao=500, checkpoint=None):
+        self.arquivo = arquivo or ARQUIVO_JOURNAL
+        self.lote_fsync = lote_fsync
+        self.intervalo_fsync = intervalo_fsync
+        self.limite_compactacao = limite_compactacao
+        # `checkpoint`: seq gravado junto com os dados do armazenamento principal, se houver
+        checkpoint = max(ler_checkpoint(self.arquivo), checkpoint or 0)
+        # Registros ainda não compactados (de sessões anteriores)
+        seqs = [registro["seq"] for registro in ler_registros(self.arquivo, checkpoint)]
+        self.seq = max(seqs, default=checkpoint)
+        self.registros = len(seqs)
+        self._pendentes_fsync = 0
+        self._ultimo_fsync = time.monotonic()
+        self._lock = threading.Lock()
+        self._arquivo = open(self.arquivo, "a", encoding="utf-8")
+        self._compactacao = None
+        # Exportação do xlsx que `salvar` devolve (thread), aguardada ao fechar
+        self._exportacao = None
+        # Funções usadas pela compactação automática (ver `configurar_compactacao`)
+        self._obter_dados = None
+        self._salvar = None
+        self._trava = contextlib.nullcontext()
+
+    def __call__(self, evento, dados):
+        if evento in EVENTOS_GRAVADOS:
+            self.registrar(evento, dados)
+
+    def registrar(self, evento, dados):
+        """Anexa um evento ao journal"""
+        with self._lock:
+            self.seq += 1
+            linha = json.dumps({"seq": self.seq, "evento": evento, "dados": dados}, default=_serializar, ensure_ascii=False)
+            self._arquivo.write(linha + "\n")
+            self._arquivo.flush()
+            self.registros += 1
+            self._pendentes_fsync += 1
+            if (self._pendentes_fsync >= self.lote_fsync
+                    or time.monotonic() - self._ultimo_fsync >= self.intervalo_fsync):
+                self._fsync()
+
+        if self._obter_dados and self.registros >= self.limite_compactacao:
+            self.compactar_em_segundo_plano()
+
+    def _fsync(self):
+        os.fsync(self._arquivo.fileno())
+        self._pendentes_fsync = 0
+        self._ultimo_fsync = time.monotonic()
+
+    def sincronizar(self):
+        """Força o fsync dos registros pendentes"""
+        with self._lock:
+            if self._pendentes_fsync:
+                self._fsync()
+
+    def configurar_compactacao(self, obter_dados, salvar, trava=None):
+        """Liga a compactação automática.
+
+        `obter_dados()` deve devolver cópias de (df_produtos, df_vendas, df_financeiro)
+        e é chamado na thread de quem registrou o evento; `salvar(..., seq_journal=seq)`
+        roda em segundo plano e deve gravar o seq junto com os dados. Se ela
+        devolver uma thread (ex.: exportação do xlsx), `fechar` espera por ela.
+        `trava` é a mesma que os modelos seguram ao mudar os dados e avisar
+        (ex.: eventos.TRAVA_ESCRITA): com ela, a cópia e o selo veem as mesmas mudanças.
+        """
+        self._obter_dados = obter_dados
+        self._salvar = salvar
+        if trava is not None:
+            self._trava = trava
+
+    def _selar(self):
+        """Fecha o arquivo atual como selado e abre um novo; retorna o último seq selado"""
+        with self._lock:
+            self._fsync()
+            self._arquivo.close()
+            selado = _arquivo_selado(self.arquivo)
+            # Um selo anterior que não chegou a ser compactado é mantido em ordem
+            if os.path.exists(selado):
+                with open(selado, "a", encoding="utf-8") as destino, open(self.arquivo, encoding="utf-8") as origem:
+                    destino.write(origem.read())
+                os.remove(self.arquivo)
+            else:
+                os.replace(self.arquivo, selado)
+            self._arquivo = open(self.arquivo, "a", encoding="utf-8")
+            self.registros = 0
+            return self.seq
+
+    def compactar_em_segundo_plano(self):
+        """Dobra o journal no armazenamento principal sem bloquear quem chamou"""
+        if self._compactacao is not None and self._compactacao.is_alive():
+            return self._compactacao
+        # Sem mudanças entre a cópia e o selo: o retrato contém exatamente os registros até `seq`
+        with self._trava:
+            dados = self._obter_dados()
+            seq = self._selar()
+        self._compactacao = threading.Thread(
+            target=self._compactar, args=(dados, seq), name="compactacao-journal"
+        )
+        self._compactacao.start()
+        return self._compactacao
+
+    def _compactar(self, dados, seq):
+        try:
+            self._exportacao = self._salvar(*dados, seq_journal=seq)
+            _gravar_atomico(_arquivo_checkpoint(self.arquivo), str(seq))
+            selado = _arquivo_selado(self.arquivo)
+            if os.path.exists(selado):
+                os.remove(selado)
+            print(f"Journal compactado até o registro {seq}")
+        except Exception as e:
+            print(f"Erro ao compactar journal: {e}")
+
+    def fechar(self):
+        """Aguarda a compactação e a exportação em andamento e fecha o journal com fsync"""
+        if self._compactacao is not None:
+            self._compactacao.join()
+        if self._exportacao is not None:
+            self._exportacao.join()
+        with self._lock:
+            if not self._arquivo.closed:
+                self._fsync()
+                self._arquivo.close()
+
+def _serializar(valor):
+    """Converte escalares numpy para tipos JSON"""
+    if hasattr(valor, "item"):
+        return valor.item()
+    raise TypeError(f"Tipo não serializável: {type(valor)}")
+
+def _arquivo_selado(arquivo):
+    return arquivo + ".selado"
+
+def _arquivo_checkpoint(arquivo):
+    return arquivo + ".checkpoint"
+
+def _gravar_atomico(caminho, conteudo):
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(conteudo)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporario, caminho)
+
+def ler_checkpoint(arquivo=None):
+    """Último seq gravado no arquivo de checkpoint (0 se não houver)"""
+    arquivo = arquivo or ARQUIVO_JOURNAL
+    try:
+        with open(_arquivo_checkpoint(arquivo), encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+def ler_registros(arquivo=None, a_partir_de=0):
+    """Lê os registros (selados e atuais) com seq maior que `a_partir_de`"""
+    arquivo = arquivo or ARQUIVO_JOURNAL
+    for caminho in (_arquivo_selado(arquivo), arquivo):
+        if not os.path.exists(caminho):
+            continue
+        with open(caminho, encoding="utf-8") as f:
+            for linha in f:
+                linha = linha.strip()
+                if not linha:
+                    continue
+                try:
+                    registro = json.loads(linha)
+                except json.JSONDecodeError:
+                    # Última linha truncada por queda: o resto do arquivo é descartado
+                    print(f"Registro corrompido ignorado em {caminho}")
+                    break
+                if registro["seq"] > a_partir_de:
+                    yield registro
+
+def reproduzir(df_produtos, df_vendas, df_financeiro, arquivo=None, checkpoint=None):
+    """Aplica sobre os DataFrames carregados os registros do journal posteriores a `checkpoint`.
+
+    `checkpoint` é o seq gravado junto com os dados carregados; sem ele vale o
+    arquivo de checkpoint. Retorna (df_produtos, df_vendas, df_financeiro,
+    quantidade_de_registros).
+    """
+    arquivo = arquivo or ARQUIVO_JOURNAL
+    if checkpoint is None:
+        checkpoint = ler_checkpoint(arquivo)
+
+    # Estado final de cada produto tocado (None = removido)
+    produtos = {}
+    vendas = []
+    lancamentos = []
+    total = 0
+    for registro in ler_registros(arquivo, checkpoint):
+        total += 1
+        evento, dados = registro["evento"], registro["dados"]
+        if evento == "produto_atualizado":
+            produtos[dados["nome"]] = {k: v for k, v in dados.items() if k != "nome"}
+        elif evento == "produto_removido":
+            produtos[dados["nome"]] = None
+        elif evento == "vendas_registradas":
+            vendas.extend(dados["linhas"])
+        elif evento == "lancamentos_registrados":
+            lancamentos.extend(dados["linhas"])
+
+    if not total:
+        return df_produtos, df_vendas, df_financeiro, 0
+
+    removidos = [nome for nome, estado in produtos.items() if estado is None and nome in df_produtos.index]
+    df_produtos = df_produtos.drop(removidos)
+    atualizados = {nome: estado for nome, estado in produtos.items() if estado is not None}
+    if atualizados:
+        novos = pd.DataFrame.from_dict(atualizados, orient="index")
+        existentes = novos.index.intersection(df_produtos.index)
+        for col in novos.columns:
+            if col not in df_produtos.columns:
+                # Coluna nova (ex.: id do catálogo em dados gravados antes dela)
+                df_produtos[col] = None
+            df_produtos.loc[existentes, col] = novos.loc[existentes, col]
+        adicionados = novos.drop(existentes)
+        if not adicionados.empty:
+            df_produtos = pd.concat([df_produtos, adicionados.reindex(columns=df_produtos.columns)])
+
+    if vendas:
+        df_vendas = pd.concat([df_vendas, pd.DataFrame(vendas).reindex(columns=df_vendas.columns)], ignore_index=True)
+    if lancamentos:
+        df_financeiro = pd.concat([df_financeiro, pd.DataFrame(lancamentos).reindex(columns=df_financeiro.columns)], ignore_index=True)
+
+    print(f"Journal reproduzido: {total} registros")
+    return df_produtos, df_vendas, df_financeiro, total
@@ -1,4 +1,15 @@
-from interface import iniciar_interface
+import sys
 
 if __name__ == "__main__":
-    iniciar_interface()
\ No newline at end of file
+    argumentos = sys.argv[1:]
+    if "--instrumentar" in argumentos:
+        # Tem de vir antes de montar a interface, que decide ao definir as funções se as mede
+        argumentos.remove("--instrumentar")
+        import instrumentacao
+        instrumentacao.ativar()
+    if argumentos:
+        # Com argumentos roda a linha de comando (relatórios, importação) sem carregar o Tk
+        from estoque import main
+        raise SystemExit(main(argumentos))
+    from interface import iniciar_interface
+    iniciar_interface()
@@ -0,0 +1,96 @@
+import threading
+import pandas as pd
+
+
+class Registro:
+    """Log somente-anexação com materialização preguiçosa em DataFrame.
+
+    Linhas novas vão para listas por coluna (custo constante por linha) e só
+    são juntadas ao DataFrame base, num único concat, quando alguém o lê.
+
+    `derivadas` mapeia nomes de colunas calculadas (ex.: data tipada) para
+    funções vetorizadas `f(df) -> Series`, aplicadas uma única vez à base e a
+    cada lote de linhas novas.
+
+    Anexar e materializar são protegidos por um lock, para que uma thread de
+    consulta possa ler o DataFrame enquanto a interface anexa linhas.
+    """
+
+    def __init__(self, colunas, df=None, tipos=None, derivadas=None):
+        self.colunas = list(colunas)
+        # dtype por coluna aplicado às linhas novas ao materializar
+        self.tipos = dict(tipos or {})
+        self.derivadas = dict(derivadas or {})
+        self._lock = threading.RLock()
+        self.substituir(df)
+
+    def substituir(self, df=None):
+        """Descarta o conteúdo atual e passa a usar `df` como base"""
+        if df is None:
+            df = pd.DataFrame(columns=self.colunas)
+        # Rótulos 0..n-1: a posição da linha é estável e serve de id para índices
+        if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+            df = df.reset_index(drop=True)
+        faltando = [nome for nome in self.derivadas if nome not in df.columns]
+        if faltando:
+            df = df.assign(**{nome: self.derivadas[nome](df) for nome in faltando})
+        with self._lock:
+            self._base = df
+            self._pendentes = {col: [] for col in self.colunas}
+            self._n_pendentes = 0
+
+    def anexar(self, linha):
+        """Anexa uma linha (dict) sem copiar o histórico"""
+        with self._lock:
+            for col in self.colunas:
+                self._pendentes[col].append(linha.get(col))
+            self._n_pendentes += 1
+
+    def anexar_lote(self, linhas):
+        """Anexa várias linhas (dicts) de uma vez: ou entram todas, ou nenhuma"""
+        # Monta as colunas antes de mexer no log; um erro aqui não deixa linhas pela metade
+        novas = {col: [linha.get(col) for linha in linhas] for col in self.colunas}
+        with self._lock:
+            for col in self.colunas:
+                self._pendentes[col].extend(novas[col])
+            self._n_pendentes += len(linhas)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._base) + self._n_pendentes
+
+    @property
+    def dataframe(self):
+        """DataFrame completo; junta as linhas pendentes se houver"""
+        with self._lock:
+            if self._n_pendentes:
+                novo = pd.DataFrame(self._pendentes, columns=self.colunas)
+                if self.tipos:
+                    novo = novo.astype(self.tipos)
+                for nome, derivar in self.derivadas.items():
+                    novo[nome] = derivar(novo)
+                if self._base.empty:
+                    self._base = novo
+                else:
+                    base, novo = _alinhar_categorias(self._base, novo)
+                    self._base = pd.concat([base, novo], ignore_index=True)
+                self._pendentes = {col: [] for col in self.colunas}
+                self._n_pendentes = 0
+            return self._base
+
+def _alinhar_categorias(base, novo):
+    """Dá às colunas categóricas as mesmas categorias nos dois lados.
+
+    Sem isso o concat de categorias diferentes vira object. Categorias novas
+    entram no fim, então os códigos da base não mudam.
+    """
+    for col in novo.columns:
+        if col not in base.columns:
+            continue
+        if not (isinstance(base[col].dtype, pd.CategoricalDtype) and isinstance(novo[col].dtype, pd.CategoricalDtype)):
+            continue
+        faltando = novo[col].cat.categories.difference(base[col].cat.categories, sort=False)
+        if len(faltando):
+            base = base.assign(**{col: base[col].cat.add_categories(faltando)})
+        novo[col] = novo[col].cat.set_categories(base[col].cat.categories)
+    return base, novo
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import threading
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (necessário para to_feather/read_feather)
+    FEATHER_DISPONIVEL = True
+except ImportError:
+    FEATHER_DISPONIVEL = False
+
+DIRETORIO_SNAPSHOT = "dados_snapshot"
+ARQUIVO_META = "meta.json"
+TABELAS = ("produtos", "vendas", "financeiro")
+
+# Serializa gravações do snapshot e do meta entre a thread principal e exportações
+_lock = threading.Lock()
+
+def _caminho(nome, diretorio=None):
+    return os.path.join(diretorio or DIRETORIO_SNAPSHOT, nome)
+
+def hash_arquivo(caminho):
+    """SHA-256 do conteúdo de um arquivo"""
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+def _assinatura(caminho):
+    """mtime, tamanho e hash do arquivo (ou None se não existir)"""
+    if not os.path.exists(caminho):
+        return None
+    info = os.stat(caminho)
+    return {"mtime_ns": info.st_mtime_ns, "tamanho": info.st_size, "hash": hash_arquivo(caminho)}
+
+def ler_meta(diretorio=None):
+    try:
+        with open(_caminho(ARQUIVO_META, diretorio), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _gravar_meta(meta, diretorio=None):
+    caminho = _caminho(ARQUIVO_META, diretorio)
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(temporario, caminho)
+
+def arquivo_meta(diretorio=None):
+    """Caminho do meta.json (sua mtime marca a última gravação do snapshot)"""
+    return _caminho(ARQUIVO_META, diretorio)
+
+def disponivel(diretorio=None):
+    """Há um snapshot completo (meta e as três tabelas) que pode ser lido"""
+    if not FEATHER_DISPONIVEL or ler_meta(diretorio) is None:
+        return False
+    return all(os.path.exists(_caminho(f"{t}.feather", diretorio)) for t in TABELAS)
+
+def fresco(arquivo_xlsx, diretorio=None):
+    """O snapshot vale se o xlsx não foi editado fora do app desde a última gravação nossa.
+
+    Compara primeiro mtime e tamanho (barato); só calcula o hash quando eles mudaram.
+    """
+    if not disponivel(diretorio):
+        return False
+    meta = ler_meta(diretorio)
+
+    esperado = meta.get("xlsx")
+    if not os.path.exists(arquivo_xlsx):
+        return esperado is None
+    if esperado is None:
+        return False
+    info = os.stat(arquivo_xlsx)
+    if info.st_mtime_ns == esperado["mtime_ns"] and info.st_size == esperado["tamanho"]:
+        return True
+    if hash_arquivo(arquivo_xlsx) != esperado["hash"]:
+        return False
+
+    # Só a mtime mudou (ex.: arquivo copiado); atualiza para não recalcular o hash
+    with _lock:
+        meta["xlsx"] = _assinatura(arquivo_xlsx)
+        _gravar_meta(meta, diretorio)
+    return True
+
+def carregar(diretorio=None):
+    """Lê os três DataFrames do snapshot"""
+    df_produtos = pd.read_feather(_caminho("produtos.feather", diretorio))
+    df_produtos = df_produtos.set_index(df_produtos.columns[0])
+    df_produtos.index.name = None
+    df_vendas = pd.read_feather(_caminho("vendas.feather", diretorio))
+    df_financeiro = pd.read_feather(_caminho("financeiro.feather", diretorio))
+    return df_produtos, df_vendas, df_financeiro
+
+def salvar(df_produtos, df_vendas, df_financeiro, arquivo_xlsx, de_xlsx=False, diretorio=None, seq_journal=None):
+    """Grava o snapshot e devolve o número da versão gravada (ou None sem pyarrow).
+
+    `de_xlsx=True` indica que os dados acabaram de ser lidos do xlsx, que passa
+    então a ser a referência; caso contrário o meta continua apontando para o
+    xlsx como ele está no disco e a versão fica pendente de exportação.
+    `seq_journal` é o último registro do journal incluído nos dados; vai no
+    mesmo meta.json da versão, então o snapshot e o seq nunca se desencontram.
+    """
+    if not FEATHER_DISPONIVEL:
+        return None
+    diretorio = diretorio or DIRETORIO_SNAPSHOT
+    os.makedirs(diretorio, exist_ok=True)
+    produtos = df_produtos.rename_axis("nome").reset_index()
+    with _lock:
+        meta = ler_meta(diretorio) or {}
+        for nome, df in zip(TABELAS, (produtos, df_vendas, df_financeiro)):
+            temporario = _caminho(f"{nome}.feather.tmp", diretorio)
+            # Colunas object mistas (ex.: None em linhas antigas) viram texto
+            df = df.reset_index(drop=True)
+            for col in df.columns[df.dtypes == object]:
+                df[col] = df[col].astype("string")
+            df.to_feather(temporario)
+            os.replace(temporario, _caminho(f"{nome}.feather", diretorio))
+        versao = meta.get("versao", 0) + 1
+        meta["versao"] = versao
+        if de_xlsx or "xlsx" not in meta:
+            meta["xlsx"] = _assinatura(arquivo_xlsx)
+        if de_xlsx:
+            meta["versao_exportada"] = versao
+        if seq_journal is not None:
+            meta["seq_journal"] = seq_journal
+        _gravar_meta(meta, diretorio)
+    return versao
+
+def seq_journal(diretorio=None):
+    """Último registro do journal incluído no snapshot (None se não foi gravado)"""
+    meta = ler_meta(diretorio)
+    return meta.get("seq_journal") if meta else None
+
+def registrar_exportacao(arquivo_xlsx, versao, diretorio=None):
+    """Depois de escrever o xlsx, guarda sua assinatura como a versão 'nossa'"""
+    if not FEATHER_DISPONIVEL or versao is None:
+        return
+    with _lock:
+        meta = ler_meta(diretorio)
+        if meta is None:
+            return
+        meta["xlsx"] = _assinatura(arquivo_xlsx)
+        meta["versao_exportada"] = max(versao, meta.get("versao_exportada", 0))
+        _gravar_meta(meta, diretorio)
+
+def exportacao_pendente(diretorio=None):
+    """True se o snapshot tem alterações que ainda não foram para o xlsx"""
+    meta = ler_meta(diretorio)
+    return bool(meta) and meta.get("versao", 0) > meta.get("versao_exportada", 0)
@@ -0,0 +1,182 @@
+import sqlite3
+import os
+import pandas as pd
+import excel_io
+
+ARQUIVO_SQLITE = "dados.db"
+
+COLUNAS_VENDAS = ["data", "produto", "produto_id", "quantidade", "valor_venda", "venda_id"]
+COLUNAS_FINANCEIRO = ["data", "tipo", "descricao", "valor"]
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS produtos (
+    nome TEXT PRIMARY KEY,
+    preco REAL NOT NULL,
+    estoque INTEGER NOT NULL,
+    id INTEGER,
+    estoque_minimo INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS vendas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data TEXT,
+    produto TEXT,
+    produto_id INTEGER,
+    quantidade INTEGER,
+    valor_venda REAL,
+    venda_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_vendas_venda_id ON vendas (venda_id);
+CREATE INDEX IF NOT EXISTS idx_vendas_data ON vendas (data);
+CREATE INDEX IF NOT EXISTS idx_vendas_produto ON vendas (produto);
+CREATE TABLE IF NOT EXISTS financeiro (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data TEXT,
+    tipo TEXT,
+    descricao TEXT,
+    valor REAL
+);
+CREATE INDEX IF NOT EXISTS idx_financeiro_data ON financeiro (data);
+"""
+
+# Colunas acrescentadas depois da primeira versão do esquema: (tabela, coluna, tipo)
+COLUNAS_NOVAS = [
+    ("produtos", "id", "INTEGER"),
+    ("vendas", "produto_id", "INTEGER"),
+    ("produtos", "estoque_minimo", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+def conectar(arquivo=None):
+    """Abre o banco e garante que as tabelas e índices existem"""
+    conexao = sqlite3.connect(arquivo or ARQUIVO_SQLITE)
+    conexao.executescript(ESQUEMA)
+    _migrar(conexao)
+    return conexao
+
+def _migrar(conexao):
+    """Acrescenta a bancos antigos as colunas que o CREATE TABLE IF NOT EXISTS não cria"""
+    for tabela, coluna, tipo in COLUNAS_NOVAS:
+        existentes = {linha[1] for linha in conexao.execute(f"PRAGMA table_info({tabela})")}
+        if coluna not in existentes:
+            conexao.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {tipo}")
+    conexao.execute("CREATE INDEX IF NOT EXISTS idx_vendas_produto_id ON vendas (produto_id)")
+    conexao.commit()
+
+def carregar_dados():
+    """Carrega produtos, vendas e financeiro do banco SQLite"""
+    conexao = conectar()
+    try:
+        df_produtos = pd.read_sql_query("SELECT nome, preco, estoque, id, estoque_minimo FROM produtos", conexao, index_col="nome")
+        df_produtos.index.name = None
+        df_vendas = pd.read_sql_query(f"SELECT {', '.join(COLUNAS_VENDAS)} FROM vendas ORDER BY id", conexao)
+        df_financeiro = pd.read_sql_query(f"SELECT {', '.join(COLUNAS_FINANCEIRO)} FROM financeiro ORDER BY id", conexao)
+    finally:
+        conexao.close()
+
+    print(f"Produtos carregados: {len(df_produtos)} itens")
+    print(f"Vendas carregadas: {len(df_vendas)} registros")
+    print(f"Financeiro carregado: {len(df_financeiro)} registros")
+    return df_produtos, df_vendas, df_financeiro
+
+def salvar_dados(df_produtos, df_vendas, df_financeiro):
+    """Regrava as três tabelas a partir dos DataFrames (mesmo contrato do excel_io)"""
+    conexao = conectar()
+    try:
+        with conexao:
+            conexao.execute("DELETE FROM produtos")
+            conexao.execute("DELETE FROM vendas")
+            conexao.execute("DELETE FROM financeiro")
+            ids = df_produtos["id"] if "id" in df_produtos.columns else pd.Series(None, index=df_produtos.index)
+            minimos = df_produtos["estoque_minimo"] if "estoque_minimo" in df_produtos.columns else pd.Series(0, index=df_produtos.index)
+            conexao.executemany(
+                "INSERT INTO produtos (nome, preco, estoque, id, estoque_minimo) VALUES (?, ?, ?, ?, ?)",
+                ((str(nome), float(row["preco"]), int(row["estoque"]), _valor(ids[nome]), int(minimos[nome]))
+                 for nome, row in df_produtos.iterrows())
+            )
+            _inserir_vendas(conexao, df_vendas.reindex(columns=COLUNAS_VENDAS).to_dict("records"))
+            _inserir_lancamentos(conexao, df_financeiro.reindex(columns=COLUNAS_FINANCEIRO).to_dict("records"))
+        print(f"Dados salvos com sucesso em {ARQUIVO_SQLITE}!")
+    finally:
+        conexao.close()
+
+def _valor(v):
+    """Converte escalares numpy/NaN em tipos aceitos pelo sqlite3"""
+    if v is None or (isinstance(v, float) and v != v):
+        return None
+    if hasattr(v, "item"):
+        return v.item()
+    return v
+
+def _inserir_vendas(conexao, linhas):
+    conexao.executemany(
+        f"INSERT INTO vendas ({', '.join(COLUNAS_VENDAS)}) VALUES ({', '.join('?' * len(COLUNAS_VENDAS))})",
+        (tuple(_valor(linha.get(col)) for col in COLUNAS_VENDAS) for linha in linhas)
+    )
+
+def _inserir_lancamentos(conexao, linhas):
+    conexao.executemany(
+        f"INSERT INTO financeiro ({', '.join(COLUNAS_FINANCEIRO)}) VALUES (?, ?, ?, ?)",
+        (tuple(_valor(linha.get(col)) for col in COLUNAS_FINANCEIRO) for linha in linhas)
+    )
+
+class PersistenciaIncremental:
+    """Ouvinte que grava cada mudança no banco no momento em que ela acontece"""
+
+    def __init__(self, arquivo=None):
+        self.conexao = conectar(arquivo)
+
+    def __call__(self, evento, dados):
+        with self.conexao:
+            if evento == "produto_atualizado":
+                self.conexao.execute(
+                    "INSERT OR REPLACE INTO produtos (nome, preco, estoque, id, estoque_minimo) VALUES (?, ?, ?, ?, ?)",
+                    (dados["nome"], _valor(dados["preco"]), _valor(dados["estoque"]), _valor(dados.get("id")),
+                     _valor(dados.get("estoque_minimo", 0)))
+                )
+            elif evento == "produto_removido":
+                self.conexao.execute("DELETE FROM produtos WHERE nome = ?", (dados["nome"],))
+            elif evento == "vendas_registradas":
+                _inserir_vendas(self.conexao, dados["linhas"])
+            elif evento == "lancamentos_registrados":
+                _inserir_lancamentos(self.conexao, dados["linhas"])
+
+    def fechar(self):
+        self.conexao.close()
+
+def acompanhar(inventario, financeiro):
+    """Inscreve a gravação incremental nas mudanças de inventário e financeiro"""
+    persistencia = PersistenciaIncremental()
+    inventario.inscrever(persistencia)
+    financeiro.inscrever(persistencia)
+    return persistencia
+
+def importar_xlsx(arquivo_xlsx=None):
+    """Importa (uma única vez) o conteúdo do dados.xlsx para o banco"""
+    arquivo_xlsx = arquivo_xlsx or excel_io.ARQUIVO_DADOS
+    if not os.path.exists(arquivo_xlsx):
+        raise Exception(f"Arquivo não encontrado: {arquivo_xlsx}")
+
+    df_produtos, df_vendas, df_financeiro = excel_io.carregar_dados(arquivo_xlsx)
+    salvar_dados(df_produtos, df_vendas, df_financeiro)
+
+def exportar_xlsx(arquivo_xlsx="dados_exportados.xlsx"):
+    """Exporta o banco para uma planilha no mesmo formato do dados.xlsx"""
+    df_produtos, df_vendas, df_financeiro = carregar_dados()
+    with pd.ExcelWriter(arquivo_xlsx, engine="openpyxl", mode="w") as writer:
+        df_produtos.to_excel(writer, sheet_name="Produtos", index=True)
+        df_vendas.to_excel(writer, sheet_name="Vendas", index=False)
+        df_financeiro.to_excel(writer, sheet_name="Financeiro", index=False)
+    print(f"Dados exportados para {arquivo_xlsx}")
+    return arquivo_xlsx
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Importa/exporta dados entre dados.xlsx e o banco SQLite")
+    parser.add_argument("acao", choices=["importar", "exportar"])
+    parser.add_argument("arquivo", nargs="?", help="planilha de origem (importar) ou destino (exportar)")
+    args = parser.parse_args()
+
+    if args.acao == "importar":
+        importar_xlsx(args.arquivo)
+    else:
+        exportar_xlsx(args.arquivo or "dados_exportados.xlsx")
@@ -0,0 +1,113 @@
+import queue
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+class ExecutorTarefas:
+    """Roda trabalho pesado (E/S, pandas) num pool de threads sem travar o Tk.
+
+    Os resultados voltam para a thread do Tk por uma fila lida com
+    `root.after`, então os callbacks podem mexer nos widgets. Tarefas enviadas
+    com a mesma `chave` se substituem: a anterior é cancelada se ainda não
+    começou, e seu resultado é descartado se já estiver rodando.
+    """
+
+    def __init__(self, root, max_workers=2, intervalo_ms=50, ao_mudar_status=None):
+        self.root = root
+        self.intervalo_ms = intervalo_ms
+        # Chamada com o texto da tarefa em andamento ("" quando não há nenhuma)
+        self.ao_mudar_status = ao_mudar_status
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tarefa")
+        self._fila = queue.Queue()
+        self._contador = 0
+        self._pendentes = {}  # id -> (descricao, ao_concluir, ao_falhar)
+        self._por_chave = {}  # chave -> (id, futuro)
+        self._encerrado = False
+        self.root.after(self.intervalo_ms, self._ler_fila)
+
+    def executar(self, funcao, *args, ao_concluir=None, ao_falhar=None, chave=None, descricao="Processando..."):
+        """Agenda `funcao(*args)` no pool e devolve o id da tarefa"""
+        if chave is not None:
+            self.cancelar(chave)
+        self._contador += 1
+        id_tarefa = self._contador
+        self._pendentes[id_tarefa] = (descricao, ao_concluir, ao_falhar)
+        futuro = self._pool.submit(self._rodar, id_tarefa, funcao, args)
+        if chave is not None:
+            self._por_chave[chave] = (id_tarefa, futuro)
+        self._atualizar_status()
+        return id_tarefa
+
+    def cancelar(self, chave):
+        """Cancela a tarefa mais recente com esta chave (se já rodou, o resultado é ignorado)"""
+        atual = self._por_chave.pop(chave, None)
+        if atual is None:
+            return
+        id_tarefa, futuro = atual
+        futuro.cancel()
+        if self._pendentes.pop(id_tarefa, None) is not None:
+            self._atualizar_status()
+
+    def no_thread_principal(self, funcao, *args):
+        """Chama `funcao` na thread do Tk (na hora, se já estiver nela)"""
+        if threading.current_thread() is threading.main_thread():
+            funcao(*args)
+        else:
+            self._fila.put((None, funcao, args))
+
+    def _rodar(self, id_tarefa, funcao, args):
+        try:
+            self._fila.put((id_tarefa, True, funcao(*args)))
+        except Exception as e:
+            self._fila.put((id_tarefa, False, e))
+
+    def _ler_fila(self):
+        try:
+            while True:
+                try:
+                    id_tarefa, ok, valor = self._fila.get_nowait()
+                except queue.Empty:
+                    break
+                if id_tarefa is None:
+                    # Chamada repassada por `no_thread_principal`
+                    self._chamar("chamada na thread principal", ok, *valor)
+                    continue
+                tarefa = self._pendentes.pop(id_tarefa, None)
+                if tarefa is None:
+                    continue  # cancelada ou substituída
+                for chave, (id_chave, _) in list(self._por_chave.items()):
+                    if id_chave == id_tarefa:
+                        del self._por_chave[chave]
+                self._atualizar_status()
+                descricao, ao_concluir, ao_falhar = tarefa
+                if ok:
+                    if ao_concluir is not None:
+                        self._chamar(descricao, ao_concluir, valor)
+                elif ao_falhar is not None:
+                    self._chamar(descricao, ao_falhar, valor)
+                else:
+                    print(f"Erro em '{descricao}': {valor}")
+        finally:
+            # Um callback com erro não pode parar a leitura da fila pelo resto da sessão
+            if not self._encerrado:
+                self.root.after(self.intervalo_ms, self._ler_fila)
+
+    def _chamar(self, descricao, funcao, *args):
+        """Roda um callback na thread do Tk; um erro nele é registrado e não interrompe os demais"""
+        try:
+            funcao(*args)
+        except Exception as e:
+            print(f"Erro no retorno de '{descricao}': {e}")
+            traceback.print_exc()
+
+    def _atualizar_status(self):
+        if self.ao_mudar_status is None:
+            return
+        descricoes = [descricao for descricao, _, _ in self._pendentes.values()]
+        self.ao_mudar_status(descricoes[-1] if descricoes else "")
+
+    def encerrar(self):
+        """Para de ler resultados e descarta as tarefas que ainda não começaram"""
+        self._encerrado = True
+        self._pendentes.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
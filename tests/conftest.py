@@ -0,0 +1,38 @@
+import os
+import sys
+import threading
+import pytest
+
+# Os módulos do app ficam na raiz do repositório (sem pacote)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _aguardar_gravacoes():
+    """Espera as exportações do xlsx e as compactações em segundo plano"""
+    for thread in threading.enumerate():
+        if thread.name in ("exportacao-xlsx", "compactacao-journal"):
+            thread.join()
+
+@pytest.fixture
+def aguardar_gravacoes():
+    return _aguardar_gravacoes
+
+@pytest.fixture
+def pasta_dados(tmp_path, monkeypatch):
+    """Roda o teste numa pasta vazia: dados.xlsx, snapshot e journal ficam nela"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("ESTOQUE_JOURNAL", raising=False)
+    monkeypatch.delenv("ESTOQUE_BACKEND", raising=False)
+    yield tmp_path
+    _aguardar_gravacoes()
+
+@pytest.fixture
+def loja():
+    """Inventário e financeiro em memória com três produtos"""
+    from inventario import Inventario
+    from financeiro import Financeiro
+
+    inventario = Inventario()
+    inventario.adicionar_produto("Arroz", 20.0, 50, 5)
+    inventario.adicionar_produto("Feijão", 8.5, 30, 10)
+    inventario.adicionar_produto("Café", 15.0, 12)
+    return inventario, Financeiro()
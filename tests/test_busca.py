@@ -0,0 +1,33 @@
+from indices import IndiceBusca
+
+def test_nomes_que_comecam_pelo_texto_vem_antes_do_limite():
+    nomes = [f"Leite A{i}" for i in range(60)] + ["Arroz"]
+    indice = IndiceBusca(nomes)
+    resultado = indice.buscar("a", limite=50)
+    assert resultado[0] == "Arroz"
+    assert len(resultado) == 50
+
+def test_sem_acento_e_por_qualquer_palavra():
+    indice = IndiceBusca(["Pão de Queijo", "Queijo Minas", "Café", "Açúcar"])
+    assert indice.buscar("queijo") == ["Queijo Minas", "Pão de Queijo"]
+    assert indice.buscar("ACU") == ["Açúcar"]
+    assert indice.buscar("cafe") == ["Café"]
+    assert indice.buscar("") == ["Açúcar", "Café", "Pão de Queijo", "Queijo Minas"]
+
+def test_igual_a_varredura_com_adicoes_e_remocoes():
+    nomes = ["Arroz Branco", "Arroz Integral", "Feijão Preto", "Farinha", "Fubá", "Batata Frita"]
+    indice = IndiceBusca(nomes[:3])
+    for nome in nomes[3:]:
+        indice.adicionar(nome)
+    indice.remover("Arroz Integral")
+    atuais = [n for n in nomes if n != "Arroz Integral"]
+    for texto in ("a", "f", "fr", "ar", "in", "x"):
+        palavras = {n for n in atuais if any(p.startswith(texto) for p in n.lower().replace("ã", "a").replace("á", "a").split())}
+        assert set(indice.buscar(texto)) == palavras, texto
+    assert len(indice) == len(atuais)
+
+def test_busca_pelo_inventario(loja):
+    inventario, _ = loja
+    assert inventario.buscar_produtos("fei") == ["Feijão"]
+    inventario.remover_produto("Feijão")
+    assert inventario.buscar_produtos("fei") == []
@@ -0,0 +1,55 @@
+import pytest
+
+def test_finalizar_grava_a_venda_inteira_num_lote(loja):
+    inventario, _ = loja
+    avisos = []
+    inventario.inscrever(lambda evento, dados: avisos.append((evento, dados)))
+    inventario.adicionar_ao_carrinho("Arroz", 2)
+    inventario.adicionar_ao_carrinho("Café", 3, desconto=0.1)
+    inventario.adicionar_ao_carrinho("Arroz", 1)
+
+    venda_id, total = inventario.finalizar_venda_carrinho()
+
+    assert total == pytest.approx(3 * 20.0 + 3 * 13.5)
+    assert inventario.df_produtos.loc[["Arroz", "Café"], "estoque"].tolist() == [47, 9]
+    assert inventario.df_vendas["venda_id"].tolist() == [venda_id] * 3
+    assert len(inventario.carrinho) == 0
+    # Um único aviso com todas as linhas, depois um por produto
+    vendas = [dados for evento, dados in avisos if evento == "vendas_registradas"]
+    assert len(vendas) == 1 and len(vendas[0]["linhas"]) == 3
+    assert [dados["nome"] for evento, dados in avisos if evento == "produto_atualizado"] == ["Arroz", "Café"]
+
+def test_estoque_insuficiente_nao_grava_nada(loja):
+    inventario, _ = loja
+    inventario.adicionar_ao_carrinho("Arroz", 2)
+    inventario.adicionar_ao_carrinho("Café", 12)
+    # O estoque muda depois de o item entrar no carrinho
+    inventario.alterar_estoque("Café", -5)
+
+    with pytest.raises(Exception, match="Estoque insuficiente: Café"):
+        inventario.finalizar_venda_carrinho()
+    assert inventario.df_produtos.loc[["Arroz", "Café"], "estoque"].tolist() == [50, 7]
+    assert inventario.df_vendas.empty
+    assert len(inventario.carrinho) == 2
+
+def test_produto_removido_nao_grava_nada(loja):
+    inventario, _ = loja
+    inventario.adicionar_ao_carrinho("Arroz", 2)
+    inventario.adicionar_ao_carrinho("Feijão", 1)
+    inventario.remover_produto("Feijão")
+
+    with pytest.raises(Exception, match="Produto não cadastrado: Feijão"):
+        inventario.finalizar_venda_carrinho()
+    assert inventario.df_produtos.at["Arroz", "estoque"] == 50
+    assert inventario.df_vendas.empty
+
+def test_falha_na_gravacao_devolve_o_estoque(loja, monkeypatch):
+    inventario, _ = loja
+    inventario.adicionar_ao_carrinho("Arroz", 2)
+    def falhar(linhas, data):
+        raise OSError("falha simulada")
+    monkeypatch.setattr(inventario, "_anexar_vendas", falhar)
+
+    with pytest.raises(OSError):
+        inventario.finalizar_venda_carrinho()
+    assert inventario.df_produtos.at["Arroz", "estoque"] == 50
@@ -0,0 +1,60 @@
+import random
+import pytest
+from indices import IndiceEstoque
+
+def test_indice_igual_a_varredura():
+    sorteio = random.Random(3)
+    indice = IndiceEstoque()
+    margens = {}
+    # Muitas atualizações: passa também pela reconstrução do heap
+    for _ in range(5000):
+        nome = f"p{sorteio.randrange(60)}"
+        if sorteio.random() < 0.05:
+            indice.remover(nome)
+            margens.pop(nome, None)
+        else:
+            margem = sorteio.randrange(-10, 30)
+            indice.atualizar(nome, margem)
+            margens[nome] = margem
+        if sorteio.random() < 0.1:
+            limite = sorteio.randrange(-5, 20)
+            esperado = sorted(((n, m) for n, m in margens.items() if m <= limite), key=lambda item: (item[1], item[0]))
+            assert indice.em_baixa(limite) == esperado
+    assert len(indice) == len(margens)
+
+def test_produtos_em_baixa_acompanham_as_mudancas(loja):
+    inventario, _ = loja
+    # Arroz 50 (mínimo 5), Feijão 30 (mínimo 10), Café 12 (mínimo 0)
+    assert inventario.produtos_em_baixa().empty
+    inventario.registrar_venda("Feijão", 20)
+    inventario.alterar_estoque("Arroz", -43)
+    inventario.editar_produto("Café", novo_estoque_minimo=12)
+
+    em_baixa = inventario.produtos_em_baixa()
+    assert em_baixa.index.tolist() == ["Café", "Feijão"]
+    assert em_baixa["margem"].tolist() == [0, 0]
+    assert inventario.produtos_em_baixa(limite=2).index.tolist() == ["Café", "Feijão", "Arroz"]
+    assert inventario.quantidade_em_baixa(limite=2) == 3
+
+    inventario.remover_produto("Café")
+    inventario.alterar_estoque("Feijão", 1)
+    assert inventario.produtos_em_baixa().empty
+
+def test_aviso_de_estoque_baixo_so_ao_cruzar_o_minimo(loja):
+    inventario, _ = loja
+    avisos = []
+    inventario.inscrever(lambda evento, dados: avisos.append(dados["nome"]) if evento == "estoque_baixo" else None)
+
+    inventario.registrar_venda("Feijão", 15)   # 15, ainda acima do mínimo
+    inventario.registrar_venda("Feijão", 5)    # 10: chegou ao mínimo
+    inventario.registrar_venda("Feijão", 1)    # continua em baixa: sem novo aviso
+    inventario.alterar_estoque("Feijão", 20)   # volta acima
+    inventario.alterar_estoque("Feijão", -25)  # cruza de novo
+    assert avisos == ["Feijão", "Feijão"]
+
+def test_ajuste_negativo_recusado_sem_mudar_nada(loja):
+    inventario, _ = loja
+    with pytest.raises(Exception, match="negativo"):
+        inventario.alterar_estoque("Café", -13)
+    assert inventario.df_produtos.at["Café", "estoque"] == 12
+    assert inventario.quantidade_em_baixa() == 0
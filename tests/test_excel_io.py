@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+import excel_io
+import snapshot
+
+def salvar_loja(loja, aguardar_gravacoes):
+    inventario, financeiro = loja
+    excel_io.salvar_dados(inventario.df_produtos, inventario.df_vendas, financeiro.df_financeiro)
+    aguardar_gravacoes()
+
+def test_ida_e_volta_pelo_snapshot_e_pelo_xlsx(pasta_dados, aguardar_gravacoes, loja):
+    inventario, financeiro = loja
+    inventario.registrar_venda("Arroz", 4)
+    salvar_loja(loja, aguardar_gravacoes)
+
+    for df_produtos in (snapshot.carregar()[0], excel_io.ler_planilhas()["Produtos"].set_index("Unnamed: 0")):
+        assert df_produtos.loc["Arroz", "estoque"] == 46
+        assert df_produtos.loc["Feijão", "estoque_minimo"] == 10
+        assert df_produtos["estoque"].dtype == "int64"
+
+def test_xlsx_ilegivel_nao_substitui_o_snapshot(pasta_dados, aguardar_gravacoes, loja):
+    salvar_loja(loja, aguardar_gravacoes)
+    versao = snapshot.ler_meta()["versao"]
+
+    # Gravação interrompida por fora do app: o xlsx fica truncado
+    with open(excel_io.ARQUIVO_DADOS, "r+b") as f:
+        f.truncate(100)
+    df_produtos, _, _ = excel_io.carregar_dados()
+
+    assert sorted(df_produtos.index) == ["Arroz", "Café", "Feijão"]
+    assert snapshot.ler_meta()["versao"] == versao
+    assert len(snapshot.carregar()[0]) == 3
+
+def test_exportacao_interrompida_preserva_o_xlsx(pasta_dados, aguardar_gravacoes, loja, monkeypatch):
+    salvar_loja(loja, aguardar_gravacoes)
+    inventario, financeiro = loja
+    inventario.remover_produto("Café")
+
+    def falhar(self, writer, sheet_name, **kwargs):
+        if sheet_name == "Vendas":
+            raise OSError("queda simulada")
+        return original(self, writer, sheet_name=sheet_name, **kwargs)
+    original = pd.DataFrame.to_excel
+    with monkeypatch.context() as m:
+        m.setattr(pd.DataFrame, "to_excel", falhar)
+        with pytest.raises(OSError):
+            excel_io._escrever_xlsx(*excel_io._preparar_para_salvar(
+                inventario.df_produtos, inventario.df_vendas, financeiro.df_financeiro
+            ))
+
+    assert len(excel_io.ler_planilhas()["Produtos"]) == 3
@@ -0,0 +1,66 @@
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+from indices import intervalo_datas
+from utils import FORMATO_DATA
+
+DIAS = (None, 1, 15, 29, 31)
+MESES = (None, 1, 2, 12, 13)
+ANOS = (None, 2024, 2025, 2026)
+
+def historico(ordem):
+    """Vendas a cada 2 dias de dez/2023 a mar/2026, com dois produtos alternados"""
+    datas = pd.date_range("2023-12-01", "2026-03-31", freq="2D")
+    df = pd.DataFrame({
+        "data": datas.strftime(FORMATO_DATA),
+        "produto": np.where(np.arange(len(datas)) % 2, "Arroz", "Feijão"),
+        "quantidade": 1,
+        "valor_venda": 10.0,
+        "venda_id": [f"v{i}" for i in range(len(datas))],
+    })
+    if ordem == "embaralhada":
+        # Datas fora de ordem: o índice de datas deixa de ser sequencial
+        df = df.sample(frac=1, random_state=7).reset_index(drop=True)
+    return df
+
+def mascara_texto(df, dia, mes, ano):
+    """O filtro original, comparando pedaços do texto dd/mm/aaaa"""
+    filtro = pd.Series(True, index=df.index)
+    if ano:
+        filtro &= df["data"].str[6:] == f"{int(ano):04d}"
+    if mes:
+        filtro &= df["data"].str[3:5] == f"{int(mes):02d}"
+    if dia:
+        filtro &= df["data"].str[:2] == f"{int(dia):02d}"
+    return filtro
+
+@pytest.fixture(params=["cronologica", "embaralhada"])
+def inventario(request, loja):
+    inventario, _ = loja
+    inventario.df_vendas = historico(request.param)
+    return inventario
+
+def test_filtros_iguais_a_mascara(inventario):
+    df = inventario.df_vendas
+    for dia, mes, ano in itertools.product(DIAS, MESES, ANOS):
+        for produto in (None, "Arroz"):
+            esperado = df[mascara_texto(df, dia, mes, ano) & ((df["produto"] == produto) if produto else True)]
+            linhas = inventario.filtrar_vendas_por_data(dia, mes, ano, produto)
+            assert sorted(linhas["venda_id"]) == sorted(esperado["venda_id"]), (dia, mes, ano, produto)
+            agrupadas = inventario.filtrar_vendas_agrupadas(dia, mes, ano, produto)
+            assert sorted(agrupadas["venda_id"]) == sorted(esperado["venda_id"]), (dia, mes, ano, produto)
+
+def test_agrupadas_mais_recentes_primeiro(inventario):
+    agrupadas = inventario.filtrar_vendas_agrupadas(ano=2025)
+    datas = pd.to_datetime(agrupadas["data"], format=FORMATO_DATA)
+    assert datas.is_monotonic_decreasing
+
+def test_intervalo_datas():
+    assert intervalo_datas(ano=2026) is not None
+    # Dia sem o mês não é um intervalo contínuo
+    assert intervalo_datas(dia=1, ano=2026) is None
+    assert intervalo_datas(mes=2) is None
+    # Datas impossíveis: intervalo vazio em vez de ValueError
+    assert intervalo_datas(dia=31, mes=2, ano=2026) == (0, 0)
+    assert intervalo_datas(mes=13, ano=2026) == (0, 0)
@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+from financeiro import Financeiro
+from utils import FORMATO_DATA
+
+LANCAMENTOS = [
+    ("28/12/2025", "entrada", "Venda", 100.0),
+    ("28/12/2025", "saida", "Fornecedor", -30.0),
+    ("02/01/2026", "entrada", "Venda", 50.0),
+    ("15/01/2026", "saida", "Aluguel", -400.0),
+    ("15/01/2026", "entrada", "Venda", 120.0),
+    ("01/02/2026", "entrada", "Venda", 75.5),
+    ("01/02/2026", "entrada", "Venda", 10.0),
+]
+
+@pytest.fixture
+def financeiro():
+    financeiro = Financeiro()
+    financeiro.df_financeiro = pd.DataFrame(LANCAMENTOS, columns=["data", "tipo", "descricao", "valor"])
+    return financeiro
+
+def por_dia(df):
+    """Entradas e saídas de cada dia, agrupando o livro inteiro"""
+    df = df.assign(dia=pd.to_datetime(df["data"], format=FORMATO_DATA))
+    tabela = df.pivot_table(index="dia", columns="tipo", values="valor", aggfunc="sum", fill_value=0.0)
+    return tabela.reindex(columns=["entrada", "saida"], fill_value=0.0)
+
+def test_resumo_diario_igual_ao_agrupamento(financeiro):
+    financeiro.adicionar_entradas_em_lote([{"descricao": "Venda importada", "valor": 5, "data": "02/01/2026"}])
+    # O resumo abre o dia de hoje (saldo inicial 0); o agrupamento vem depois para incluí-lo
+    resumo = financeiro.obter_resumo_diario_completo()
+    esperado = por_dia(financeiro.df_financeiro)
+    resumo = resumo.set_index(pd.to_datetime(resumo["data"], format=FORMATO_DATA)).sort_index()
+    assert list(resumo.index) == list(esperado.index)
+    assert resumo["entrada"].tolist() == pytest.approx(esperado["entrada"].tolist())
+    assert resumo["saida"].tolist() == pytest.approx((-esperado["saida"]).tolist())
+    assert resumo["total"].tolist() == pytest.approx(esperado.sum(axis=1).tolist())
+
+def test_detalhes_do_dia_acompanham_novos_lancamentos(financeiro):
+    assert sorted(financeiro.obter_detalhes_dia("15/01/2026")["descricao"]) == ["Aluguel", "Venda"]
+    # O mapa dia -> posições fica em cache; um lançamento novo tem que aparecer
+    financeiro.adicionar_entradas_em_lote([{"descricao": "Extra", "valor": 1, "data": "15/01/2026"}])
+    detalhes = financeiro.obter_detalhes_dia("15/01/2026")
+    assert sorted(detalhes["descricao"]) == ["Aluguel", "Extra", "Venda"]
+    assert financeiro.obter_detalhes_dia("03/03/2026").empty
+
+def test_saldo_acumulado_com_lancamento_retroativo(financeiro):
+    financeiro.adicionar_entradas_em_lote([{"descricao": "Retroativa", "valor": 1000, "data": "30/12/2025"}])
+    resumo = financeiro.obter_resumo_diario_completo()
+    esperado = por_dia(financeiro.df_financeiro).sum(axis=1).cumsum()
+
+    # Mais recentes primeiro; o saldo é a soma corrida em ordem cronológica
+    datas = pd.to_datetime(resumo["data"], format=FORMATO_DATA)
+    assert datas.is_monotonic_decreasing
+    assert resumo["saldo_acumulado"].tolist() == pytest.approx(esperado[::-1].tolist())
+    assert financeiro.obter_resumo_dia("02/01/2026")["saldo_acumulado"] == pytest.approx(esperado["2026-01-02"])
+    # Último dia do livro: o saldo total, sem montar a tabela
+    assert financeiro.obter_resumo_dia(resumo["data"].iloc[0])["saldo_acumulado"] == pytest.approx(esperado.iloc[-1])
+
+def test_resumos_mensal_e_anual_iguais_ao_agrupamento(financeiro):
+    financeiro.adicionar_entradas_em_lote([
+        {"descricao": "Retroativa", "valor": 20, "data": "10/11/2025"},
+        {"descricao": "Sem data válida", "valor": 999, "data": "99/99/2025"},
+    ])
+    df = financeiro.df_financeiro
+    datas = pd.to_datetime(df["data"], format=FORMATO_DATA, errors="coerce")
+    validos = df[datas.notna()]
+    por_mes = validos["valor"].groupby(datas[datas.notna()].dt.strftime("%m/%Y")).sum()
+    por_ano = validos["valor"].groupby(datas[datas.notna()].dt.year.astype(str)).sum()
+
+    mensal = financeiro.obter_resumo_mensal().set_index("mes_ano")
+    assert mensal["total"].sort_index().to_dict() == pytest.approx(por_mes.sort_index().to_dict())
+    anual = financeiro.obter_resumo_anual().set_index("ano")
+    assert anual["total"].to_dict() == pytest.approx(por_ano.to_dict())
+    # A data inválida fica fora do saldo
+    assert anual["saldo_acumulado"].iloc[0] == pytest.approx(validos["valor"].sum())
+
+    janeiro = financeiro.obter_resumo_mensal(mes=1, ano=2026)
+    assert janeiro["mes_ano"].tolist() == ["01/2026"]
+    assert janeiro["total"].iloc[0] == pytest.approx(50.0 - 400.0 + 120.0)
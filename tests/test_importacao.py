@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+from importar_vendas import importar_vendas, ler_csv
+
+def gravar_csv(pasta, texto, nome="vendas.csv"):
+    caminho = pasta / nome
+    caminho.write_text(texto, encoding="utf-8")
+    return str(caminho)
+
+def entradas_importadas(financeiro):
+    df = financeiro.df_financeiro
+    return df[df["descricao"].str.startswith("Venda importada")]
+
+def test_csv_com_coluna_venda_id_em_branco(tmp_path, loja):
+    inventario, financeiro = loja
+    caminho = gravar_csv(tmp_path, "produto,quantidade,data,venda_id\nArroz,2,01/03/2026,\nFeijão,1,02/03/2026,\n")
+
+    aceitas, recusadas = importar_vendas(inventario, financeiro, ler_csv(caminho))
+
+    assert len(aceitas) == 2 and recusadas.empty
+    # Sem id no arquivo: cada linha vira uma venda com id gerado
+    assert aceitas["venda_id"].notna().all() and aceitas["venda_id"].nunique() == 2
+    assert len(entradas_importadas(financeiro)) == 2
+    assert inventario.df_produtos.at["Arroz", "estoque"] == 48
+
+def test_reimportar_vendas_ja_registradas_com_linhas_sem_id(loja):
+    inventario, financeiro = loja
+    primeiro = [{"produto": "Arroz", "quantidade": 1, "data": "01/03/2026", "venda_id": "A1"}]
+    importar_vendas(inventario, financeiro, primeiro)
+
+    aceitas, recusadas = importar_vendas(inventario, financeiro, primeiro + [
+        {"produto": "Café", "quantidade": 2, "data": "01/03/2026", "venda_id": None},
+    ])
+
+    assert recusadas["motivo"].tolist() == ["Venda já registrada"]
+    assert aceitas["produto"].tolist() == ["Café"]
+    assert aceitas["venda_id"].iloc[0] != "A1"
+    assert inventario.df_produtos.at["Arroz", "estoque"] == 49
+
+def test_vendas_com_datas_diferentes_recusadas_e_linhas_sem_id_aceitas(loja):
+    inventario, financeiro = loja
+    lote = pd.DataFrame({
+        "produto": ["Arroz", "Feijão", "Café"],
+        "quantidade": ["1", "1", "3"],
+        "data": ["01/03/2026", "02/03/2026", "01/03/2026"],
+        "venda_id": ["X", "X", None],
+    }, dtype="str")
+
+    aceitas, recusadas = importar_vendas(inventario, financeiro, lote)
+
+    assert recusadas["motivo"].tolist() == ["Datas diferentes na mesma venda"] * 2
+    assert aceitas["produto"].tolist() == ["Café"]
+    assert len(entradas_importadas(financeiro)) == 1
+
+def test_motivos_de_recusa_e_estoque_na_ordem_das_linhas(loja):
+    inventario, financeiro = loja
+    aceitas, recusadas = inventario.importar_vendas_em_lote([
+        {"produto": "Café", "quantidade": 10, "data": "03/03/2026"},
+        {"produto": "Café", "quantidade": 5, "data": "03/03/2026"},   # passa do estoque (12)
+        {"produto": "Café", "quantidade": 1, "data": "03/03/2026"},   # as seguintes do produto também
+        {"produto": "Sal", "quantidade": 1},
+        {"produto": "Arroz", "quantidade": 1.5},
+        {"produto": "Arroz", "quantidade": 1, "desconto": 2},
+        {"produto": "Arroz", "quantidade": 1, "data": "31/02/2026"},
+        {"produto": "Arroz", "quantidade": 2, "desconto": 0.5, "data": "03/03/2026", "venda_id": "B7"},
+    ])
+
+    assert recusadas["motivo"].tolist() == [
+        "Estoque insuficiente", "Estoque insuficiente", "Produto não cadastrado",
+        "Quantidade inválida", "Desconto inválido", "Data inválida",
+    ]
+    assert aceitas["quantidade"].tolist() == [10, 2]
+    assert aceitas["valor_venda"].tolist() == pytest.approx([150.0, 20.0])
+    assert inventario.df_produtos.at["Café", "estoque"] == 2
+    # Índices e tabela agrupada acompanham o lote
+    assert inventario.posicoes_da_venda("B7").tolist() == [len(inventario.df_vendas) - 1]
+    assert inventario.verificar_vendas_agrupadas()
@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+import pandas as pd
+import excel_io
+import journal
+import snapshot
+from inventario import Inventario
+from financeiro import Financeiro
+
+def abrir():
+    """Carrega a loja da pasta atual e liga o journal, como a interface faz"""
+    inventario, financeiro = Inventario(), Financeiro()
+    inventario.df_produtos, inventario.df_vendas, financeiro.df_financeiro = excel_io.carregar_dados()
+    return inventario, financeiro, excel_io.acompanhar(inventario, financeiro)
+
+def movimentar(inventario, financeiro):
+    inventario.adicionar_produto("Arroz", 20.0, 10)
+    inventario.adicionar_produto("Feijão", 8.5, 4)
+    inventario.alterar_estoque("Arroz", 5)
+    inventario.registrar_venda("Arroz", 3)
+    financeiro.adicionar_saida("Conta de luz", 50.0)
+
+def conferir_tipos(*dfs):
+    for df in dfs:
+        for col in df.columns:
+            if col in excel_io.TIPOS_COLUNAS:
+                assert df[col].dtype == excel_io.TIPOS_COLUNAS[col], col
+
+def test_reproduz_mudancas_nao_compactadas(pasta_dados, aguardar_gravacoes):
+    inventario, financeiro, registro = abrir()
+    aguardar_gravacoes()
+    movimentar(inventario, financeiro)
+    # Fecha sem compactar: as mudanças só estão no journal
+    registro.fechar()
+
+    df_produtos, df_vendas, df_financeiro = excel_io.carregar_dados()
+    assert df_produtos.at["Arroz", "estoque"] == 12
+    assert df_produtos.at["Feijão", "estoque"] == 4
+    assert df_vendas["quantidade"].tolist() == [3]
+    assert "Conta de luz" in df_financeiro["descricao"].tolist()
+    conferir_tipos(df_produtos, df_vendas, df_financeiro)
+
+def test_tipos_iguais_aos_do_snapshot(pasta_dados, aguardar_gravacoes):
+    inventario, financeiro, registro = abrir()
+    aguardar_gravacoes()
+    movimentar(inventario, financeiro)
+    registro.fechar()
+    reproduzidos = excel_io.carregar_dados()
+
+    excel_io.salvar_dados(*reproduzidos, exportar_xlsx=False, seq_journal=registro.seq)
+    do_snapshot = snapshot.carregar()
+    for antes, depois in zip(reproduzidos, do_snapshot):
+        assert antes.dtypes.astype(str).to_dict() == depois.dtypes.astype(str).to_dict()
+
+def test_compactacao_grava_seq_com_o_snapshot(pasta_dados, aguardar_gravacoes):
+    inventario, financeiro, registro = abrir()
+    aguardar_gravacoes()
+    movimentar(inventario, financeiro)
+    registro.compactar_em_segundo_plano().join()
+    # Fechar espera também a exportação do xlsx: a leitura abaixo não pega o arquivo pela metade
+    registro.fechar()
+
+    assert snapshot.seq_journal() == registro.seq
+    assert journal.ler_checkpoint() == registro.seq
+    assert not os.path.exists(journal.ARQUIVO_JOURNAL + ".selado")
+    df_produtos, df_vendas, _ = excel_io.carregar_dados()
+    assert df_produtos.at["Arroz", "estoque"] == 12
+    assert len(df_vendas) == 1
+
+def test_fechar_espera_a_exportacao_do_xlsx(pasta_dados, aguardar_gravacoes, monkeypatch):
+    inventario, financeiro, registro = abrir()
+    aguardar_gravacoes()
+    escrever = excel_io._escrever_xlsx
+    def escrever_devagar(*tabelas):
+        time.sleep(0.3)
+        escrever(*tabelas)
+    monkeypatch.setattr(excel_io, "_escrever_xlsx", escrever_devagar)
+
+    movimentar(inventario, financeiro)
+    registro.compactar_em_segundo_plano()
+    registro.fechar()
+
+    assert not any(t.name == "exportacao-xlsx" and t.is_alive() for t in threading.enumerate())
+    assert not snapshot.exportacao_pendente()
+
+def test_queda_antes_do_arquivo_de_checkpoint(pasta_dados, aguardar_gravacoes, monkeypatch):
+    inventario, financeiro, registro = abrir()
+    aguardar_gravacoes()
+    movimentar(inventario, financeiro)
+
+    # O snapshot (com o seq) foi gravado, mas o processo cai antes do arquivo de checkpoint
+    def queda(caminho, conteudo):
+        raise OSError("queda simulada")
+    monkeypatch.setattr(journal, "_gravar_atomico", queda)
+    registro.compactar_em_segundo_plano().join()
+    registro.fechar()
+    assert os.path.exists(journal.ARQUIVO_JOURNAL + ".selado")
+    assert journal.ler_checkpoint() < snapshot.seq_journal()
+
+    # Vale o seq do snapshot: os registros selados não são reaplicados
+    df_produtos, df_vendas, _ = excel_io.carregar_dados()
+    assert df_produtos.at["Arroz", "estoque"] == 12
+    assert len(df_vendas) == 1
+
+def test_reproduzir_a_partir_do_checkpoint(pasta_dados):
+    registro = journal.Journal()
+    for quantidade in (1, 2, 3):
+        registro.registrar("vendas_registradas", {"linhas": [
+            {"data": "01/03/2026", "produto": "Arroz", "produto_id": 0,
+             "quantidade": quantidade, "valor_venda": 20.0 * quantidade, "venda_id": f"v{quantidade}"}
+        ]})
+    registro.fechar()
+
+    vazio = pd.DataFrame(columns=excel_io.COLUNAS_VENDAS)
+    _, df_vendas, _, total = journal.reproduzir(
+        pd.DataFrame(columns=excel_io.COLUNAS_PRODUTOS), vazio,
+        pd.DataFrame(columns=excel_io.COLUNAS_FINANCEIRO), checkpoint=1
+    )
+    assert total == 2
+    assert df_vendas["venda_id"].tolist() == ["v2", "v3"]
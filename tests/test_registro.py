@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+from registro import Registro
+from utils import converter_datas
+
+COLUNAS = ["data", "produto", "quantidade", "valor_venda", "venda_id"]
+
+def linha(i, produto="Arroz"):
+    return {"data": f"{i % 28 + 1:02d}/01/2026", "produto": produto, "quantidade": i, "valor_venda": 2.5 * i, "venda_id": f"v{i}"}
+
+def test_anexar_igual_a_concatenar():
+    base = pd.DataFrame([linha(i) for i in range(3)])
+    registro = Registro(COLUNAS, base, tipos={"quantidade": "int64"})
+    registro.anexar(linha(3))
+    registro.anexar_lote([linha(4), linha(5, "Feijão")])
+
+    esperado = pd.DataFrame([linha(i) for i in range(5)] + [linha(5, "Feijão")])
+    assert len(registro) == 6
+    pd.testing.assert_frame_equal(registro.dataframe, esperado, check_dtype=False)
+    assert registro.dataframe["quantidade"].dtype == "int64"
+    # Sem linhas pendentes, a leitura não remonta o DataFrame
+    assert registro.dataframe is registro.dataframe
+
+def test_categorias_e_derivadas_nas_linhas_novas():
+    registro = Registro(
+        COLUNAS, tipos={"produto": "category"},
+        derivadas={"data_dt": lambda df: converter_datas(df["data"])}
+    )
+    registro.anexar(linha(1))
+    registro.dataframe
+    registro.anexar_lote([linha(2, "Feijão"), linha(3)])
+
+    df = registro.dataframe
+    assert isinstance(df["produto"].dtype, pd.CategoricalDtype)
+    assert df["produto"].tolist() == ["Arroz", "Feijão", "Arroz"]
+    assert df["data_dt"].tolist() == converter_datas(df["data"]).tolist()
+
+def test_lote_com_erro_nao_entra_pela_metade():
+    registro = Registro(COLUNAS)
+    with pytest.raises(AttributeError):
+        registro.anexar_lote([linha(1), None])
+    assert len(registro) == 0 and registro.dataframe.empty
+
+def test_vendas_do_inventario_vao_para_o_log(loja):
+    inventario, _ = loja
+    inventario.registrar_venda("Arroz", 2)
+    inventario.registrar_venda("Café", 1, desconto=0.1)
+
+    df = inventario.df_vendas
+    assert df["produto"].tolist() == ["Arroz", "Café"]
+    assert df["valor_venda"].tolist() == pytest.approx([40.0, 13.5])
+    assert df.index.tolist() == [0, 1]
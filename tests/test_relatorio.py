@@ -0,0 +1,41 @@
+import pytest
+from estoque import montar_relatorio
+from importar_vendas import importar_vendas
+from utils import converter_datas
+
+# Vendas em dias 1 e 15 de alguns meses de 2025; cada venda importada gera uma entrada no financeiro
+DATAS = ["01/01/2025", "15/01/2025", "01/02/2025", "15/02/2025", "01/03/2025", "15/12/2025", "01/01/2024"]
+
+@pytest.fixture
+def loja_com_vendas(loja):
+    inventario, financeiro = loja
+    importar_vendas(inventario, financeiro, [
+        {"produto": "Arroz", "quantidade": 1, "data": data, "venda_id": f"v{i}"}
+        for i, data in enumerate(DATAS)
+    ])
+    return inventario, financeiro
+
+def partes(coluna, formato):
+    return set(converter_datas(coluna).dt.strftime(formato))
+
+@pytest.mark.parametrize("filtro", [
+    {"dia": 1, "ano": 2025},
+    {"dia": 15, "mes": 2},
+    {"dia": 1, "mes": 1, "ano": 2025},
+    {"mes": 1, "ano": 2025},
+    {"dia": 31, "mes": 2, "ano": 2025},
+])
+def test_secoes_diarias_concordam(loja_com_vendas, filtro):
+    secoes = montar_relatorio(*loja_com_vendas, **filtro)
+
+    dias_vendas = partes(secoes["vendas"]["data"], "%Y-%m-%d")
+    assert partes(secoes["financeiro"]["data"], "%Y-%m-%d") == dias_vendas
+    assert secoes["produtos"]["vendas"].sum() == len(dias_vendas)
+
+def test_so_o_ano_concorda_por_mes(loja_com_vendas):
+    secoes = montar_relatorio(*loja_com_vendas, ano=2025)
+
+    meses_vendas = partes(secoes["vendas"]["data"], "%m/%Y")
+    assert set(secoes["financeiro"]["mes_ano"]) == meses_vendas
+    assert secoes["financeiro"]["total"].sum() == pytest.approx(secoes["vendas"]["lucro"].sum())
+    assert len(secoes["vendas"]) == 6
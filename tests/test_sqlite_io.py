@@ -0,0 +1,31 @@
+import armazenamento
+import sqlite_io
+from inventario import Inventario
+from financeiro import Financeiro
+
+def test_salvar_e_carregar(pasta_dados, loja):
+    inventario, financeiro = loja
+    inventario.registrar_venda("Feijão", 3)
+    sqlite_io.salvar_dados(inventario.df_produtos, inventario.df_vendas, financeiro.df_financeiro)
+
+    df_produtos, df_vendas, df_financeiro = sqlite_io.carregar_dados()
+    assert df_produtos.loc[["Arroz", "Feijão", "Café"], "estoque"].tolist() == [50, 27, 12]
+    assert df_produtos.at["Feijão", "estoque_minimo"] == 10
+    assert df_vendas[["produto", "quantidade"]].values.tolist() == [["Feijão", 3]]
+    assert len(df_financeiro) == len(financeiro.df_financeiro)
+
+def test_gravacao_incremental_pelo_backend(pasta_dados, monkeypatch):
+    monkeypatch.setenv("ESTOQUE_BACKEND", "sqlite")
+    inventario, financeiro = Inventario(), Financeiro()
+    inventario.df_produtos, inventario.df_vendas, financeiro.df_financeiro = armazenamento.carregar_dados()
+    persistencia = armazenamento.acompanhar(inventario, financeiro)
+    inventario.adicionar_produto("Arroz", 20.0, 10)
+    inventario.registrar_venda("Arroz", 4)
+    financeiro.adicionar_entrada("Venda", 80.0)
+    persistencia.fechar()
+
+    # Cada mudança já está no banco, sem salvar_dados
+    df_produtos, df_vendas, df_financeiro = armazenamento.carregar_dados()
+    assert df_produtos.at["Arroz", "estoque"] == 6
+    assert df_vendas["quantidade"].tolist() == [4]
+    assert "Venda" in df_financeiro["descricao"].tolist()
@@ -0,0 +1,32 @@
+import pytest
+
+def test_tabela_mantida_igual_ao_agrupamento_completo(loja):
+    inventario, _ = loja
+    inventario.registrar_venda("Arroz", 1)
+    inventario.adicionar_ao_carrinho("Arroz", 2)
+    inventario.adicionar_ao_carrinho("Café", 1, desconto=0.5)
+    venda_id, _ = inventario.finalizar_venda_carrinho()
+    # Lote com vendas de várias linhas e datas retroativas
+    inventario.importar_vendas_em_lote([
+        {"produto": "Feijão", "quantidade": 1, "data": "10/01/2026", "venda_id": "L1"},
+        {"produto": "Arroz", "quantidade": 3, "data": "10/01/2026", "venda_id": "L1"},
+        {"produto": "Café", "quantidade": 1, "data": "05/01/2026"},
+    ])
+    assert inventario.verificar_vendas_agrupadas()
+
+    agrupadas = inventario.obter_vendas_agrupadas().set_index("venda_id")
+    assert agrupadas.at[venda_id, "produto"] == "Arroz, Café"
+    assert agrupadas.at[venda_id, "quantidade"] == 3
+    assert agrupadas.at[venda_id, "lucro"] == pytest.approx(2 * 20.0 + 7.5)
+    assert agrupadas.at["L1", "produto"] == "Feijão, Arroz"
+    # Mais recentes primeiro, também com o lote retroativo
+    assert agrupadas["data"].iloc[-1] == "05/01/2026"
+
+def test_tabela_refeita_ao_trocar_o_historico(loja):
+    inventario, _ = loja
+    inventario.registrar_venda("Arroz", 1)
+    inventario.df_vendas = inventario.df_vendas.iloc[0:0]
+    assert inventario.obter_vendas_agrupadas().empty
+    inventario.registrar_venda("Café", 2)
+    assert inventario.verificar_vendas_agrupadas()
+    assert inventario.obter_vendas_agrupadas()["produto"].tolist() == ["Café"]
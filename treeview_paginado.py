@@ -0,0 +1,122 @@
+import tkinter as tk
+from instrumentacao import medido
+
+MARCADOR_FILHOS = "__carregando__"
+
+class TreeviewPaginado:
+    """Exibe um DataFrame num Treeview uma página por vez.
+
+    Só as linhas da página atual existem no widget, então o custo de
+    desenhar e a memória do Tk não crescem com o histórico. Com `expandir`,
+    cada linha ganha um filho provisório e os filhos reais só são montados
+    quando o nó é aberto pela primeira vez.
+    """
+
+    def __init__(self, tree, formatar, coluna_iid=None, tamanho_pagina=200, expandir=None, tags=()):
+        self.tree = tree
+        self.formatar = formatar
+        self.coluna_iid = coluna_iid
+        self.tamanho_pagina = tamanho_pagina
+        self.expandir = expandir
+        self.tags = tags
+        self.pagina = 0
+        self._df = None
+        self._lbl_pagina = None
+        if expandir is not None:
+            tree.bind("<<TreeviewOpen>>", self._ao_abrir, add="+")
+
+    def criar_controles(self, parent):
+        """Cria os botões de navegação entre páginas em `parent`"""
+        frame = tk.Frame(parent)
+        tk.Button(frame, text="< Anterior", command=self.pagina_anterior).pack(side="left", padx=5)
+        self._lbl_pagina = tk.Label(frame, text="")
+        self._lbl_pagina.pack(side="left", padx=5)
+        tk.Button(frame, text="Próxima >", command=self.proxima_pagina).pack(side="left", padx=5)
+        return frame
+
+    @property
+    def total_paginas(self):
+        if self._df is None or self._df.empty:
+            return 1
+        return (len(self._df) - 1) // self.tamanho_pagina + 1
+
+    def definir_dados(self, df, manter_pagina=False):
+        """Troca os dados exibidos (volta para a primeira página, salvo `manter_pagina`)"""
+        self._df = df
+        if not manter_pagina:
+            self.pagina = 0
+        self.pagina = min(self.pagina, self.total_paginas - 1)
+        self.renderizar()
+
+    def proxima_pagina(self):
+        if self.pagina + 1 < self.total_paginas:
+            self.pagina += 1
+            self.renderizar()
+
+    def pagina_anterior(self):
+        if self.pagina > 0:
+            self.pagina -= 1
+            self.renderizar()
+
+    @medido
+    def renderizar(self):
+        """Redesenha só as linhas da página atual"""
+        self.tree.delete(*self.tree.get_children())
+        if self._df is not None and not self._df.empty:
+            inicio = self.pagina * self.tamanho_pagina
+            pagina = self._df.iloc[inicio:inicio + self.tamanho_pagina]
+            for linha in pagina.to_dict("records"):
+                self._inserir_item(linha, tk.END)
+        self._atualizar_rotulo()
+
+    @medido
+    def atualizar_linha(self, linha):
+        """Atualiza uma linha identificada por `coluna_iid`, ou a insere no início.
+
+        Só o item afetado é tocado no widget; a página não é redesenhada.
+        """
+        chave = linha[self.coluna_iid]
+        iid = str(chave)
+        existentes = None if self._df is None or self._df.empty else self._df[self.coluna_iid] == chave
+        if existentes is not None and existentes.any():
+            for coluna, valor in linha.items():
+                self._df.loc[existentes, coluna] = valor
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=self.formatar(linha))
+                # Filhos já montados ficam desatualizados: remonta só este nó
+                if self.expandir is not None and not self.tree.exists(f"{iid}{MARCADOR_FILHOS}"):
+                    self.tree.delete(*self.tree.get_children(iid))
+                    self.expandir(iid)
+            return
+
+        import pandas as pd  # só aqui: o módulo é importado antes de a janela abrir
+
+        nova = pd.DataFrame([linha])
+        self._df = nova if existentes is None else pd.concat([nova, self._df], ignore_index=True)
+        if self.pagina == 0:
+            self._inserir_item(linha, 0)
+            itens = self.tree.get_children()
+            if len(itens) > self.tamanho_pagina:
+                self.tree.delete(itens[-1])
+        self._atualizar_rotulo()
+
+    def _inserir_item(self, linha, posicao):
+        iid = self.tree.insert(
+            "", posicao,
+            iid=str(linha[self.coluna_iid]) if self.coluna_iid else None,
+            values=self.formatar(linha),
+            tags=self.tags
+        )
+        if self.expandir is not None:
+            self.tree.insert(iid, tk.END, iid=f"{iid}{MARCADOR_FILHOS}", values=())
+
+    def _atualizar_rotulo(self):
+        if self._lbl_pagina is not None:
+            self._lbl_pagina.config(text=f"Página {self.pagina + 1} de {self.total_paginas}")
+
+    def _ao_abrir(self, event):
+        iid = self.tree.focus()
+        marcador = f"{iid}{MARCADOR_FILHOS}"
+        if iid and self.tree.exists(marcador):
+            self.tree.delete(marcador)
+            self.expandir(iid)
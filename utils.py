@@ -0,0 +1,20 @@
+from datetime import datetime
+
+# pandas é importado só nas conversões: a interface usa `hoje_str` antes de carregar os dados
+FORMATO_DATA = "%d/%m/%Y"
+
+def hoje_str():
+    """Data de hoje no formato de exibição (dd/mm/aaaa)"""
+    return datetime.today().strftime(FORMATO_DATA)
+
+def converter_datas(serie):
+    """Converte uma coluna de datas dd/mm/aaaa para datetime64 (inválidas viram NaT)"""
+    import pandas as pd
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    return pd.to_datetime(serie, format=FORMATO_DATA, errors="coerce")
+
+def converter_data(texto):
+    """Converte uma data dd/mm/aaaa para Timestamp"""
+    import pandas as pd
+    return pd.Timestamp(datetime.strptime(texto, FORMATO_DATA))